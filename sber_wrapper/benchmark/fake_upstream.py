@@ -0,0 +1,150 @@
+"""
+Fake GigaChat upstream for benchmarking the wrapper without hitting Sber.
+
+Serves OAuth, chat completions (streaming and non-streaming) and file
+contents. Behaviour is set through environment variables:
+
+    FAKE_LATENCY              seconds before the first token (0.2)
+    FAKE_TOKENS_PER_SECOND    streamed tokens per second (50)
+    FAKE_COMPLETION_TOKENS    tokens per completion unless max_tokens is lower (200)
+    FAKE_TOKEN_TTL            lifetime of issued OAuth tokens in seconds (1800)
+    FAKE_RATE_LIMIT_RATE      share of completions answered with 429 (0)
+    FAKE_IMAGE_SIZE           size of served image files in bytes (200000)
+
+Run with `uvicorn benchmark.fake_upstream:app --port 9000` and point the
+wrapper at it with SBER_AUTH_URL=http://localhost:9000/api/v2/oauth and
+SBER_API_URL=http://localhost:9000/api/v1.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+LATENCY = float(os.getenv("FAKE_LATENCY", "0.2"))
+TOKENS_PER_SECOND = float(os.getenv("FAKE_TOKENS_PER_SECOND", "50"))
+COMPLETION_TOKENS = int(os.getenv("FAKE_COMPLETION_TOKENS", "200"))
+TOKEN_TTL = int(os.getenv("FAKE_TOKEN_TTL", "1800"))
+RATE_LIMIT_RATE = float(os.getenv("FAKE_RATE_LIMIT_RATE", "0"))
+IMAGE_SIZE = int(os.getenv("FAKE_IMAGE_SIZE", "200000"))
+
+app = FastAPI()
+
+# token -> expires_at
+tokens: dict[str, float] = {}
+
+
+def check_token(request: Request):
+    token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if tokens.get(token, 0) < time.time():
+        raise HTTPException(status_code=401, detail="Token expired")
+
+
+def get_prompt_tokens(messages: list) -> int:
+    # Roughly 4 characters per token
+    return sum(len(str(message.get("content", ""))) for message in messages) // 4
+
+
+@app.post("/api/v2/oauth")
+async def oauth():
+    token = uuid.uuid4().hex
+    expires_at = time.time() + TOKEN_TTL
+    tokens[token] = expires_at
+    return {"access_token": token, "expires_at": int(expires_at * 1000)}
+
+
+@app.post("/api/v1/chat/completions")
+async def chat_completions(request: Request):
+    check_token(request)
+    body = await request.json()
+
+    if RATE_LIMIT_RATE and random.random() < RATE_LIMIT_RATE:
+        return JSONResponse(
+            status_code=429,
+            content={"status": 429, "message": "Too Many Requests"},
+            headers={"Retry-After": "1"},
+        )
+
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    model = body.get("model", "GigaChat")
+    if body.get("function_call") == "auto":
+        # Image generation requests get a reference to a fake file
+        tokens_text = [f'<img src="{uuid.uuid4().hex}" fuse="true"/>']
+    else:
+        max_tokens = min(COMPLETION_TOKENS, body.get("max_tokens") or COMPLETION_TOKENS)
+        tokens_text = [f"token{i} " for i in range(max_tokens)]
+
+    prompt_tokens = get_prompt_tokens(body.get("messages", []))
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": len(tokens_text),
+        "total_tokens": prompt_tokens + len(tokens_text),
+    }
+
+    await asyncio.sleep(LATENCY)
+
+    if not body.get("stream"):
+        await asyncio.sleep(len(tokens_text) / TOKENS_PER_SECOND)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens_text)},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": usage,
+        }
+
+    async def stream():
+        for i, text in enumerate(tokens_text):
+            is_last = i == len(tokens_text) - 1
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"role": "assistant", "content": text},
+                        "finish_reason": "stop" if is_last else None,
+                    }
+                ],
+            }
+            if is_last:
+                chunk["usage"] = usage
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(1 / TOKENS_PER_SECOND)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+@app.get("/api/v1/files/{file_id}/content")
+async def file_content(file_id: str, request: Request):
+    check_token(request)
+    await asyncio.sleep(LATENCY)
+    return Response(content=os.urandom(IMAGE_SIZE), media_type="image/jpeg")
+
+
+@app.get("/api/v1/models")
+async def models(request: Request):
+    check_token(request)
+    return {
+        "object": "list",
+        "data": [
+            {"id": model, "object": "model", "owned_by": "salutedevices"}
+            for model in ("GigaChat", "GigaChat-Pro", "GigaChat-Max")
+        ],
+    }
@@ -0,0 +1,223 @@
+"""
+Load generator for the wrapper.
+
+Drives /v1/chat/completions with a number of concurrent clients and reports
+throughput, time to first token (TTFT), total latency and the wrapper's CPU
+time per request. With --spawn it starts the fake upstream and the wrapper
+itself, so the whole benchmark runs offline:
+
+    python -m benchmark.load_test --spawn --concurrency 50 --requests 500
+
+To measure an already running wrapper, pass --url and optionally --pid so
+its CPU time can be read from /proc.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+
+@dataclass
+class Result:
+    ttft: Optional[float] = None
+    duration: float = 0.0
+    chunks: int = 0
+    error: Optional[str] = None
+
+
+def get_cpu_time(pid: int) -> Optional[float]:
+    """User + system CPU seconds of a process, Linux only."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+async def run_request(client: httpx.AsyncClient, args) -> Result:
+    result = Result()
+    body = {
+        "model": args.model,
+        "messages": [{"role": "user", "content": args.prompt}],
+        "stream": args.stream,
+    }
+    if args.max_tokens:
+        body["max_tokens"] = args.max_tokens
+
+    started_at = time.perf_counter()
+    try:
+        if not args.stream:
+            response = await client.post("/v1/chat/completions", json=body)
+            response.raise_for_status()
+            result.ttft = time.perf_counter() - started_at
+            result.chunks = 1
+        else:
+            async with client.stream(
+                "POST", "/v1/chat/completions", json=body
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: ") or line == "data: [DONE]":
+                        continue
+                    data = json.loads(line[len("data: ") :])
+                    if "error" in data:
+                        raise Exception(data["error"])
+                    if result.ttft is None:
+                        result.ttft = time.perf_counter() - started_at
+                    result.chunks += 1
+    except Exception as e:
+        result.error = str(e) or e.__class__.__name__
+
+    result.duration = time.perf_counter() - started_at
+    return result
+
+
+async def run_load(args) -> tuple[list[Result], float]:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url,
+        timeout=httpx.Timeout(300),
+        limits=httpx.Limits(max_connections=args.concurrency),
+    ) as client:
+
+        async def run_one():
+            async with semaphore:
+                return await run_request(client, args)
+
+        started_at = time.perf_counter()
+        results = await asyncio.gather(*[run_one() for _ in range(args.requests)])
+        return results, time.perf_counter() - started_at
+
+
+def report(results: list[Result], elapsed: float, cpu_time: Optional[float]):
+    succeeded = [result for result in results if result.error is None]
+    errors = [result.error for result in results if result.error is not None]
+    ttfts = [result.ttft for result in succeeded if result.ttft is not None]
+    durations = [result.duration for result in succeeded]
+    chunks = sum(result.chunks for result in succeeded)
+
+    print(f"requests:        {len(results)} ({len(errors)} failed) in {elapsed:.2f}s")
+    print(
+        f"throughput:      {len(succeeded) / elapsed:.1f} req/s, "
+        f"{chunks / elapsed:.1f} chunks/s"
+    )
+    print(
+        f"ttft:            p50 {percentile(ttfts, 50) * 1000:.0f}ms, "
+        f"p99 {percentile(ttfts, 99) * 1000:.0f}ms"
+    )
+    print(
+        f"duration:        p50 {percentile(durations, 50) * 1000:.0f}ms, "
+        f"p99 {percentile(durations, 99) * 1000:.0f}ms"
+    )
+    if durations:
+        print(f"mean duration:   {statistics.mean(durations) * 1000:.0f}ms")
+    if cpu_time is not None and results:
+        print(
+            f"wrapper cpu:     {cpu_time:.2f}s total, "
+            f"{cpu_time / len(results) * 1000:.1f}ms per request"
+        )
+    for error in sorted(set(errors))[:5]:
+        print(f"error:           {error} ({errors.count(error)}x)")
+
+
+def wait_until_ready(url: str, timeout: float = 30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def spawn(args) -> list[subprocess.Popen]:
+    """Start the fake upstream and a wrapper pointed at it."""
+    upstream_url = f"http://127.0.0.1:{args.upstream_port}"
+    env = {
+        **os.environ,
+        "FAKE_LATENCY": str(args.latency),
+        "FAKE_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "FAKE_COMPLETION_TOKENS": str(args.completion_tokens),
+        "FAKE_RATE_LIMIT_RATE": str(args.rate_limit_rate),
+        "SBER_KEY": "fake",
+        "SBER_AUTH_URL": f"{upstream_url}/api/v2/oauth",
+        "SBER_API_URL": f"{upstream_url}/api/v1",
+    }
+    uvicorn = [sys.executable, "-m", "uvicorn", "--log-level", "warning"]
+
+    upstream = subprocess.Popen(
+        [*uvicorn, "benchmark.fake_upstream:app", "--port", str(args.upstream_port)],
+        env=env,
+    )
+    wait_until_ready(f"{upstream_url}/docs")
+
+    wrapper = subprocess.Popen(
+        [*uvicorn, "sber_wrapper.main:app", "--port", str(args.wrapper_port)],
+        env=env,
+    )
+    args.url = f"http://127.0.0.1:{args.wrapper_port}"
+    args.pid = wrapper.pid
+    wait_until_ready(f"{args.url}/v1/models")
+    return [wrapper, upstream]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--pid", type=int, help="wrapper process to measure CPU of")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--model", default="GigaChat")
+    parser.add_argument("--prompt", default="Tell me a story.")
+    parser.add_argument("--max-tokens", type=int)
+    parser.add_argument(
+        "--no-stream", dest="stream", action="store_false", help="non-streaming"
+    )
+
+    spawn_group = parser.add_argument_group("spawned fake upstream")
+    spawn_group.add_argument("--spawn", action="store_true")
+    spawn_group.add_argument("--wrapper-port", type=int, default=8010)
+    spawn_group.add_argument("--upstream-port", type=int, default=9010)
+    spawn_group.add_argument("--latency", type=float, default=0.2)
+    spawn_group.add_argument("--tokens-per-second", type=float, default=50)
+    spawn_group.add_argument("--completion-tokens", type=int, default=200)
+    spawn_group.add_argument("--rate-limit-rate", type=float, default=0)
+    args = parser.parse_args()
+
+    processes = spawn(args) if args.spawn else []
+    try:
+        cpu_before = get_cpu_time(args.pid) if args.pid else None
+        results, elapsed = asyncio.run(run_load(args))
+        cpu_after = get_cpu_time(args.pid) if args.pid else None
+        cpu_time = (
+            cpu_after - cpu_before
+            if cpu_before is not None and cpu_after is not None
+            else None
+        )
+        report(results, elapsed, cpu_time)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
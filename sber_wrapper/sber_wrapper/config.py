@@ -1,4 +1,70 @@
+import json
+import logging
 import os
 
+logger = logging.getLogger("uvicorn.error")
+
 API_KEY = os.getenv("SBER_KEY")
+SCOPE = os.getenv("SBER_SCOPE", "GIGACHAT_API_CORP")
+# Pool of credentials as comma-separated "key" or "key:scope" entries,
+# requests are spread over them; defaults to SBER_KEY alone
+CREDENTIALS = [
+    (entry.strip().split(":", 1) + [SCOPE])[:2]
+    for entry in os.getenv("SBER_KEYS", API_KEY or "").split(",")
+    if entry.strip()
+]
+# A credential is taken out of rotation for CREDENTIAL_EJECT_SECONDS after
+# this many quota errors in a row
+CREDENTIAL_EJECT_AFTER = int(os.getenv("SBER_CREDENTIAL_EJECT_AFTER", "3"))
+CREDENTIAL_EJECT_SECONDS = int(os.getenv("SBER_CREDENTIAL_EJECT_SECONDS", "60"))
+# Overridable to point the wrapper at a fake upstream, see benchmark/
+AUTH_URL = os.getenv(
+    "SBER_AUTH_URL", "https://ngw.devices.sberbank.ru:9443/api/v2/oauth"
+)
+API_URL = os.getenv("SBER_API_URL", "https://gigachat.devices.sberbank.ru/api/v1")
+# Served by /v1/models until the models have been discovered from Sber
 MODELS = ["GigaChat", "GigaChat-Pro", "GigaChat-Max"]
+# Seconds between refreshes of the models discovered from Sber
+MODELS_REFRESH_INTERVAL = int(os.getenv("SBER_MODELS_REFRESH_INTERVAL", "600"))
+
+# Seconds before expiry at which the OAuth token is refreshed in the background
+TOKEN_REFRESH_MARGIN = int(os.getenv("SBER_TOKEN_REFRESH_MARGIN", "120"))
+
+# Connections kept open to the Sber endpoints, shared by all requests
+HTTP_MAX_CONNECTIONS = int(os.getenv("SBER_HTTP_MAX_CONNECTIONS", "100"))
+
+# Generated images are kept on disk, keyed by Sber file id, up to this many MB
+IMAGE_CACHE_DIR = os.getenv("SBER_IMAGE_CACHE_DIR", "/tmp/sber_wrapper/images")
+IMAGE_CACHE_MAX_SIZE = int(os.getenv("SBER_IMAGE_CACHE_MAX_SIZE", "256")) * 1024 * 1024
+
+# Image generations running at the same time, across all requests
+IMAGE_GENERATION_CONCURRENCY = int(os.getenv("SBER_IMAGE_GENERATION_CONCURRENCY", "4"))
+IMAGE_MAX_N = 10
+
+# Requests forwarded to GigaChat at the same time per model, with optional
+# per-model overrides as JSON, e.g. {"GigaChat-Max": 2}
+MODEL_MAX_CONCURRENCY = int(os.getenv("SBER_MODEL_MAX_CONCURRENCY", "8"))
+try:
+    MODEL_CONCURRENCY_OVERRIDES = {
+        model: int(limit)
+        for model, limit in json.loads(
+            os.getenv("SBER_MODEL_CONCURRENCY_OVERRIDES", "{}")
+        ).items()
+    }
+except (ValueError, TypeError, AttributeError) as e:
+    logger.warning(f"Ignoring malformed SBER_MODEL_CONCURRENCY_OVERRIDES: {e}")
+    MODEL_CONCURRENCY_OVERRIDES = {}
+# Requests waiting for a slot per model before new ones are rejected with 429
+MODEL_MAX_QUEUE = int(os.getenv("SBER_MODEL_MAX_QUEUE", "32"))
+
+# Retries of rate-limited or failed upstream calls, with jittered backoff
+UPSTREAM_MAX_RETRIES = int(os.getenv("SBER_UPSTREAM_MAX_RETRIES", "3"))
+UPSTREAM_MAX_RETRY_DELAY = float(os.getenv("SBER_UPSTREAM_MAX_RETRY_DELAY", "30"))
+
+# Non-streaming completions cached when temperature is 0, or when the caller
+# sends "X-Response-Cache: force"
+ENABLE_RESPONSE_CACHE = (
+    os.getenv("SBER_ENABLE_RESPONSE_CACHE", "true").lower() == "true"
+)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("SBER_RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+RESPONSE_CACHE_TTL = int(os.getenv("SBER_RESPONSE_CACHE_TTL", "600"))
@@ -2,69 +2,233 @@ import json
 import asyncio
 import re
 import base64
-from typing import AsyncGenerator, Optional, Dict, Any
+import time
+import logging
+from typing import AsyncGenerator, Callable, Optional, Dict, Any, List, Tuple
 
-from fastapi import logger
+from .config import IMAGE_GENERATION_CONCURRENCY
+from .image_cache import image_cache
+from .metrics import (
+    ERRORS,
+    FIRST_CHUNK_SECONDS,
+    REQUEST_DURATION_SECONDS,
+    REQUESTS_IN_FLIGHT,
+    STREAM_CHUNKS_PER_SECOND,
+)
+from .usage import usage_stats
 
-from .llm_configs.llm_config_sber import download_image_async
+logger = logging.getLogger("uvicorn.error")
 
+# OpenAI parameters GigaChat understands, forwarded as they are
+FORWARDED_PARAMETERS = (
+    "temperature",
+    "top_p",
+    "n",
+    "max_tokens",
+    "stop",
+    "functions",
+    "function_call",
+)
+# OpenAI parameters GigaChat names differently
+PARAMETER_ALIASES = {"max_completion_tokens": "max_tokens"}
+# GigaChat-only parameters, which the OpenAI client only sends via extra_body
+GIGACHAT_PARAMETERS = ("repetition_penalty", "update_interval", "profanity_check")
 
-async def process_stream_response(stream) -> AsyncGenerator[str, None]:
-    """Process streaming response from OpenAI API."""
-    """Process streaming response from OpenAI API."""
+
+def get_completion_params(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an OpenAI chat completion request to GigaChat create() kwargs."""
+    params = {}
+    for key, value in body.items():
+        if value is None:
+            continue
+        if key in FORWARDED_PARAMETERS:
+            params[key] = value
+        elif key in PARAMETER_ALIASES:
+            params.setdefault(PARAMETER_ALIASES[key], value)
+
+    extra_body = {
+        key: body[key] for key in GIGACHAT_PARAMETERS if body.get(key) is not None
+    }
+    if extra_body:
+        params["extra_body"] = extra_body
+    return params
+
+
+async def process_stream_response(
+    stream,
+    on_close: Optional[Callable[[], None]] = None,
+    model: str = "GigaChat",
+    include_usage: bool = False,
+    started_at: Optional[float] = None,
+) -> AsyncGenerator[str, None]:
+    """
+    Process streaming response from OpenAI API.
+
+    GigaChat reports usage in its last chunk; with `include_usage` it is moved
+    into a final chunk without choices, as the OpenAI API does. `started_at`
+    is the perf_counter() at which the request was received, and the request
+    is counted as in flight until the stream ends.
+    """
+    started_at = started_at or time.perf_counter()
+    first_chunk_at = None
+    chunks = 0
+    usage = None
+    last_chunk = None
     try:
         async for chunk in stream:
-            yield f"data: {json.dumps(chunk.model_dump())}\n\n"
+            if first_chunk_at is None:
+                first_chunk_at = time.perf_counter()
+                FIRST_CHUNK_SECONDS.labels(model).observe(first_chunk_at - started_at)
+            chunks += 1
+            last_chunk = chunk
+            data = chunk.model_dump()
+            if data.get("usage"):
+                usage = chunk.usage
+                if include_usage:
+                    data["usage"] = None
+            yield f"data: {json.dumps(data)}\n\n"
             await asyncio.sleep(0)  # Allow other tasks to run
 
+        if include_usage and usage is not None:
+            usage_chunk = {
+                "id": last_chunk.id,
+                "object": "chat.completion.chunk",
+                "created": last_chunk.created,
+                "model": last_chunk.model,
+                "choices": [],
+                "usage": usage.model_dump(),
+            }
+            yield f"data: {json.dumps(usage_chunk)}\n\n"
+
         # Send the final [DONE] message
         yield "data: [DONE]\n\n"
     except Exception as e:
         logger.error(f"Error in stream processing: {str(e)}")
+        ERRORS.labels("chat_completions", e.__class__.__name__).inc()
         error_data = {"error": str(e)}
         yield f"data: {json.dumps(error_data)}\n\n"
         yield "data: [DONE]\n\n"
+    finally:
+        finished_at = time.perf_counter()
+        REQUEST_DURATION_SECONDS.labels("chat_completions", model).observe(
+            finished_at - started_at
+        )
+        if first_chunk_at is not None and finished_at > first_chunk_at:
+            STREAM_CHUNKS_PER_SECOND.labels(model).observe(
+                chunks / (finished_at - first_chunk_at)
+            )
+        REQUESTS_IN_FLIGHT.labels("chat_completions").dec()
+        usage_stats.record(model, usage, finished_at - started_at)
+        if on_close is not None:
+            on_close()
 
 
-async def generate_and_get_image(
-    client: Any, prompt: str, size: str = "1024x1024", style: Optional[str] = None
-) -> Dict[str, Any]:
-    """Generate an image using Sber API and return in OpenAI format."""
-    try:
-        # Prepare system message for style if provided
-        messages = []
-        if style:
-            messages.append({"role": "system", "content": style})
+# One semaphore for all requests so that `n` fans out without flooding Sber
+image_generation_semaphore = asyncio.Semaphore(IMAGE_GENERATION_CONCURRENCY)
+
+# Generations in flight, shared by identical requests arriving together
+inflight_generations: Dict[Tuple, asyncio.Task] = {}
+
 
-        # Add user prompt
-        messages.append({"role": "user", "content": prompt})
+async def generate_image_id(
+    client: Any, prompt: str, style: Optional[str] = None
+) -> str:
+    """Request one image generation from Sber API and return its file ID."""
+    # Prepare system message for style if provided
+    messages = []
+    if style:
+        messages.append({"role": "system", "content": style})
 
-        # Request image generation
+    # Add user prompt
+    messages.append({"role": "user", "content": prompt})
+
+    # Request image generation
+    async with image_generation_semaphore:
         response = await client.chat.completions.create(
             model="GigaChat-Max", messages=messages, function_call="auto"
         )
 
-        # Extract image ID from response
-        content = response.choices[0].message.content
-        image_id_match = re.search(r'<img src="([^"]+)"', content)
+    # Extract image ID from response
+    content = response.choices[0].message.content
+    image_id_match = re.search(r'<img src="([^"]+)"', content)
+
+    if not image_id_match:
+        raise ValueError("No image ID found in response")
+
+    image_id = image_id_match.group(1)
+
+    # Fetch into the cache while the generation slot is already released
+    await image_cache.get(image_id)
+    return image_id
+
+
+async def generate_image_ids(
+    client: Any, prompt: str, size: str, style: Optional[str], n: int
+) -> List[str]:
+    """
+    Generate `n` images concurrently. Failed generations are dropped as long
+    as at least one image was generated.
+    """
+    results = await asyncio.gather(
+        *[generate_image_id(client, prompt, style) for _ in range(n)],
+        return_exceptions=True,
+    )
 
-        if not image_id_match:
-            raise ValueError("No image ID found in response")
+    image_ids = [result for result in results if isinstance(result, str)]
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if not image_ids:
+        raise errors[0]
+    if errors:
+        logger.warning(f"{len(errors)} of {n} image generations failed: {errors[0]}")
+    return image_ids
+
+
+async def generate_and_get_image(
+    client: Any,
+    prompt: str,
+    size: str = "1024x1024",
+    style: Optional[str] = None,
+    response_format: Optional[str] = None,
+    base_url: str = "/",
+    n: int = 1,
+) -> Dict[str, Any]:
+    """
+    Generate `n` images using Sber API and return in OpenAI format.
+
+    Identical (prompt, size, style, n) requests made while a generation is in
+    flight share its images. `response_format="url"` links to the cached image
+    served by this wrapper, "b64_json" inlines it, and no format returns both
+    for older clients.
+    """
+    try:
+        key = (prompt, size, style, n)
+        task = inflight_generations.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                generate_image_ids(client, prompt, size, style, n)
+            )
+            inflight_generations[key] = task
+            task.add_done_callback(lambda _: inflight_generations.pop(key, None))
+        else:
+            logger.info(f"Joining in-flight image generation for: {prompt}")
 
-        image_id = image_id_match.group(1)
+        # A disconnecting client must not cancel a generation others wait for
+        image_ids = await asyncio.shield(task)
 
-        image_bytes = await download_image_async(image_id, client.api_key)
+        images = []
+        for image_id in image_ids:
+            image = {}
+            if response_format == "url":
+                image["url"] = f"{base_url}v1/images/files/{image_id}"
+            else:
+                image_bytes = await image_cache.read(image_id)
+                image["b64_json"] = base64.b64encode(image_bytes).decode("utf-8")
+                if response_format is None:
+                    image["url"] = f"data:image/jpeg;base64,{image['b64_json']}"
+            images.append(image)
 
         # Return in OpenAI format
-        return {
-            "created": int(asyncio.get_event_loop().time()),
-            "data": [
-                {
-                    "url": f"data:image/jpeg;base64,{base64.b64encode(image_bytes).decode('utf-8')}",
-                    "b64_json": base64.b64encode(image_bytes).decode("utf-8"),
-                }
-            ],
-        }
+        return {"created": int(time.time()), "data": images}
 
     except Exception as e:
         logger.error(f"Error generating image: {str(e)}")
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from .config import IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_SIZE
+from .llm_configs.llm_config_sber import client_pool
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class ImageCache:
+    """
+    Generated images on local disk, keyed by Sber file id.
+
+    Images are streamed from Sber into the cache only once, even when several
+    requests ask for the same file at the same time, and the least recently
+    used files are evicted once the cache grows beyond `max_size` bytes.
+    """
+
+    def __init__(
+        self, cache_dir: str = IMAGE_CACHE_DIR, max_size: int = IMAGE_CACHE_MAX_SIZE
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self._locks: dict[str, asyncio.Lock] = {}
+        # Requests holding or waiting for each lock, it is dropped at zero
+        self._lock_users: dict[str, int] = {}
+
+    def get_path(self, file_id: str) -> Path:
+        if not re.fullmatch(r"[\w-]+", file_id):
+            raise ValueError(f"Invalid file id: {file_id}")
+        return self.cache_dir / f"{file_id}.jpg"
+
+    async def get(self, file_id: str) -> Path:
+        """Return the path of the cached image, downloading it if needed."""
+        path = self.get_path(file_id)
+        try:
+            # Mark as recently used for eviction
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            # Not cached yet, or just evicted by another download's thread
+            pass
+
+        lock = self._locks.setdefault(file_id, asyncio.Lock())
+        self._lock_users[file_id] = self._lock_users.get(file_id, 0) + 1
+        try:
+            async with lock:
+                if not path.exists():
+                    await self._download(file_id, path)
+        finally:
+            self._lock_users[file_id] -= 1
+            if not self._lock_users[file_id]:
+                del self._lock_users[file_id]
+                del self._locks[file_id]
+        return path
+
+    async def read(self, file_id: str) -> bytes:
+        """Return the image's bytes, downloading it if needed."""
+        path = await self.get(file_id)
+        try:
+            return await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            # Evicted between get() and the read, fetch it once more
+            path = await self.get(file_id)
+            return await asyncio.to_thread(path.read_bytes)
+
+    async def _download(self, file_id: str, path: Path):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Unique per download, other workers may fetch the same file
+        f = tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, prefix=f"{file_id}.", suffix=".tmp", delete=False
+        )
+        tmp_path = Path(f.name)
+        try:
+            with f:
+                async for chunk in client_pool.stream_image(file_id):
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        await asyncio.to_thread(self.evict)
+
+    def evict(self):
+        files = []
+        for path in self.cache_dir.glob("*.jpg"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+            logger.debug(f"Evicted cached image {path.name}")
+
+
+image_cache = ImageCache()
@@ -0,0 +1,99 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict
+
+from .config import MODEL_CONCURRENCY_OVERRIDES, MODEL_MAX_CONCURRENCY, MODEL_MAX_QUEUE
+
+
+class QueueFullError(Exception):
+    def __init__(self, model: str, queue_length: int, max_concurrency: int):
+        super().__init__(
+            f"Too many concurrent requests for {model}, "
+            f"{queue_length} requests already waiting"
+        )
+        self.model = model
+        self.queue_length = queue_length
+        self.max_concurrency = max_concurrency
+
+
+@dataclass
+class ModelSlots:
+    max_concurrency: int
+    active: int = 0
+    waiters: Deque[asyncio.Future] = field(default_factory=deque)
+
+
+class ModelLimiter:
+    """
+    Bounds the requests forwarded to each model.
+
+    Up to `max_concurrency` requests per model run at once, up to `max_queue`
+    more wait for a slot in arrival order, and anything beyond that is
+    rejected immediately with a QueueFullError.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MODEL_MAX_CONCURRENCY,
+        max_queue: int = MODEL_MAX_QUEUE,
+        overrides: Dict[str, int] = MODEL_CONCURRENCY_OVERRIDES,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.overrides = overrides
+        self.models: Dict[str, ModelSlots] = {}
+
+    def get_slots(self, model: str) -> ModelSlots:
+        if model not in self.models:
+            self.models[model] = ModelSlots(
+                max_concurrency=self.overrides.get(model, self.max_concurrency)
+            )
+        return self.models[model]
+
+    async def acquire(self, model: str) -> int:
+        """Wait for a slot for `model`, returning the queue position it had."""
+        slots = self.get_slots(model)
+        if slots.active < slots.max_concurrency and not slots.waiters:
+            slots.active += 1
+            return 0
+
+        if len(slots.waiters) >= self.max_queue:
+            raise QueueFullError(model, len(slots.waiters), slots.max_concurrency)
+
+        position = len(slots.waiters) + 1
+        waiter = asyncio.get_running_loop().create_future()
+        slots.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over right as we gave up, pass it on
+                self.release(model)
+            elif waiter in slots.waiters:
+                slots.waiters.remove(waiter)
+            raise
+        return position
+
+    def release(self, model: str):
+        slots = self.get_slots(model)
+        # Hand the slot over directly so that newcomers cannot jump the queue
+        while slots.waiters:
+            waiter = slots.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        slots.active -= 1
+
+    def get_stats(self) -> Dict[str, dict]:
+        return {
+            model: {
+                "active": slots.active,
+                "queued": len(slots.waiters),
+                "max_concurrency": slots.max_concurrency,
+            }
+            for model, slots in self.models.items()
+        }
+
+
+model_limiter = ModelLimiter()
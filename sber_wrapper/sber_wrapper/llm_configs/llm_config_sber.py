@@ -1,42 +1,208 @@
+import asyncio
+import logging
+import random
+import re
+import time
 import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import AsyncIterator, List, Optional
+
 import httpx
 import requests
 import base64
-from openai import AsyncOpenAI, OpenAI, AuthenticationError
+from openai import (
+    AsyncOpenAI,
+    OpenAI,
+    APIConnectionError,
+    AuthenticationError,
+    InternalServerError,
+    RateLimitError,
+)
 from openai.types.chat import ChatCompletion
 
-from ..config import API_KEY
+from ..config import (
+    API_URL,
+    AUTH_URL,
+    CREDENTIAL_EJECT_AFTER,
+    CREDENTIAL_EJECT_SECONDS,
+    CREDENTIALS,
+    HTTP_MAX_CONNECTIONS,
+    TOKEN_REFRESH_MARGIN,
+    UPSTREAM_MAX_RETRIES,
+    UPSTREAM_MAX_RETRY_DELAY,
+)
+from ..metrics import CREDENTIAL_EJECTIONS, TOKEN_REFRESHES, UPSTREAM_RETRIES
 from .llm_config_base import LLMConfig
 
+logger = logging.getLogger("uvicorn.error")
+
+SBER_API_URL = API_URL
+
+http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """One connection pool shared by every call to the Sber endpoints."""
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = httpx.AsyncClient(
+            verify=False,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(120, connect=10),
+        )
+    return http_client
+
+
+async def close_http_client():
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+
+class SberTokenManager:
+    """
+    Shares one GigaChat OAuth token of a credential between all endpoints.
+
+    The token is refreshed in the background `refresh_margin` seconds before
+    it expires, and concurrent refreshes (on startup, after a missed
+    background refresh or after a 401) are coalesced into a single request.
+    """
+
+    url = AUTH_URL
+
+    def __init__(
+        self, api_key: str, scope: str, refresh_margin: int = TOKEN_REFRESH_MARGIN
+    ):
+        self.api_key = api_key
+        self.scope = scope
+        self.refresh_margin = refresh_margin
+        self.token: Optional[str] = None
+        self.expires_at = 0.0
+
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def is_fresh(self) -> bool:
+        return (
+            self.token is not None
+            and time.time() < self.expires_at - self.refresh_margin
+        )
+
+    async def get_token(self) -> str:
+        if self.is_fresh():
+            return self.token
+        return await self.refresh()
 
-async def generate_sber_token_async():
-    url = "https://ngw.devices.sberbank.ru:9443/api/v2/oauth"
-    payload = "scope=GIGACHAT_API_CORP"
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-        "Accept": "application/json",
-        "RqUID": str(uuid.uuid4()),
-        "Authorization": f"Basic {API_KEY}",
-    }
-    async with httpx.AsyncClient(verify=False) as client:
-        response = await client.post(url, headers=headers, data=payload)
-        response_json = response.json()
-        return response_json["access_token"]
+    async def refresh(self, rejected_token: Optional[str] = None) -> str:
+        """
+        Fetch a new token unless another caller already did while this one
+        was waiting. `rejected_token` forces a refresh if it is still current.
+        """
+        async with self._lock:
+            if rejected_token is not None:
+                if self.token != rejected_token:
+                    return self.token
+            elif self.is_fresh():
+                return self.token
 
+            try:
+                response = await get_http_client().post(
+                    self.url,
+                    headers={
+                        "Content-Type": "application/x-www-form-urlencoded",
+                        "Accept": "application/json",
+                        "RqUID": str(uuid.uuid4()),
+                        "Authorization": f"Basic {self.api_key}",
+                    },
+                    content=f"scope={self.scope}",
+                )
+                response.raise_for_status()
+                response_json = response.json()
+            except Exception:
+                TOKEN_REFRESHES.labels("failure").inc()
+                raise
+            TOKEN_REFRESHES.labels("success").inc()
 
-async def download_image_async(file_id: str, token: str) -> bytes:
-    """Download image from Sber API using file ID."""
-    url = f"https://gigachat.devices.sberbank.ru/api/v1/files/{file_id}/content"
-    headers = {"Accept": "application/jpg", "Authorization": f"Bearer {token}"}
-    async with httpx.AsyncClient(verify=False) as client:
-        response = await client.get(url, headers=headers)
-        response.raise_for_status()
-        return response.content
+            self.token = response_json["access_token"]
+            # expires_at is a Unix timestamp in milliseconds
+            self.expires_at = response_json.get("expires_at", 0) / 1000 or (
+                time.time() + 30 * 60
+            )
+            logger.info(
+                "Refreshed GigaChat token, expires in "
+                f"{self.expires_at - time.time():.0f}s"
+            )
+            return self.token
+
+    async def _refresh_periodically(self):
+        while True:
+            delay = self.expires_at - self.refresh_margin - time.time()
+            await asyncio.sleep(max(delay, 1))
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Background GigaChat token refresh failed: {str(e)}")
+                await asyncio.sleep(5)
+
+    def start(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_periodically())
+
+    async def close(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+
+async def stream_image_async(
+    file_id: str, token_manager: SberTokenManager
+) -> AsyncIterator[bytes]:
+    """Stream an image from Sber API using file ID."""
+    url = f"{SBER_API_URL}/files/{file_id}/content"
+    token = await token_manager.get_token()
+    for is_retry in (False, True):
+        headers = {"Accept": "application/jpg", "Authorization": f"Bearer {token}"}
+        async with get_http_client().stream("GET", url, headers=headers) as response:
+            if response.status_code == 401 and not is_retry:
+                token = await token_manager.refresh(rejected_token=token)
+                continue
+
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                yield chunk
+            return
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+def get_retry_delay(error: Exception, attempt: int) -> float:
+    """Upstream Retry-After if given, else exponential backoff with jitter."""
+    delay = get_retry_after(error)
+    if delay is None:
+        delay = 2**attempt * 0.5 + random.uniform(0, 0.5)
+    return min(delay, UPSTREAM_MAX_RETRY_DELAY)
 
 
 class AsyncSberOpenai(AsyncOpenAI):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, token_manager: SberTokenManager, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.token_manager = token_manager
         self._setup_chat_retries()
 
     def _setup_chat_retries(self):
@@ -44,30 +210,282 @@ class AsyncSberOpenai(AsyncOpenAI):
 
         async def create_with_retries(*args, **kwargs) -> ChatCompletion:
             is_retry = False
+            attempt = 0
+            token = await self.token_manager.get_token()
+            extra_headers = kwargs.pop("extra_headers", None) or {}
             while True:
                 try:
-                    return await original_create(*args, **kwargs)
+                    # The client is shared, so the token this call used is kept
+                    # locally and also sent explicitly with the request
+                    self.api_key = token
+                    return await original_create(
+                        *args,
+                        extra_headers={
+                            **extra_headers,
+                            "Authorization": f"Bearer {token}",
+                        },
+                        **kwargs,
+                    )
                 except AuthenticationError as e:
                     if not is_retry:
-                        self.api_key = await generate_sber_token_async()
+                        UPSTREAM_RETRIES.labels("authentication").inc()
+                        token = await self.token_manager.refresh(
+                            rejected_token=token
+                        )
                         is_retry = True
                     else:
                         error_msg = self._format_error(e)
                         raise Exception(
                             f"Failed after {self._max_retries} attempts. {error_msg}"
                         )
+                # Quota errors are retried by SberClientPool on another credential
+                except (APIConnectionError, InternalServerError) as e:
+                    if attempt >= UPSTREAM_MAX_RETRIES:
+                        raise
+                    delay = get_retry_delay(e, attempt)
+                    attempt += 1
+                    UPSTREAM_RETRIES.labels(e.__class__.__name__).inc()
+                    logger.warning(
+                        f"GigaChat request failed ({str(e)}), "
+                        f"retry {attempt}/{UPSTREAM_MAX_RETRIES} in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+                    token = await self.token_manager.get_token()
 
         self.chat.completions.create = create_with_retries
 
 
+@dataclass(eq=False)
+class PoolMember:
+    index: int
+    scope: str
+    token_manager: SberTokenManager
+    client: AsyncSberOpenai
+    in_flight: int = 0
+    requests: int = 0
+    quota_errors: int = 0
+    ejected_until: float = 0.0
+    ejections: int = 0
+
+    def is_available(self) -> bool:
+        return self.ejected_until <= time.time()
+
+
+async def track_stream(stream, member: PoolMember):
+    """Keep a stream counted as in flight on its credential until it ends."""
+    try:
+        async for chunk in stream:
+            yield chunk
+    finally:
+        member.in_flight -= 1
+
+
+class SberClientPool:
+    """
+    Spreads requests over a pool of credentials, each with its own token and
+    client.
+
+    Every request goes to the available credential with the fewest requests
+    in flight. A rate-limited request is retried on another credential, and
+    a credential that keeps hitting its quota is taken out of rotation for a
+    while. Exposes `chat.completions.create` like the OpenAI client.
+    """
+
+    max_file_owners = 10000
+
+    def __init__(self, credentials: List[List[str]]):
+        self.members = [
+            self._create_member(index, api_key, scope)
+            for index, (api_key, scope) in enumerate(credentials)
+        ]
+        # Generated files can only be downloaded with the credential that
+        # created them: file id -> member
+        self.file_owners: "OrderedDict[str, PoolMember]" = OrderedDict()
+        self._next = 0
+
+        self.chat = SimpleNamespace(
+            completions=SimpleNamespace(create=self.create_chat_completion)
+        )
+
+    @staticmethod
+    def _create_member(index: int, api_key: str, scope: str) -> PoolMember:
+        token_manager = SberTokenManager(api_key, scope)
+        return PoolMember(
+            index=index,
+            scope=scope,
+            token_manager=token_manager,
+            client=AsyncSberOpenai(
+                token_manager,
+                base_url=SBER_API_URL,
+                api_key="",
+                http_client=get_http_client(),
+                # Retries are handled by create_with_retries, honouring Retry-After
+                max_retries=0,
+            ),
+        )
+
+    async def start(self):
+        if not self.members:
+            raise RuntimeError("No Sber credentials configured, set SBER_KEY")
+
+        results = await asyncio.gather(
+            *[member.token_manager.get_token() for member in self.members],
+            return_exceptions=True,
+        )
+        for member, result in zip(self.members, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Sber credential {member.index} unusable: {result}")
+                member.ejected_until = time.time() + CREDENTIAL_EJECT_SECONDS
+            member.token_manager.start()
+
+        if all(isinstance(result, BaseException) for result in results):
+            raise results[0]
+
+    async def close(self):
+        for member in self.members:
+            await member.token_manager.close()
+
+    def pick(self, exclude=()) -> PoolMember:
+        candidates = [
+            member
+            for member in self.members
+            if member.is_available() and member not in exclude
+        ]
+        if not candidates:
+            # Everything is ejected or was tried, use what recovers first
+            candidates = [
+                min(self.members, key=lambda member: member.ejected_until)
+            ]
+
+        # Rotate the starting point so that ties are spread evenly
+        self._next = (self._next + 1) % len(self.members)
+        return min(
+            candidates,
+            key=lambda member: (
+                member.in_flight,
+                (member.index - self._next) % len(self.members),
+            ),
+        )
+
+    def record_quota_error(self, member: PoolMember):
+        member.quota_errors += 1
+        if member.quota_errors >= CREDENTIAL_EJECT_AFTER:
+            logger.warning(
+                f"Sber credential {member.index} keeps hitting its quota, "
+                f"ejecting it for {CREDENTIAL_EJECT_SECONDS}s"
+            )
+            member.ejected_until = time.time() + CREDENTIAL_EJECT_SECONDS
+            member.quota_errors = 0
+            member.ejections += 1
+            CREDENTIAL_EJECTIONS.inc()
+
+    def record_files(self, completion, member: PoolMember):
+        for choice in getattr(completion, "choices", None) or []:
+            content = getattr(choice.message, "content", None) or ""
+            for file_id in re.findall(r'<img src="([^"]+)"', content):
+                self.file_owners[file_id] = member
+        while len(self.file_owners) > self.max_file_owners:
+            self.file_owners.popitem(last=False)
+
+    async def create_chat_completion(self, *args, **kwargs):
+        tried = set()
+        attempt = 0
+        while True:
+            member = self.pick(exclude=tried)
+            member.in_flight += 1
+            member.requests += 1
+            try:
+                result = await member.client.chat.completions.create(*args, **kwargs)
+            except RateLimitError as e:
+                member.in_flight -= 1
+                self.record_quota_error(member)
+                if attempt >= UPSTREAM_MAX_RETRIES:
+                    raise
+
+                tried.add(member)
+                attempt += 1
+                UPSTREAM_RETRIES.labels(e.__class__.__name__).inc()
+                if any(m.is_available() and m not in tried for m in self.members):
+                    logger.warning(
+                        f"Sber credential {member.index} rate limited, "
+                        f"retry {attempt}/{UPSTREAM_MAX_RETRIES} on another one"
+                    )
+                    continue
+
+                # Every credential is exhausted, wait before going round again
+                delay = get_retry_delay(e, attempt - 1)
+                logger.warning(
+                    f"All Sber credentials rate limited, "
+                    f"retry {attempt}/{UPSTREAM_MAX_RETRIES} in {delay:.1f}s"
+                )
+                tried.clear()
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                member.in_flight -= 1
+                raise
+
+            member.quota_errors = 0
+            if kwargs.get("stream"):
+                return track_stream(result, member)
+
+            member.in_flight -= 1
+            self.record_files(result, member)
+            return result
+
+    async def stream_image(self, file_id: str) -> AsyncIterator[bytes]:
+        owner = self.file_owners.get(file_id)
+        if owner is not None:
+            candidates = [owner]
+        else:
+            # Evicted from file_owners or created before a restart, the file
+            # only downloads with the credential that created it
+            if len(self.members) > 1:
+                logger.warning(
+                    f"Unknown credential for file {file_id}, trying each in turn"
+                )
+            candidates = self.members
+
+        for member in candidates:
+            started = False
+            try:
+                async for chunk in stream_image_async(file_id, member.token_manager):
+                    started = True
+                    yield chunk
+            except httpx.HTTPStatusError as e:
+                if (
+                    started
+                    or member is candidates[-1]
+                    or e.response.status_code not in (400, 403, 404)
+                ):
+                    raise
+                continue
+
+            if owner is None:
+                self.file_owners[file_id] = member
+            return
+
+    def get_stats(self) -> List[dict]:
+        return [
+            {
+                "index": member.index,
+                "scope": member.scope,
+                "available": member.is_available(),
+                "ejected_until": member.ejected_until or None,
+                "ejections": member.ejections,
+                "in_flight": member.in_flight,
+                "requests": member.requests,
+            }
+            for member in self.members
+        ]
+
+
+client_pool = SberClientPool(CREDENTIALS)
+
+
 async def get_sber_config_async():
-    api_key = await generate_sber_token_async()
-    async_llm_client = AsyncSberOpenai(
-        base_url="https://gigachat.devices.sberbank.ru/api/v1",
-        api_key=api_key,
-        http_client=httpx.AsyncClient(verify=False),
-    )
+    await client_pool.start()
     return LLMConfig(
         client=None,
-        async_client=async_llm_client,
+        async_client=client_pool,
     )
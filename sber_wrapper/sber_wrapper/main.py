@@ -1,15 +1,40 @@
 import logging
-from datetime import datetime
+import math
+import time
+from functools import partial
 from typing import Optional
 from contextlib import asynccontextmanager
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, HTTPException, Request, Body
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Request, Response, Body
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
+import httpx
+from openai import RateLimitError
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
-from .config import MODELS
-from .llm_configs.llm_config_sber import get_sber_config_async
-from .helper_functions import process_stream_response, generate_and_get_image
+from .config import ENABLE_RESPONSE_CACHE, IMAGE_MAX_N
+from .image_cache import image_cache
+from .limiter import QueueFullError, model_limiter
+from .model_catalog import model_catalog
+from .metrics import (
+    ERRORS,
+    REQUEST_DURATION_SECONDS,
+    REQUESTS_IN_FLIGHT,
+    UPSTREAM_CONNECT_SECONDS,
+)
+from .response_cache import get_cache_key, is_cacheable, response_cache
+from .llm_configs.llm_config_sber import (
+    client_pool,
+    close_http_client,
+    get_retry_after,
+    get_sber_config_async,
+)
+from .helper_functions import (
+    generate_and_get_image,
+    get_completion_params,
+    process_stream_response,
+)
+from .usage import usage_stats
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -20,7 +45,11 @@ CONFIG = None
 async def lifespan(app: FastAPI):
     global CONFIG
     CONFIG = await get_sber_config_async()
+    model_catalog.start()
     yield
+    await model_catalog.close()
+    await client_pool.close()
+    await close_http_client()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -33,8 +62,34 @@ app.add_middleware(
 )
 
 
+def rate_limit_response(
+    message: str, retry_after: float, headers: Optional[dict] = None
+) -> JSONResponse:
+    """429 response in the OpenAI error format."""
+    return JSONResponse(
+        status_code=429,
+        content={
+            "error": {
+                "message": message,
+                "type": "requests",
+                "param": None,
+                "code": "rate_limit_exceeded",
+            }
+        },
+        headers={"Retry-After": str(math.ceil(retry_after)), **(headers or {})},
+    )
+
+
 @app.post("/v1/chat/completions")
-async def chat_completions(request: Request):
+async def chat_completions(request: Request, response: Response):
+    started_at = time.perf_counter()
+    REQUESTS_IN_FLIGHT.labels("chat_completions").inc()
+    model_name = "GigaChat"
+    # model_name as used for metrics, limits and usage stats
+    model_label = "other"
+    release = None
+    # Set once a stream takes over the request's bookkeeping
+    streaming = False
     try:
         # Get the request body
         body = await request.json()
@@ -48,82 +103,213 @@ async def chat_completions(request: Request):
             raise HTTPException(status_code=400, detail="No messages provided")
 
         model_name = body.get("model", "GigaChat")
+        model_label = model_catalog.get_label(model_name)
         stream = body.get("stream", False)
+        params = get_completion_params(body)
+
+        cache_key = None
+        if ENABLE_RESPONSE_CACHE and is_cacheable(
+            body, request.headers.get("X-Response-Cache")
+        ):
+            cache_key = get_cache_key(body)
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Serving cached completion for {model_name}")
+                return JSONResponse(
+                    content=cached, headers={"X-Response-Cache": "HIT"}
+                )
+
+        # Wait for a free upstream slot for this model
+        queue_position = await model_limiter.acquire(model_label)
+        release = partial(model_limiter.release, model_label)
+        queue_headers = {"X-Queue-Position": str(queue_position)}
 
         # Create chat completion using OpenAI client
+        upstream_started_at = time.perf_counter()
         if stream:
-            response = await CONFIG.async_client.chat.completions.create(
-                model=model_name, messages=messages, stream=True
+            stream_response = await CONFIG.async_client.chat.completions.create(
+                model=model_name, messages=messages, stream=True, **params
+            )
+            UPSTREAM_CONNECT_SECONDS.labels(model_label, "true").observe(
+                time.perf_counter() - upstream_started_at
+            )
+            # The slot is held until the stream is fully relayed
+            on_close, release = release, None
+            streaming = True
+            include_usage = bool(
+                (body.get("stream_options") or {}).get("include_usage")
             )
             return StreamingResponse(
-                process_stream_response(response),
+                process_stream_response(
+                    stream_response,
+                    on_close=on_close,
+                    model=model_label,
+                    include_usage=include_usage,
+                    started_at=started_at,
+                ),
                 media_type="text/event-stream",
                 headers={
                     "Cache-Control": "no-cache",
                     "Connection": "keep-alive",
                     "Transfer-Encoding": "chunked",
+                    **queue_headers,
                 },
             )
 
         # For non-streaming requests
-        response = await CONFIG.async_client.chat.completions.create(
-            model=model_name, messages=messages
+        completion = await CONFIG.async_client.chat.completions.create(
+            model=model_name, messages=messages, **params
         )
+        upstream_duration = time.perf_counter() - upstream_started_at
+        UPSTREAM_CONNECT_SECONDS.labels(model_label, "false").observe(upstream_duration)
+        usage_stats.record(model_label, completion.usage, upstream_duration)
 
         logger.info(f"Successfully processed request for {model_name}")
-        return response
+        response.headers.update(queue_headers)
+        if cache_key is not None:
+            response_cache.set(cache_key, completion.model_dump())
+            response.headers["X-Response-Cache"] = "MISS"
+        return completion
 
+    except QueueFullError as e:
+        logger.warning(str(e))
+        ERRORS.labels("chat_completions", "queue_full").inc()
+        return rate_limit_response(
+            str(e),
+            retry_after=1 + e.queue_length / e.max_concurrency,
+            headers={
+                "X-Queue-Length": str(e.queue_length),
+                "X-Concurrency-Limit": str(e.max_concurrency),
+            },
+        )
+    except RateLimitError as e:
+        logger.warning(f"GigaChat rate limit exceeded for {model_name}: {str(e)}")
+        ERRORS.labels("chat_completions", "rate_limit").inc()
+        return rate_limit_response(
+            f"Upstream rate limit exceeded: {str(e)}",
+            retry_after=get_retry_after(e) or 1,
+        )
     except Exception as e:
         logger.error(f"Error processing chat completion request: {str(e)}")
+        ERRORS.labels("chat_completions", e.__class__.__name__).inc()
         if isinstance(e, HTTPException):
             raise
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if release is not None:
+            release()
+        if not streaming:
+            REQUEST_DURATION_SECONDS.labels("chat_completions", model_label).observe(
+                time.perf_counter() - started_at
+            )
+            REQUESTS_IN_FLIGHT.labels("chat_completions").dec()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics of the wrapper."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/admin/cache")
+async def get_cache_stats():
+    """Hit/miss statistics of the completion response cache."""
+    return {"enabled": ENABLE_RESPONSE_CACHE, **response_cache.get_stats()}
+
+
+@app.delete("/admin/cache")
+async def clear_cache():
+    response_cache.clear()
+    return {"enabled": ENABLE_RESPONSE_CACHE, **response_cache.get_stats()}
+
+
+@app.get("/admin/credentials")
+async def get_credential_stats():
+    """Load and availability of each pooled Sber credential, without keys."""
+    return client_pool.get_stats()
+
+
+@app.get("/admin/usage")
+async def get_usage_stats():
+    """Token usage and latency per model since startup."""
+    return usage_stats.get_stats()
 
 
 @app.get("/v1/models")
-async def list_models():
+async def list_models(request: Request):
     """List available models in OpenAI format."""
-    models_data = []
-    timestamp = int(datetime.now().timestamp())
-
-    for model_id in MODELS:
-        models_data.append(
-            {
-                "id": model_id,
-                "object": "model",
-                "created": timestamp,
-                "owned_by": "Sber",
-                "permission": [],
-                "root": model_id,
-                "parent": None,
-            }
-        )
+    headers = {"ETag": model_catalog.etag, "Cache-Control": "no-cache"}
+    if request.headers.get("If-None-Match") == model_catalog.etag:
+        return Response(status_code=304, headers=headers)
 
-    return {"data": models_data, "object": "list"}
+    return Response(
+        content=model_catalog.payload, media_type="application/json", headers=headers
+    )
 
 
 @app.post("/v1/images/generations")
 async def create_image(
+    request: Request,
     prompt: str = Body(...),
     n: Optional[int] = Body(1),
     size: Optional[str] = Body("1024x1024"),
     style: Optional[str] = Body(None),
+    response_format: Optional[str] = Body(None),
 ):
     """Generate images using Sber API in OpenAI-compatible format."""
+    started_at = time.perf_counter()
+    REQUESTS_IN_FLIGHT.labels("images").inc()
     try:
         logger.info(f"Received image generation request: {prompt}")
+        if response_format not in (None, "url", "b64_json"):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported response_format: {response_format}",
+            )
+        n = n or 1
+        if not 1 <= n <= IMAGE_MAX_N:
+            raise HTTPException(
+                status_code=400, detail=f"n must be between 1 and {IMAGE_MAX_N}"
+            )
+
         # Generate image
         result = await generate_and_get_image(
-            client=CONFIG.async_client, prompt=prompt, size=size, style=style
+            client=CONFIG.async_client,
+            prompt=prompt,
+            size=size,
+            style=style,
+            response_format=response_format,
+            base_url=str(request.base_url),
+            n=n,
         )
 
         return JSONResponse(content=result)
 
     except Exception as e:
         logger.error(f"Error generating image: {str(e)}")
+        ERRORS.labels("images", e.__class__.__name__).inc()
         if isinstance(e, HTTPException):
             raise
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        REQUEST_DURATION_SECONDS.labels("images", "GigaChat-Max").observe(
+            time.perf_counter() - started_at
+        )
+        REQUESTS_IN_FLIGHT.labels("images").dec()
+
+
+@app.get("/v1/images/files/{file_id}")
+async def get_image_file(file_id: str):
+    """Serve a generated image from the local cache, fetching it if needed."""
+    try:
+        image_path = await image_cache.get(file_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Error fetching image {file_id}: {str(e)}")
+        raise HTTPException(status_code=e.response.status_code, detail=str(e))
+
+    return FileResponse(image_path, media_type="image/jpeg")
 
 
 if __name__ == "__main__":
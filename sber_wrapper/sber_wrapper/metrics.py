@@ -0,0 +1,46 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+UPSTREAM_CONNECT_SECONDS = Histogram(
+    "sber_upstream_connect_seconds",
+    "Time until GigaChat answered a completion request (headers for streams)",
+    ["model", "stream"],
+    buckets=LATENCY_BUCKETS,
+)
+FIRST_CHUNK_SECONDS = Histogram(
+    "sber_first_chunk_seconds",
+    "Time from receiving a streamed request to relaying its first chunk",
+    ["model"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DURATION_SECONDS = Histogram(
+    "sber_request_duration_seconds",
+    "Total time spent handling a request in the wrapper",
+    ["endpoint", "model"],
+    buckets=LATENCY_BUCKETS,
+)
+STREAM_CHUNKS_PER_SECOND = Histogram(
+    "sber_stream_chunks_per_second",
+    "Chunks relayed per second after the first chunk of a stream",
+    ["model"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200),
+)
+
+TOKEN_REFRESHES = Counter(
+    "sber_token_refreshes_total", "GigaChat OAuth token refreshes", ["result"]
+)
+UPSTREAM_RETRIES = Counter(
+    "sber_upstream_retries_total", "Retried GigaChat completion calls", ["reason"]
+)
+CREDENTIAL_EJECTIONS = Counter(
+    "sber_credential_ejections_total",
+    "Credentials taken out of rotation after repeated quota errors",
+)
+ERRORS = Counter(
+    "sber_errors_total", "Requests that ended in an error", ["endpoint", "type"]
+)
+
+REQUESTS_IN_FLIGHT = Gauge(
+    "sber_requests_in_flight", "Requests currently being handled", ["endpoint"]
+)
@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import List, Optional
+
+from .config import MODELS, MODELS_REFRESH_INTERVAL
+from .llm_configs.llm_config_sber import SBER_API_URL, client_pool, get_http_client
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class ModelCatalog:
+    """
+    Chat models available upstream, discovered from the Sber models endpoint.
+
+    The list is refreshed in the background and kept as a prebuilt JSON
+    payload with an ETag, so listing models costs no upstream call. When a
+    refresh fails the last good list is kept; until the first discovery
+    succeeds the configured MODELS are served.
+    """
+
+    def __init__(self, refresh_interval: int = MODELS_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self.discovered_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._build([{"id": model_id} for model_id in MODELS], int(time.time()))
+
+    def _build(self, models: List[dict], created: int):
+        self.model_ids = [model["id"] for model in models]
+        self.payload = json.dumps(
+            {
+                "data": [
+                    {
+                        "id": model["id"],
+                        "object": "model",
+                        "created": created,
+                        "owned_by": model.get("owned_by") or "Sber",
+                        "permission": [],
+                        "root": model["id"],
+                        "parent": None,
+                    }
+                    for model in models
+                ],
+                "object": "list",
+            }
+        ).encode()
+        self.etag = f'"{hashlib.sha256(self.payload).hexdigest()[:32]}"'
+
+    def get_label(self, model: str) -> str:
+        """
+        `model` if it is a known model, "other" otherwise. Used wherever the
+        model keys metrics, limits or stats, which must stay bounded whatever
+        clients send.
+        """
+        return model if model in self.model_ids else "other"
+
+    async def fetch_models(self) -> List[dict]:
+        member = client_pool.pick()
+        token = await member.token_manager.get_token()
+        response = await get_http_client().get(
+            f"{SBER_API_URL}/models", headers={"Authorization": f"Bearer {token}"}
+        )
+        if response.status_code == 401:
+            token = await member.token_manager.refresh(rejected_token=token)
+            response = await get_http_client().get(
+                f"{SBER_API_URL}/models", headers={"Authorization": f"Bearer {token}"}
+            )
+        response.raise_for_status()
+
+        # Embedding models are listed too but cannot serve chat completions
+        return [
+            model
+            for model in response.json().get("data", [])
+            if model.get("type", "chat") == "chat"
+            and not model["id"].startswith("Embeddings")
+        ]
+
+    async def refresh(self):
+        try:
+            models = await self.fetch_models()
+        except Exception as e:
+            logger.error(f"Model discovery failed, keeping the last list: {str(e)}")
+            return
+
+        if not models:
+            logger.warning("Sber listed no chat models, keeping the last list")
+            return
+
+        if [model["id"] for model in models] != self.model_ids:
+            logger.info(f"Discovered models: {[model['id'] for model in models]}")
+            self._build(models, int(time.time()))
+        self.discovered_at = time.time()
+
+    async def _refresh_periodically(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_periodically())
+
+    async def close(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+
+model_catalog = ModelCatalog()
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .config import RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL
+
+# Request fields that do not change the completion
+IGNORED_FIELDS = {"stream", "stream_options", "user"}
+
+
+def get_cache_key(body: Dict[str, Any]) -> str:
+    """Canonical hash of the model, messages and sampling parameters."""
+    payload = {key: value for key, value in body.items() if key not in IGNORED_FIELDS}
+    return hashlib.sha256(
+        json.dumps(
+            payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode()
+    ).hexdigest()
+
+
+def is_cacheable(body: Dict[str, Any], cache_header: Optional[str] = None) -> bool:
+    if body.get("stream") or (cache_header or "").lower() == "bypass":
+        return False
+    return body.get("temperature") == 0 or (cache_header or "").lower() == "force"
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache of completions, holding at most `max_entries`
+    entries for at most `ttl` seconds each.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        ttl: int = RESPONSE_CACHE_TTL,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (expires_at, response)
+        self.entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.time():
+            if entry is not None:
+                del self.entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, response: dict):
+        self.entries[key] = (time.time() + self.ttl, response)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+response_cache = ResponseCache()
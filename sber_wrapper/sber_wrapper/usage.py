@@ -0,0 +1,54 @@
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class UsageStats:
+    """Token usage and latency per model since startup, for capacity planning."""
+
+    def __init__(self):
+        self.models: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, model: str, usage: Optional[Any], duration: float):
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+
+        stats = self.models.setdefault(
+            model,
+            {
+                "requests": 0,
+                "requests_without_usage": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "total_duration": 0.0,
+            },
+        )
+        stats["requests"] += 1
+        stats["requests_without_usage"] += usage is None
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        stats["total_duration"] += duration
+
+        logger.info(
+            f"Usage for {model}: {prompt_tokens} prompt + {completion_tokens} "
+            f"completion tokens in {duration:.2f}s "
+            f"({completion_tokens / duration if duration else 0:.1f} tokens/s)"
+        )
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            model: {
+                **stats,
+                "average_duration": stats["total_duration"] / stats["requests"],
+                "completion_tokens_per_second": (
+                    stats["completion_tokens"] / stats["total_duration"]
+                    if stats["total_duration"]
+                    else 0.0
+                ),
+            }
+            for model, stats in self.models.items()
+        }
+
+
+usage_stats = UsageStats()
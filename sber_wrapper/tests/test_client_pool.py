@@ -0,0 +1,188 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import RateLimitError
+from sber_wrapper.llm_configs import llm_config_sber
+from sber_wrapper.llm_configs.llm_config_sber import (
+    PoolMember,
+    SberClientPool,
+    track_stream,
+)
+
+
+def rate_limit_error(retry_after=None):
+    headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+    response = httpx.Response(
+        429,
+        headers=headers,
+        request=httpx.Request("POST", "https://example.com/chat/completions"),
+    )
+    return RateLimitError("Too many requests", response=response, body=None)
+
+
+class FakeClient:
+    """Stands in for AsyncSberOpenai, answering with the queued outcomes."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, *args, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_pool(*clients) -> SberClientPool:
+    pool = SberClientPool([])
+    pool.members = [
+        PoolMember(index=index, scope="test", token_manager=None, client=client)
+        for index, client in enumerate(clients)
+    ]
+    return pool
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(llm_config_sber.asyncio, "sleep", sleep)
+    monkeypatch.setattr(llm_config_sber, "CREDENTIAL_EJECT_AFTER", 2)
+    monkeypatch.setattr(llm_config_sber, "CREDENTIAL_EJECT_SECONDS", 60)
+    monkeypatch.setattr(llm_config_sber, "UPSTREAM_MAX_RETRIES", 3)
+    return delays
+
+
+def test_pick_prefers_fewest_in_flight():
+    pool = make_pool(FakeClient(), FakeClient(), FakeClient())
+    pool.members[0].in_flight = 2
+    pool.members[1].in_flight = 1
+    pool.members[2].in_flight = 3
+    assert pool.pick() is pool.members[1]
+
+    # Ties are spread over the members
+    for member in pool.members:
+        member.in_flight = 0
+    assert {pool.pick().index for _ in range(3)} == {0, 1, 2}
+
+
+def test_pick_skips_ejected_and_excluded_members():
+    pool = make_pool(FakeClient(), FakeClient(), FakeClient())
+    pool.members[0].ejected_until = time.time() + 60
+    assert pool.pick(exclude={pool.members[1]}) is pool.members[2]
+
+    # With nothing available, the member that recovers first is used
+    pool.members[1].ejected_until = time.time() + 30
+    pool.members[2].ejected_until = time.time() + 90
+    assert pool.pick() is pool.members[1]
+
+
+def test_rate_limited_request_fails_over_to_another_member():
+    limited, healthy = FakeClient(rate_limit_error()), FakeClient()
+    pool = make_pool(limited, healthy)
+    pool.members[1].in_flight = 1
+
+    result = asyncio.run(pool.create_chat_completion(model="GigaChat"))
+    assert result == "ok"
+    assert (limited.calls, healthy.calls) == (1, 1)
+    assert pool.members[0].quota_errors == 1
+    assert [member.in_flight for member in pool.members] == [0, 1]
+
+
+def test_member_is_ejected_after_repeated_quota_errors():
+    pool = make_pool(FakeClient(), FakeClient())
+    member = pool.members[0]
+
+    pool.record_quota_error(member)
+    assert member.is_available()
+    pool.record_quota_error(member)
+    assert not member.is_available()
+    assert member.ejections == 1 and member.quota_errors == 0
+
+    assert pool.pick() is pool.members[1]
+
+
+def test_all_members_exhausted_waits_for_retry_after(no_sleep):
+    pool = make_pool(
+        FakeClient(rate_limit_error(retry_after=2)),
+        FakeClient(rate_limit_error(retry_after=2), "ok"),
+    )
+
+    result = asyncio.run(pool.create_chat_completion(model="GigaChat"))
+    assert result == "ok"
+    assert no_sleep == [2.0]
+    assert all(member.in_flight == 0 for member in pool.members)
+
+
+def test_rate_limit_is_raised_after_max_retries():
+    pool = make_pool(FakeClient(*[rate_limit_error(retry_after=0)] * 10))
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(pool.create_chat_completion(model="GigaChat"))
+    assert pool.members[0].client.calls == 4
+    assert pool.members[0].in_flight == 0
+
+
+def test_stream_stays_in_flight_until_it_ends():
+    async def chunks():
+        for chunk in ("a", "b"):
+            yield chunk
+
+    pool = make_pool(FakeClient(chunks()))
+    member = pool.members[0]
+
+    async def run():
+        stream = await pool.create_chat_completion(model="GigaChat", stream=True)
+        assert member.in_flight == 1
+        received = [chunk async for chunk in stream]
+        return received
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert member.in_flight == 0
+
+
+def test_abandoned_stream_is_released():
+    async def chunks():
+        while True:
+            yield "chunk"
+
+    member = PoolMember(index=0, scope="test", token_manager=None, client=None)
+    member.in_flight = 1
+
+    async def run():
+        stream = track_stream(chunks(), member)
+        assert await stream.__anext__() == "chunk"
+        await stream.aclose()
+
+    asyncio.run(run())
+    assert member.in_flight == 0
+
+
+def test_image_of_unknown_owner_is_tried_on_each_member(monkeypatch):
+    pool = make_pool(FakeClient(), FakeClient())
+    for member in pool.members:
+        member.token_manager = member.index
+    request = httpx.Request("GET", "https://example.com/files/abc/content")
+
+    async def fake_stream_image(file_id, token_manager):
+        if token_manager == 0:
+            response = httpx.Response(404, request=request)
+            raise httpx.HTTPStatusError("Not found", request=request, response=response)
+        yield b"image"
+
+    monkeypatch.setattr(llm_config_sber, "stream_image_async", fake_stream_image)
+
+    async def run():
+        return b"".join([chunk async for chunk in pool.stream_image("abc")])
+
+    assert asyncio.run(run()) == b"image"
+    assert pool.file_owners["abc"] is pool.members[1]
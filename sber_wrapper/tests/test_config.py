@@ -0,0 +1,27 @@
+import importlib
+
+import pytest
+from sber_wrapper import config
+
+
+@pytest.fixture
+def reload_config(monkeypatch):
+    def reload(**env):
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        return importlib.reload(config)
+
+    yield reload
+    monkeypatch.undo()
+    importlib.reload(config)
+
+
+def test_concurrency_overrides_are_parsed(reload_config):
+    module = reload_config(SBER_MODEL_CONCURRENCY_OVERRIDES='{"GigaChat-Max": "2"}')
+    assert module.MODEL_CONCURRENCY_OVERRIDES == {"GigaChat-Max": 2}
+
+
+@pytest.mark.parametrize("value", ["{GigaChat-Max: 2}", "[2]", '{"GigaChat": "x"}'])
+def test_malformed_concurrency_overrides_are_ignored(reload_config, value):
+    module = reload_config(SBER_MODEL_CONCURRENCY_OVERRIDES=value)
+    assert module.MODEL_CONCURRENCY_OVERRIDES == {}
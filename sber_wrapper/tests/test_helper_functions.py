@@ -0,0 +1,37 @@
+from sber_wrapper.helper_functions import get_completion_params
+
+
+def test_openai_parameters_are_forwarded():
+    body = {
+        "model": "GigaChat",
+        "messages": [{"role": "user", "content": "Hello"}],
+        "stream": True,
+        "temperature": 0.2,
+        "top_p": 0.9,
+        "stop": ["\n"],
+        "presence_penalty": 1.0,
+    }
+    assert get_completion_params(body) == {
+        "temperature": 0.2,
+        "top_p": 0.9,
+        "stop": ["\n"],
+    }
+
+
+def test_aliases_do_not_override_native_parameters():
+    assert get_completion_params({"max_completion_tokens": 100}) == {
+        "max_tokens": 100
+    }
+    assert get_completion_params(
+        {"max_completion_tokens": 100, "max_tokens": 50}
+    ) == {"max_tokens": 50}
+    assert get_completion_params(
+        {"max_tokens": 50, "max_completion_tokens": 100}
+    ) == {"max_tokens": 50}
+
+
+def test_gigachat_parameters_go_to_extra_body():
+    body = {"temperature": None, "repetition_penalty": 1.1, "profanity_check": None}
+    assert get_completion_params(body) == {
+        "extra_body": {"repetition_penalty": 1.1}
+    }
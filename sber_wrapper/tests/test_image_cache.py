@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+from sber_wrapper import image_cache as image_cache_module
+from sber_wrapper.image_cache import ImageCache
+
+
+class FakePool:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.downloads = 0
+
+    async def stream_image(self, file_id):
+        self.downloads += 1
+        await asyncio.sleep(0.01)
+        yield b"image-"
+        if self.fail:
+            raise RuntimeError("upstream failed")
+        yield file_id.encode()
+
+
+def test_concurrent_requests_download_once(tmp_path, monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(image_cache_module, "client_pool", pool)
+    cache = ImageCache(cache_dir=str(tmp_path), max_size=1024)
+
+    async def run():
+        return await asyncio.gather(*(cache.get("abc") for _ in range(5)))
+
+    paths = asyncio.run(run())
+    assert pool.downloads == 1
+    assert {path.read_bytes() for path in paths} == {b"image-abc"}
+    assert cache._locks == {} and cache._lock_users == {}
+
+
+def test_failed_download_leaves_no_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_cache_module, "client_pool", FakePool(fail=True))
+    cache = ImageCache(cache_dir=str(tmp_path), max_size=1024)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get("abc"))
+    assert list(tmp_path.iterdir()) == []
+    assert cache._locks == {} and cache._lock_users == {}
+
+
+def test_least_recently_used_images_are_evicted(tmp_path):
+    cache = ImageCache(cache_dir=str(tmp_path), max_size=10)
+    for name, mtime in (("old", 1), ("new", 2)):
+        path = tmp_path / f"{name}.jpg"
+        path.write_bytes(b"x" * 8)
+        image_cache_module.os.utime(path, (mtime, mtime))
+
+    cache.evict()
+    assert [path.name for path in tmp_path.iterdir()] == ["new.jpg"]
+
+
+def test_image_evicted_before_it_is_read_is_fetched_again(tmp_path, monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(image_cache_module, "client_pool", pool)
+    cache = ImageCache(cache_dir=str(tmp_path), max_size=1024)
+    (tmp_path / "abc.jpg").write_bytes(b"cached")
+
+    original_get = cache.get
+
+    async def get_then_evict(file_id):
+        path = await original_get(file_id)
+        if pool.downloads == 0:
+            # Another download's eviction removes the file right after get()
+            path.unlink()
+        return path
+
+    monkeypatch.setattr(cache, "get", get_then_evict)
+
+    assert asyncio.run(cache.read("abc")) == b"image-abc"
+    assert pool.downloads == 1
+
+
+def test_evicted_image_is_downloaded_again(tmp_path, monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(image_cache_module, "client_pool", pool)
+    cache = ImageCache(cache_dir=str(tmp_path), max_size=1024)
+
+    path = asyncio.run(cache.get("abc"))
+    path.unlink()
+    assert asyncio.run(cache.get("abc")).read_bytes() == b"image-abc"
+    assert pool.downloads == 2
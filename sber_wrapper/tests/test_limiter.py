@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+from sber_wrapper.limiter import ModelLimiter, QueueFullError
+
+
+def test_waiters_get_slots_in_arrival_order():
+    async def run():
+        limiter = ModelLimiter(max_concurrency=1, max_queue=10, overrides={})
+        order = []
+
+        async def request(name):
+            position = await limiter.acquire("GigaChat")
+            order.append((name, position))
+            await asyncio.sleep(0)
+            limiter.release("GigaChat")
+
+        await limiter.acquire("GigaChat")
+        tasks = [asyncio.create_task(request(name)) for name in "abc"]
+        await asyncio.sleep(0)
+        assert limiter.get_stats()["GigaChat"]["queued"] == 3
+
+        limiter.release("GigaChat")
+        await asyncio.gather(*tasks)
+        return limiter, order
+
+    limiter, order = asyncio.run(run())
+    assert order == [("a", 1), ("b", 2), ("c", 3)]
+    assert limiter.get_stats()["GigaChat"] == {
+        "active": 0,
+        "queued": 0,
+        "max_concurrency": 1,
+    }
+
+
+def test_release_hands_slot_over_before_newcomers():
+    async def run():
+        limiter = ModelLimiter(max_concurrency=1, max_queue=10, overrides={})
+        await limiter.acquire("GigaChat")
+        waiter = asyncio.create_task(limiter.acquire("GigaChat"))
+        await asyncio.sleep(0)
+
+        limiter.release("GigaChat")
+        # The slot now belongs to the waiter, a newcomer has to queue
+        newcomer = asyncio.create_task(limiter.acquire("GigaChat"))
+        await asyncio.sleep(0)
+        assert waiter.done() and not newcomer.done()
+        assert limiter.get_stats()["GigaChat"]["active"] == 1
+
+        limiter.release("GigaChat")
+        await newcomer
+        limiter.release("GigaChat")
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.get_stats()["GigaChat"]["active"] == 0
+
+
+def test_full_queue_is_rejected():
+    async def run():
+        limiter = ModelLimiter(max_concurrency=1, max_queue=1, overrides={})
+        await limiter.acquire("GigaChat")
+        waiter = asyncio.create_task(limiter.acquire("GigaChat"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(QueueFullError) as exc_info:
+            await limiter.acquire("GigaChat")
+        # Other models have their own slots
+        assert await limiter.acquire("GigaChat-Max") == 0
+
+        waiter.cancel()
+        return exc_info.value
+
+    error = asyncio.run(run())
+    assert error.model == "GigaChat"
+    assert error.queue_length == 1
+
+
+def test_overrides_set_per_model_concurrency():
+    async def run():
+        limiter = ModelLimiter(
+            max_concurrency=1, max_queue=0, overrides={"GigaChat": 2}
+        )
+        await limiter.acquire("GigaChat")
+        await limiter.acquire("GigaChat")
+        with pytest.raises(QueueFullError):
+            await limiter.acquire("GigaChat")
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.get_stats()["GigaChat"]["active"] == 2
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        limiter = ModelLimiter(max_concurrency=1, max_queue=10, overrides={})
+        await limiter.acquire("GigaChat")
+        cancelled = asyncio.create_task(limiter.acquire("GigaChat"))
+        waiter = asyncio.create_task(limiter.acquire("GigaChat"))
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        assert limiter.get_stats()["GigaChat"]["queued"] == 1
+
+        limiter.release("GigaChat")
+        assert await waiter == 2
+        limiter.release("GigaChat")
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.get_stats()["GigaChat"]["active"] == 0
+
+
+def test_slot_handed_to_cancelled_waiter_is_passed_on():
+    async def run():
+        limiter = ModelLimiter(max_concurrency=1, max_queue=10, overrides={})
+        await limiter.acquire("GigaChat")
+        first = asyncio.create_task(limiter.acquire("GigaChat"))
+        second = asyncio.create_task(limiter.acquire("GigaChat"))
+        await asyncio.sleep(0)
+
+        # The slot is handed to the first waiter, which is cancelled before
+        # it gets to run
+        limiter.release("GigaChat")
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+
+        assert await second == 2
+        assert limiter.get_stats()["GigaChat"]["active"] == 1
+        limiter.release("GigaChat")
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.get_stats()["GigaChat"]["active"] == 0
@@ -0,0 +1,21 @@
+from sber_wrapper.model_catalog import ModelCatalog
+
+
+def test_unknown_models_share_one_label():
+    catalog = ModelCatalog()
+    catalog._build([{"id": "GigaChat"}, {"id": "GigaChat-Max"}], 0)
+
+    assert catalog.get_label("GigaChat-Max") == "GigaChat-Max"
+    assert catalog.get_label("GigaChat-Max-preview") == "other"
+    assert catalog.get_label("a" * 1000) == "other"
+
+
+def test_etag_changes_with_the_model_list():
+    catalog = ModelCatalog()
+    catalog._build([{"id": "GigaChat"}], 0)
+    etag = catalog.etag
+
+    catalog._build([{"id": "GigaChat"}], 0)
+    assert catalog.etag == etag
+    catalog._build([{"id": "GigaChat"}, {"id": "GigaChat-Pro"}], 0)
+    assert catalog.etag != etag
@@ -0,0 +1,53 @@
+from sber_wrapper import response_cache as response_cache_module
+from sber_wrapper.response_cache import ResponseCache, get_cache_key, is_cacheable
+
+BODY = {
+    "model": "GigaChat",
+    "messages": [{"role": "user", "content": "Hello"}],
+    "temperature": 0,
+}
+
+
+def test_cache_key_ignores_transport_fields():
+    assert get_cache_key(BODY) == get_cache_key(
+        {**BODY, "stream": False, "user": "alice"}
+    )
+    assert get_cache_key(BODY) == get_cache_key(dict(reversed(BODY.items())))
+    assert get_cache_key(BODY) != get_cache_key({**BODY, "temperature": 0.5})
+
+
+def test_is_cacheable():
+    assert is_cacheable(BODY)
+    assert not is_cacheable({**BODY, "temperature": 0.7})
+    assert is_cacheable({**BODY, "temperature": 0.7}, "force")
+    assert not is_cacheable(BODY, "bypass")
+    assert not is_cacheable({**BODY, "stream": True}, "force")
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    cache.set("a", {"id": "a"})
+    cache.set("b", {"id": "b"})
+    assert cache.get("a") == {"id": "a"}
+
+    cache.set("c", {"id": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"id": "a"}
+    assert cache.get("c") == {"id": "c"}
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(response_cache_module.time, "time", lambda: now)
+    cache = ResponseCache(max_entries=10, ttl=60)
+    cache.set("a", {"id": "a"})
+    assert cache.get("a") == {"id": "a"}
+
+    now += 61
+    assert cache.get("a") is None
+    assert cache.entries == {}
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from sber_wrapper.llm_configs import llm_config_sber
+from sber_wrapper.llm_configs.llm_config_sber import SberTokenManager
+
+
+class FakeAuth:
+    """OAuth endpoint handing out token-1, token-2, ... valid for `ttl` seconds."""
+
+    def __init__(self, ttl=1800):
+        self.ttl = ttl
+        self.requests = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        # Let concurrent callers pile up behind the refresh
+        await asyncio.sleep(0.01)
+        return httpx.Response(
+            200,
+            content=json.dumps(
+                {
+                    "access_token": f"token-{self.requests}",
+                    "expires_at": int((time.time() + self.ttl) * 1000),
+                }
+            ),
+        )
+
+
+@pytest.fixture
+def auth(monkeypatch):
+    fake = FakeAuth()
+    monkeypatch.setattr(
+        llm_config_sber,
+        "http_client",
+        httpx.AsyncClient(transport=httpx.MockTransport(fake)),
+    )
+    return fake
+
+
+def test_concurrent_callers_share_one_refresh(auth):
+    async def run():
+        manager = SberTokenManager("key", "scope")
+        return await asyncio.gather(*(manager.get_token() for _ in range(10)))
+
+    assert asyncio.run(run()) == ["token-1"] * 10
+    assert auth.requests == 1
+
+
+def test_rejected_token_is_only_refreshed_once(auth):
+    async def run():
+        manager = SberTokenManager("key", "scope")
+        token = await manager.get_token()
+        # Every request rejected with the same token asks for a refresh
+        return await asyncio.gather(
+            *(manager.refresh(rejected_token=token) for _ in range(5))
+        )
+
+    assert asyncio.run(run()) == ["token-2"] * 5
+    assert auth.requests == 2
+
+
+def test_stale_rejection_does_not_refresh_again(auth):
+    async def run():
+        manager = SberTokenManager("key", "scope")
+        old_token = await manager.get_token()
+        await manager.refresh(rejected_token=old_token)
+        # A late 401 for the old token must not rotate the new one
+        return await manager.refresh(rejected_token=old_token)
+
+    assert asyncio.run(run()) == "token-2"
+    assert auth.requests == 2
+
+
+def test_token_is_refreshed_in_the_background_before_it_expires(auth):
+    auth.ttl = 2
+
+    async def run():
+        manager = SberTokenManager("key", "scope", refresh_margin=1)
+        token = await manager.get_token()
+        manager.start()
+        try:
+            # Due one second before expiry, the background task refreshes it
+            await asyncio.sleep(1.5)
+            return token, manager.token, manager.is_fresh()
+        finally:
+            await manager.close()
+
+    token, current_token, is_fresh = asyncio.run(run())
+    assert (token, current_token) == ("token-1", "token-2")
+    assert is_fresh
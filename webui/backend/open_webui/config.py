@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import os
@@ -7,12 +8,13 @@ from pathlib import Path
 from typing import Generic, Optional, TypeVar
 from urllib.parse import urlparse
 
-import chromadb
 import requests
 from pydantic import BaseModel
-from sqlalchemy import JSON, Column, DateTime, Integer, func
+from sqlalchemy import JSON, Column, DateTime, Integer, func, update
 
 from open_webui.env import (
+    CONFIG_SYNC_POLL_INTERVAL,
+    CONFIG_SYNC_REDIS_URL,
     DATA_DIR,
     DATABASE_URL,
     ENV,
@@ -76,18 +78,66 @@ def load_json_config():
         return json.load(file)
 
 
+# Version of the config entry CONFIG_DATA was loaded from, bumped on every save
+# so that other workers can tell their copy is stale
+CONFIG_VERSION: Optional[int] = None
+CONFIG_SYNC_CHANNEL = "open-webui:config"
+config_sync_redis = None
+
+
+def publish_config_version(version: int):
+    global config_sync_redis
+
+    if not CONFIG_SYNC_REDIS_URL:
+        return
+
+    try:
+        if config_sync_redis is None:
+            import redis
+
+            config_sync_redis = redis.Redis.from_url(
+                CONFIG_SYNC_REDIS_URL, decode_responses=True
+            )
+        config_sync_redis.publish(
+            CONFIG_SYNC_CHANNEL, json.dumps({"version": version, "pid": os.getpid()})
+        )
+    except Exception as e:
+        log.warning(f"Failed to publish config change: {e}")
+
+
 def save_to_db(data):
+    global CONFIG_VERSION
+
     with get_db() as db:
-        existing_config = db.query(Config).first()
+        existing_config = db.query(Config.id).first()
         if not existing_config:
             new_config = Config(data=data, version=0)
             db.add(new_config)
+            version = 0
         else:
-            existing_config.data = data
-            existing_config.updated_at = datetime.now()
-            db.add(existing_config)
+            # Incremented by the database, so that concurrent saves from
+            # several workers each get their own version
+            db.execute(
+                update(Config)
+                .where(Config.id == existing_config.id)
+                .values(
+                    data=data,
+                    version=func.coalesce(Config.version, 0) + 1,
+                    updated_at=datetime.now(),
+                )
+            )
+            # The row stays locked by the update until the commit, this reads
+            # the version it wrote
+            version = (
+                db.query(Config.version)
+                .filter(Config.id == existing_config.id)
+                .scalar()
+            )
         db.commit()
 
+    CONFIG_VERSION = version
+    publish_config_version(version)
+
 
 def reset_config():
     with get_db() as db:
@@ -160,7 +210,16 @@ def get_config():
         return config_entry.data if config_entry else DEFAULT_CONFIG
 
 
+def get_config_version() -> Optional[int]:
+    with get_db() as db:
+        config_entry = (
+            db.query(Config.version).order_by(Config.id.desc()).limit(1).first()
+        )
+        return config_entry.version if config_entry else None
+
+
 CONFIG_DATA = get_config()
+CONFIG_VERSION = get_config_version()
 
 
 def get_config_value(config_path: str):
@@ -193,6 +252,79 @@ def save_config(config):
     return True
 
 
+def refresh_config() -> bool:
+    """
+    Reload CONFIG_DATA and every PersistentConfig if another worker saved a
+    different config version. Costs a single-column query when nothing changed.
+    """
+    global CONFIG_DATA
+    global CONFIG_VERSION
+
+    if get_config_version() == CONFIG_VERSION:
+        return False
+
+    with get_db() as db:
+        config_entry = db.query(Config).order_by(Config.id.desc()).first()
+        CONFIG_DATA = config_entry.data if config_entry else DEFAULT_CONFIG
+        CONFIG_VERSION = config_entry.version if config_entry else None
+
+    for config_item in PERSISTENT_CONFIG_REGISTRY:
+        config_item.update()
+
+    log.info(f"Reloaded config version {CONFIG_VERSION}")
+    return True
+
+
+async def poll_config_changes(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(refresh_config)
+        except Exception as e:
+            log.warning(f"Config sync check failed: {e}")
+
+
+async def subscribe_config_changes():
+    import redis.asyncio as aioredis
+
+    while True:
+        try:
+            client = aioredis.from_url(CONFIG_SYNC_REDIS_URL, decode_responses=True)
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(CONFIG_SYNC_CHANNEL)
+                # Catch up on changes published before we subscribed
+                await asyncio.to_thread(refresh_config)
+
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    if json.loads(message["data"]).get("version") != CONFIG_VERSION:
+                        await asyncio.to_thread(refresh_config)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning(f"Config sync subscription failed, retrying: {e}")
+            await asyncio.sleep(5)
+
+
+async def sync_config_changes():
+    """
+    Keep this worker's config in line with changes saved by other workers,
+    through Redis pub/sub when CONFIG_SYNC_REDIS_URL is set and by polling the
+    config version in the database otherwise.
+    """
+    tasks = []
+    if CONFIG_SYNC_REDIS_URL:
+        tasks.append(subscribe_config_changes())
+        if CONFIG_SYNC_POLL_INTERVAL:
+            # Rare safety net for notifications missed while disconnected
+            tasks.append(poll_config_changes(CONFIG_SYNC_POLL_INTERVAL * 12))
+    elif CONFIG_SYNC_POLL_INTERVAL:
+        tasks.append(poll_config_changes(CONFIG_SYNC_POLL_INTERVAL))
+
+    await asyncio.gather(*tasks)
+
+
 T = TypeVar("T")
 
 
@@ -228,12 +360,18 @@ class PersistentConfig(Generic[T]):
 
     def update(self):
         new_value = get_config_value(self.config_path)
-        if new_value is not None:
+        if new_value is not None and new_value != self.value:
             self.value = new_value
             log.info(f"Updated {self.env_name} to new value {self.value}")
 
     def save(self):
         log.info(f"Saving '{self.env_name}' to the database")
+
+        # Pick up changes from other workers first, so they are not overwritten
+        value = self.value
+        refresh_config()
+        self.value = value
+
         path_parts = self.config_path.split(".")
         sub_config = CONFIG_DATA
         for key in path_parts[:-1]:
@@ -1133,6 +1271,24 @@ JSON format: { "tags": ["tag1", "tag2", "tag3"] }
 {{MESSAGES:END:6}}
 </chat_history>"""
 
+DEFAULT_METADATA_GENERATION_PROMPT_TEMPLATE = """### Task:
+Generate a concise title and tags for the chat history.
+
+### Guidelines:
+- The title is 3-5 words, may start with a suitable emoji and avoids quotation marks or special formatting
+- Generate 1-3 broad tags categorizing the main themes of the chat history, along with 1-3 more specific subtopic tags
+- Start tags with high-level domains (e.g. Science, Technology, Philosophy, Arts, Politics, Business, Health, Sports, Entertainment, Education)
+- If content is too short (less than 3 messages) or too diverse, use only ["General"] as tags
+- Use the chat's primary language; default to English if multilingual
+
+### Output:
+JSON format: { "title": "Title text", "tags": ["tag1", "tag2", "tag3"] }
+
+### Chat History:
+<chat_history>
+{{MESSAGES:END:6}}
+</chat_history>"""
+
 IMAGE_PROMPT_GENERATION_PROMPT_TEMPLATE = PersistentConfig(
     "IMAGE_PROMPT_GENERATION_PROMPT_TEMPLATE",
     "task.image.prompt_template",
@@ -1277,7 +1433,7 @@ TOOLS_FUNCTION_CALLING_PROMPT_TEMPLATE = PersistentConfig(
 )
 
 
-DEFAULT_TOOLS_FUNCTION_CALLING_PROMPT_TEMPLATE = """Available Tools: {{TOOLS}}\nReturn an empty string if no tools match the query. If a function tool matches, construct and return a JSON object in the format {\"name\": \"functionName\", \"parameters\": {\"requiredFunctionParamKey\": \"requiredFunctionParamValue\"}} using the appropriate tool and its parameters. Only return the object and limit the response to the JSON object without additional text."""
+DEFAULT_TOOLS_FUNCTION_CALLING_PROMPT_TEMPLATE = """Available Tools: {{TOOLS}}\nReturn an empty string if no tools match the query. If function tools match, construct and return a JSON object in the format {\"tool_calls\": [{\"name\": \"functionName\", \"parameters\": {\"requiredFunctionParamKey\": \"requiredFunctionParamValue\"}}]} using the appropriate tools and their parameters. Include one entry per call when several independent calls are needed to answer the query. Only return the object and limit the response to the JSON object without additional text."""
 
 
 DEFAULT_EMOJI_GENERATION_PROMPT_TEMPLATE = """Your task is to reflect the speaker's likely facial expression through a fitting emoji. Interpret emotions from the message and reflect their facial expression using fitting, diverse emojis (e.g., 😊, 😢, 😡, 😱).
@@ -1298,8 +1454,10 @@ VECTOR_DB = os.environ.get("VECTOR_DB", "chroma")
 
 # Chroma
 CHROMA_DATA_PATH = f"{DATA_DIR}/vector_db"
-CHROMA_TENANT = os.environ.get("CHROMA_TENANT", chromadb.DEFAULT_TENANT)
-CHROMA_DATABASE = os.environ.get("CHROMA_DATABASE", chromadb.DEFAULT_DATABASE)
+# Defaults match chromadb.DEFAULT_TENANT and DEFAULT_DATABASE, inlined so that
+# chromadb is only imported when it is the configured vector database
+CHROMA_TENANT = os.environ.get("CHROMA_TENANT", "default_tenant")
+CHROMA_DATABASE = os.environ.get("CHROMA_DATABASE", "default_database")
 CHROMA_HTTP_HOST = os.environ.get("CHROMA_HTTP_HOST", "")
 CHROMA_HTTP_PORT = int(os.environ.get("CHROMA_HTTP_PORT", "8000"))
 CHROMA_CLIENT_AUTH_PROVIDER = os.environ.get("CHROMA_CLIENT_AUTH_PROVIDER", "")
@@ -1447,6 +1605,35 @@ RAG_EMBEDDING_MODEL_TRUST_REMOTE_CODE = (
     os.environ.get("RAG_EMBEDDING_MODEL_TRUST_REMOTE_CODE", "True").lower() == "true"
 )
 
+# SentenceTransformer backend for the local embedding model: "torch", "onnx" or "openvino"
+RAG_EMBEDDING_MODEL_BACKEND = os.environ.get(
+    "RAG_EMBEDDING_MODEL_BACKEND", "torch"
+).lower()
+
+# Optional model file for the onnx/openvino backends, e.g. a quantized
+# "onnx/model_qint8_avx512_vnni.onnx"
+RAG_EMBEDDING_MODEL_FILE_NAME = os.environ.get("RAG_EMBEDDING_MODEL_FILE_NAME", "")
+
+# Concurrent local embedding requests are collected and encoded as one batch
+ENABLE_RAG_EMBEDDING_MICRO_BATCHING = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_MICRO_BATCHING", "True").lower() == "true"
+)
+
+try:
+    RAG_EMBEDDING_MICRO_BATCH_MAX_SIZE = max(
+        int(os.environ.get("RAG_EMBEDDING_MICRO_BATCH_MAX_SIZE", "64")), 1
+    )
+except Exception:
+    RAG_EMBEDDING_MICRO_BATCH_MAX_SIZE = 64
+
+# Milliseconds the first request of a batch waits for others to join
+try:
+    RAG_EMBEDDING_MICRO_BATCH_MAX_LATENCY = max(
+        float(os.environ.get("RAG_EMBEDDING_MICRO_BATCH_MAX_LATENCY", "5")), 0
+    )
+except Exception:
+    RAG_EMBEDDING_MICRO_BATCH_MAX_LATENCY = 5
+
 RAG_EMBEDDING_BATCH_SIZE = PersistentConfig(
     "RAG_EMBEDDING_BATCH_SIZE",
     "rag.embedding_batch_size",
@@ -1473,6 +1660,21 @@ RAG_RERANKING_MODEL_TRUST_REMOTE_CODE = (
     os.environ.get("RAG_RERANKING_MODEL_TRUST_REMOTE_CODE", "True").lower() == "true"
 )
 
+# Where ColBERT document token embeddings are stored, empty disables the store
+RAG_COLBERT_EMBEDDINGS_DIR = os.environ.get(
+    "RAG_COLBERT_EMBEDDINGS_DIR", f"{CACHE_DIR}/colbert"
+)
+# Size of that store in MB, the least recently used embeddings are evicted beyond
+# it, 0 means unbounded
+RAG_COLBERT_EMBEDDINGS_MAX_SIZE = os.environ.get(
+    "RAG_COLBERT_EMBEDDINGS_MAX_SIZE", "2048"
+)
+
+try:
+    RAG_COLBERT_EMBEDDINGS_MAX_SIZE = max(int(RAG_COLBERT_EMBEDDINGS_MAX_SIZE), 0)
+except Exception:
+    RAG_COLBERT_EMBEDDINGS_MAX_SIZE = 2048
+
 
 RAG_TEXT_SPLITTER = PersistentConfig(
     "RAG_TEXT_SPLITTER",
@@ -1979,6 +2181,25 @@ AUDIO_STT_MODEL = PersistentConfig(
     os.getenv("AUDIO_STT_MODEL", ""),
 )
 
+# Recordings longer than this many seconds are split on silence into chunks
+# that are transcribed concurrently; chunks are 16 kHz mono WAV, so keep this
+# under ~780 seconds to stay within the 25 MB upload limit of the OpenAI API
+try:
+    AUDIO_STT_CHUNK_MAX_DURATION = max(
+        float(os.getenv("AUDIO_STT_CHUNK_MAX_DURATION", "600")), 30
+    )
+except Exception:
+    AUDIO_STT_CHUNK_MAX_DURATION = 600
+
+# Chunks transcribed at the same time per request, also the number of
+# faster-whisper workers
+try:
+    AUDIO_STT_MAX_CONCURRENCY = max(
+        int(os.getenv("AUDIO_STT_MAX_CONCURRENCY", "4")), 1
+    )
+except Exception:
+    AUDIO_STT_MAX_CONCURRENCY = 4
+
 AUDIO_TTS_OPENAI_API_BASE_URL = PersistentConfig(
     "AUDIO_TTS_OPENAI_API_BASE_URL",
     "audio.tts.openai.api_base_url",
@@ -2035,6 +2256,27 @@ AUDIO_TTS_AZURE_SPEECH_OUTPUT_FORMAT = PersistentConfig(
     ),
 )
 
+# Synthesized speech is cached on disk, bounded by total size in MB and by
+# days since last use (0 disables the respective limit)
+try:
+    AUDIO_TTS_CACHE_MAX_SIZE = (
+        max(int(os.getenv("AUDIO_TTS_CACHE_MAX_SIZE", "1024")), 0) * 1024 * 1024
+    )
+except Exception:
+    AUDIO_TTS_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+
+try:
+    AUDIO_TTS_CACHE_MAX_AGE = (
+        max(float(os.getenv("AUDIO_TTS_CACHE_MAX_AGE", "30")), 0) * 24 * 60 * 60
+    )
+except Exception:
+    AUDIO_TTS_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
+# Relay speech to the client while it is being synthesized and cached
+ENABLE_AUDIO_TTS_STREAMING = (
+    os.getenv("ENABLE_AUDIO_TTS_STREAMING", "True").lower() == "true"
+)
+
 
 ####################################
 # LDAP
@@ -71,6 +71,9 @@ class ERROR_MESSAGES(str, Enum):
         lambda err="": f"Invalid format. Please use the correct format{err}"
     )
     RATE_LIMIT_EXCEEDED = "API rate limit exceeded"
+    TASK_LIMIT_EXCEEDED = (
+        lambda limit="": f"You already have {limit} responses generating. Please wait for one to finish or stop it before starting another."
+    )
 
     MODEL_NOT_FOUND = lambda name="": f"Model '{name}' was not found"
     OPENAI_NOT_FOUND = lambda name="": "OpenAI API was not found"
@@ -102,6 +105,7 @@ class ERROR_MESSAGES(str, Enum):
         "Duplicate content detected. Please provide unique content to proceed."
     )
     FILE_NOT_PROCESSED = "Extracted content is not available for this file. Please ensure that the file is processed before proceeding."
+    MODELS_LOADING = "The retrieval models are still loading. Please try again shortly."
 
 
 class TASKS(str, Enum):
@@ -111,6 +115,7 @@ class TASKS(str, Enum):
     DEFAULT = lambda task="": f"{task if task else 'generation'}"
     TITLE_GENERATION = "title_generation"
     TAGS_GENERATION = "tags_generation"
+    METADATA_GENERATION = "metadata_generation"
     EMOJI_GENERATION = "emoji_generation"
     QUERY_GENERATION = "query_generation"
     IMAGE_PROMPT_GENERATION = "image_prompt_generation"
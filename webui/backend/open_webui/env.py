@@ -5,12 +5,16 @@ import os
 import pkgutil
 import sys
 import shutil
+import time
 from pathlib import Path
 
 import markdown
 from bs4 import BeautifulSoup
 from open_webui.constants import ERROR_MESSAGES
 
+# Reference point for the startup timing report in main.py
+STARTUP_TIMESTAMP = time.perf_counter()
+
 ####################################
 # Load .env file
 ####################################
@@ -53,13 +57,15 @@ if USE_CUDA.lower() == "true":
 else:
     DEVICE_TYPE = "cpu"
 
-try:
-    import torch
+# MPS only exists on macOS; importing torch elsewhere just slows down startup
+if DEVICE_TYPE == "cpu" and sys.platform == "darwin":
+    try:
+        import torch
 
-    if torch.backends.mps.is_available() and torch.backends.mps.is_built():
-        DEVICE_TYPE = "mps"
-except Exception:
-    pass
+        if torch.backends.mps.is_available() and torch.backends.mps.is_built():
+            DEVICE_TYPE = "mps"
+    except Exception:
+        pass
 
 ####################################
 # LOGGING
@@ -377,6 +383,17 @@ WEBSOCKET_MANAGER = os.environ.get("WEBSOCKET_MANAGER", "")
 
 WEBSOCKET_REDIS_URL = os.environ.get("WEBSOCKET_REDIS_URL", REDIS_URL)
 
+# Milliseconds over which streamed message snapshots are coalesced into one
+# socket event per chat message, 0 emits every token
+WEBSOCKET_EVENT_BATCH_INTERVAL = os.environ.get("WEBSOCKET_EVENT_BATCH_INTERVAL", "50")
+
+try:
+    WEBSOCKET_EVENT_BATCH_INTERVAL = (
+        max(float(WEBSOCKET_EVENT_BATCH_INTERVAL), 0) / 1000
+    )
+except Exception:
+    WEBSOCKET_EVENT_BATCH_INTERVAL = 0.05
+
 AIOHTTP_CLIENT_TIMEOUT = os.environ.get("AIOHTTP_CLIENT_TIMEOUT", "")
 
 if AIOHTTP_CLIENT_TIMEOUT == "":
@@ -401,6 +418,168 @@ else:
     except Exception:
         AIOHTTP_CLIENT_TIMEOUT_OPENAI_MODEL_LIST = 5
 
+####################################
+# CONFIG SYNC
+####################################
+
+# Redis used to notify other workers of config changes, defaults to the
+# websocket Redis when that is enabled; without it workers poll the database
+CONFIG_SYNC_REDIS_URL = os.environ.get(
+    "CONFIG_SYNC_REDIS_URL",
+    WEBSOCKET_REDIS_URL if WEBSOCKET_MANAGER == "redis" else "",
+)
+
+# Seconds between config version checks against the database, 0 disables them
+CONFIG_SYNC_POLL_INTERVAL = os.environ.get("CONFIG_SYNC_POLL_INTERVAL", "5")
+
+try:
+    CONFIG_SYNC_POLL_INTERVAL = max(float(CONFIG_SYNC_POLL_INTERVAL), 0)
+except Exception:
+    CONFIG_SYNC_POLL_INTERVAL = 5
+
+####################################
+# TASKS
+####################################
+
+# Redis holding the cross-worker registry of running chat generations,
+# defaults to the websocket Redis when that is enabled
+TASKS_REDIS_URL = os.environ.get(
+    "TASKS_REDIS_URL",
+    WEBSOCKET_REDIS_URL if WEBSOCKET_MANAGER == "redis" else "",
+)
+
+# Chat generations a user may run at the same time, 0 means unlimited
+TASKS_MAX_CONCURRENT_PER_USER = os.environ.get("TASKS_MAX_CONCURRENT_PER_USER", "0")
+
+try:
+    TASKS_MAX_CONCURRENT_PER_USER = max(int(TASKS_MAX_CONCURRENT_PER_USER), 0)
+except Exception:
+    TASKS_MAX_CONCURRENT_PER_USER = 0
+
+####################################
+# PIPELINES
+####################################
+
+# Seconds a single inlet/outlet filter call may take before it is skipped
+PIPELINE_FILTER_TIMEOUT = os.environ.get("PIPELINE_FILTER_TIMEOUT", "30")
+
+try:
+    PIPELINE_FILTER_TIMEOUT = int(PIPELINE_FILTER_TIMEOUT)
+except Exception:
+    PIPELINE_FILTER_TIMEOUT = 30
+
+# Outlet filters sharing a priority are treated as independent and called concurrently
+ENABLE_PIPELINE_OUTLET_FILTER_CONCURRENCY = (
+    os.environ.get("ENABLE_PIPELINE_OUTLET_FILTER_CONCURRENCY", "False").lower()
+    == "true"
+)
+
+####################################
+# FUNCTIONS
+####################################
+
+# Threads shared by all synchronous pipe functions and generators
+FUNCTIONS_PIPE_THREAD_POOL_SIZE = os.environ.get("FUNCTIONS_PIPE_THREAD_POOL_SIZE", "16")
+
+try:
+    FUNCTIONS_PIPE_THREAD_POOL_SIZE = max(int(FUNCTIONS_PIPE_THREAD_POOL_SIZE), 1)
+except Exception:
+    FUNCTIONS_PIPE_THREAD_POOL_SIZE = 16
+
+# Threads consuming synchronous pipe generators, each one is held for the
+# whole stream
+FUNCTIONS_PIPE_STREAM_THREAD_POOL_SIZE = os.environ.get(
+    "FUNCTIONS_PIPE_STREAM_THREAD_POOL_SIZE", "64"
+)
+
+try:
+    FUNCTIONS_PIPE_STREAM_THREAD_POOL_SIZE = max(
+        int(FUNCTIONS_PIPE_STREAM_THREAD_POOL_SIZE), 1
+    )
+except Exception:
+    FUNCTIONS_PIPE_STREAM_THREAD_POOL_SIZE = 64
+
+# Concurrent executions allowed per pipe function, 0 means unlimited
+FUNCTIONS_PIPE_MAX_CONCURRENCY = os.environ.get("FUNCTIONS_PIPE_MAX_CONCURRENCY", "0")
+
+try:
+    FUNCTIONS_PIPE_MAX_CONCURRENCY = max(int(FUNCTIONS_PIPE_MAX_CONCURRENCY), 0)
+except Exception:
+    FUNCTIONS_PIPE_MAX_CONCURRENCY = 0
+
+####################################
+# TOOLS
+####################################
+
+# Seconds a compiled toolkit is trusted before it is revalidated against the database
+TOOLS_REGISTRY_TTL = os.environ.get("TOOLS_REGISTRY_TTL", "60")
+
+try:
+    TOOLS_REGISTRY_TTL = int(TOOLS_REGISTRY_TTL)
+except Exception:
+    TOOLS_REGISTRY_TTL = 60
+
+# Seconds a single tool call may run before its result is replaced by an error
+TOOLS_FUNCTION_CALLING_TIMEOUT = os.environ.get("TOOLS_FUNCTION_CALLING_TIMEOUT", "60")
+
+try:
+    TOOLS_FUNCTION_CALLING_TIMEOUT = int(TOOLS_FUNCTION_CALLING_TIMEOUT)
+except Exception:
+    TOOLS_FUNCTION_CALLING_TIMEOUT = 60
+
+# Maximum number of characters of a tool result added to the context
+TOOLS_FUNCTION_CALLING_MAX_OUTPUT_LENGTH = os.environ.get(
+    "TOOLS_FUNCTION_CALLING_MAX_OUTPUT_LENGTH", "16000"
+)
+
+try:
+    TOOLS_FUNCTION_CALLING_MAX_OUTPUT_LENGTH = int(
+        TOOLS_FUNCTION_CALLING_MAX_OUTPUT_LENGTH
+    )
+except Exception:
+    TOOLS_FUNCTION_CALLING_MAX_OUTPUT_LENGTH = 16000
+
+####################################
+# WEBHOOK
+####################################
+
+WEBHOOK_TIMEOUT = os.environ.get("WEBHOOK_TIMEOUT", "10")
+
+try:
+    WEBHOOK_TIMEOUT = int(WEBHOOK_TIMEOUT)
+except Exception:
+    WEBHOOK_TIMEOUT = 10
+
+WEBHOOK_MAX_CONCURRENCY = os.environ.get("WEBHOOK_MAX_CONCURRENCY", "8")
+
+try:
+    WEBHOOK_MAX_CONCURRENCY = max(int(WEBHOOK_MAX_CONCURRENCY), 1)
+except Exception:
+    WEBHOOK_MAX_CONCURRENCY = 8
+
+WEBHOOK_MAX_RETRIES = os.environ.get("WEBHOOK_MAX_RETRIES", "3")
+
+try:
+    WEBHOOK_MAX_RETRIES = max(int(WEBHOOK_MAX_RETRIES), 0)
+except Exception:
+    WEBHOOK_MAX_RETRIES = 3
+
+# Seconds to wait for more notifications to the same URL before delivering them as one
+WEBHOOK_COALESCE_WINDOW = os.environ.get("WEBHOOK_COALESCE_WINDOW", "1")
+
+try:
+    WEBHOOK_COALESCE_WINDOW = max(float(WEBHOOK_COALESCE_WINDOW), 0.0)
+except Exception:
+    WEBHOOK_COALESCE_WINDOW = 1.0
+
+# Days failed notifications are kept in the outbox for inspection
+WEBHOOK_OUTBOX_RETENTION = os.environ.get("WEBHOOK_OUTBOX_RETENTION", "7")
+
+try:
+    WEBHOOK_OUTBOX_RETENTION = int(float(WEBHOOK_OUTBOX_RETENTION) * 24 * 60 * 60)
+except Exception:
+    WEBHOOK_OUTBOX_RETENTION = 7 * 24 * 60 * 60
+
 ####################################
 # OFFLINE_MODE
 ####################################
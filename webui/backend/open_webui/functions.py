@@ -2,6 +2,12 @@ import logging
 import sys
 import inspect
 import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import asynccontextmanager
+from functools import partial
 
 from pydantic import BaseModel
 from typing import AsyncGenerator, Generator, Iterator
@@ -31,7 +37,13 @@ from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.tools import get_tools
 from open_webui.utils.access_control import has_access
 
-from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    GLOBAL_LOG_LEVEL,
+    FUNCTIONS_PIPE_THREAD_POOL_SIZE,
+    FUNCTIONS_PIPE_STREAM_THREAD_POOL_SIZE,
+    FUNCTIONS_PIPE_MAX_CONCURRENCY,
+)
 
 from open_webui.utils.misc import (
     add_or_update_system_message,
@@ -51,6 +63,138 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 
+##################################
+#
+# Pipe execution
+#
+##################################
+
+# Synchronous pipes run here instead of on the event loop
+PIPE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=FUNCTIONS_PIPE_THREAD_POOL_SIZE, thread_name_prefix="pipe"
+)
+# Synchronous generators are consumed here, apart from the pipe calls as each
+# one holds its thread until the stream ends
+PIPE_STREAM_EXECUTOR = ThreadPoolExecutor(
+    max_workers=FUNCTIONS_PIPE_STREAM_THREAD_POOL_SIZE,
+    thread_name_prefix="pipe-stream",
+)
+
+PIPE_SEMAPHORES: dict[str, asyncio.Semaphore] = {}
+
+# pipe_id -> {"calls", "errors", "cancelled", "total_time", "max_time"},
+# times in seconds
+PIPE_METRICS: dict[str, dict] = {}
+
+
+def get_pipe_metrics() -> dict[str, dict]:
+    return {
+        pipe_id: {
+            **metrics,
+            "avg_time": (
+                metrics["total_time"] / metrics["calls"] if metrics["calls"] else 0.0
+            ),
+        }
+        for pipe_id, metrics in PIPE_METRICS.items()
+    }
+
+
+@asynccontextmanager
+async def pipe_slot(pipe_id: str):
+    """
+    Limit concurrent executions of a pipe and record how long each one takes.
+
+    Yields a dict whose "error" flag callers set for errors they handle
+    themselves. Cancellations, e.g. a client going away, are not errors.
+    """
+    semaphore = None
+    if FUNCTIONS_PIPE_MAX_CONCURRENCY > 0:
+        semaphore = PIPE_SEMAPHORES.setdefault(
+            pipe_id, asyncio.Semaphore(FUNCTIONS_PIPE_MAX_CONCURRENCY)
+        )
+        await semaphore.acquire()
+
+    metrics = PIPE_METRICS.setdefault(
+        pipe_id,
+        {"calls": 0, "errors": 0, "cancelled": 0, "total_time": 0.0, "max_time": 0.0},
+    )
+    call = {"error": False}
+    start_time = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        call["error"] = True
+        raise
+    except BaseException:
+        metrics["cancelled"] += 1
+        raise
+    finally:
+        duration = time.perf_counter() - start_time
+        metrics["calls"] += 1
+        if call["error"]:
+            metrics["errors"] += 1
+        metrics["total_time"] += duration
+        metrics["max_time"] = max(metrics["max_time"], duration)
+        log.debug(f"pipe {pipe_id} finished in {duration:.3f}s")
+
+        if semaphore is not None:
+            semaphore.release()
+
+
+async def run_in_pipe_executor(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(PIPE_EXECUTOR, partial(func, *args, **kwargs))
+
+
+async def iterate_in_pipe_executor(iterator: Iterator, maxsize: int = 64):
+    """
+    Iterate a synchronous iterator on a pipe executor thread and yield its
+    items asynchronously. The queue is bounded, so a slow consumer pauses the
+    producer, and the producer stops as soon as the consumer goes away.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while not stopped.is_set():
+            try:
+                future.result(timeout=0.5)
+                return True
+            except FutureTimeoutError:
+                continue
+        future.cancel()
+        return False
+
+    def produce():
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    break
+        except BaseException as e:
+            put((done, e))
+            return
+        finally:
+            if stopped.is_set() and hasattr(iterator, "close"):
+                iterator.close()
+        put((done, None))
+
+    loop.run_in_executor(PIPE_STREAM_EXECUTOR, produce)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                break
+            yield item
+    finally:
+        # The producer notices this before its next item and closes the iterator
+        stopped.set()
+
+
 def get_function_module_by_id(request: Request, pipe_id: str):
     # Check if function is already loaded
     if pipe_id not in request.app.state.FUNCTIONS:
@@ -138,13 +282,15 @@ async def generate_function_chat_completion(
         if inspect.iscoroutinefunction(pipe):
             return await pipe(**params)
         else:
-            return pipe(**params)
+            return await run_in_pipe_executor(pipe, **params)
 
     async def get_message_content(res: str | Generator | AsyncGenerator) -> str:
         if isinstance(res, str):
             return res
         if isinstance(res, Generator):
-            return "".join(map(str, res))
+            return "".join(
+                [str(stream) async for stream in iterate_in_pipe_executor(res)]
+            )
         if isinstance(res, AsyncGenerator):
             return "".join([str(stream) async for stream in res])
 
@@ -261,6 +407,11 @@ async def generate_function_chat_completion(
     if form_data.get("stream", False):
 
         async def stream_content():
+            async with pipe_slot(pipe_id) as call:
+                async for chunk in stream_pipe_content(call):
+                    yield chunk
+
+        async def stream_pipe_content(call: dict):
             try:
                 res = await execute_pipe(pipe, params)
 
@@ -275,6 +426,7 @@ async def generate_function_chat_completion(
 
             except Exception as e:
                 log.error(f"Error: {e}")
+                call["error"] = True
                 yield f"data: {json.dumps({'error': {'detail':str(e)}})}\n\n"
                 return
 
@@ -283,7 +435,7 @@ async def generate_function_chat_completion(
                 yield f"data: {json.dumps(message)}\n\n"
 
             if isinstance(res, Iterator):
-                for line in res:
+                async for line in iterate_in_pipe_executor(res):
                     yield process_line(form_data, line)
 
             if isinstance(res, AsyncGenerator):
@@ -300,17 +452,19 @@ async def generate_function_chat_completion(
 
         return StreamingResponse(stream_content(), media_type="text/event-stream")
     else:
-        try:
-            res = await execute_pipe(pipe, params)
+        async with pipe_slot(pipe_id) as call:
+            try:
+                res = await execute_pipe(pipe, params)
 
-        except Exception as e:
-            log.error(f"Error: {e}")
-            return {"error": {"detail": str(e)}}
+            except Exception as e:
+                log.error(f"Error: {e}")
+                call["error"] = True
+                return {"error": {"detail": str(e)}}
 
-        if isinstance(res, StreamingResponse) or isinstance(res, dict):
-            return res
-        if isinstance(res, BaseModel):
-            return res.model_dump()
+            if isinstance(res, StreamingResponse) or isinstance(res, dict):
+                return res
+            if isinstance(res, BaseModel):
+                return res.model_dump()
 
-        message = await get_message_content(res)
+            message = await get_message_content(res)
         return openai_chat_completion_message_template(form_data["model"], message)
@@ -48,6 +48,7 @@ from starlette.responses import Response, StreamingResponse
 from open_webui.socket.main import (
     app as socket_app,
     periodic_usage_pool_cleanup,
+    periodic_session_refresh,
 )
 from open_webui.routers import (
     audio,
@@ -81,6 +82,7 @@ from open_webui.routers.retrieval import (
     get_rf,
 )
 
+from open_webui.constants import ERROR_MESSAGES
 from open_webui.internal.db import Session
 
 from open_webui.models.functions import Functions
@@ -263,6 +265,7 @@ from open_webui.config import (
     AUTOCOMPLETE_GENERATION_INPUT_MAX_LENGTH,
     AppConfig,
     reset_config,
+    sync_config_changes,
 )
 from open_webui.env import (
     CHANGELOG,
@@ -280,6 +283,8 @@ from open_webui.env import (
     BYPASS_MODEL_ACCESS_CONTROL,
     RESET_CONFIG_ON_START,
     OFFLINE_MODE,
+    STARTUP_TIMESTAMP,
+    TASKS_MAX_CONCURRENT_PER_USER,
 )
 
 
@@ -303,8 +308,14 @@ from open_webui.utils.auth import (
 )
 from open_webui.utils.oauth import oauth_manager
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
+from open_webui.utils.webhook import webhook_dispatcher
 
-from open_webui.tasks import stop_task, list_tasks  # Import from tasks.py
+from open_webui.tasks import (
+    get_task_record,
+    list_tasks,
+    run_task_registry,
+    stop_task,
+)  # Import from tasks.py
 
 if SAFE_MODE:
     print("SAFE MODE ENABLED")
@@ -314,6 +325,21 @@ logging.basicConfig(stream=sys.stdout, level=GLOBAL_LOG_LEVEL)
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+# Seconds spent in each startup phase, logged once the app is ready
+STARTUP_TIMINGS = {}
+startup_phase_started_at = STARTUP_TIMESTAMP
+
+
+def record_startup_phase(name: str):
+    global startup_phase_started_at
+
+    now = time.perf_counter()
+    STARTUP_TIMINGS[name] = round(now - startup_phase_started_at, 3)
+    startup_phase_started_at = now
+
+
+record_startup_phase("imports")
+
 
 class SPAStaticFiles(StaticFiles):
     async def get_response(self, path: str, scope):
@@ -345,11 +371,28 @@ https://github.com/open-webui/open-webui
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    record_startup_phase("app setup")
+
     if RESET_CONFIG_ON_START:
         reset_config()
 
     asyncio.create_task(periodic_usage_pool_cleanup())
+    session_refresh_task = asyncio.create_task(periodic_session_refresh())
+    config_sync_task = asyncio.create_task(sync_config_changes())
+    task_registry_task = asyncio.create_task(run_task_registry())
+    await webhook_dispatcher.start()
+
+    # Models load in the background, /health/ready reports when they are done
+    warm_up_task = asyncio.create_task(warm_up_models(app))
+    record_startup_phase("lifespan startup")
     yield
+    if not warm_up_task.done():
+        warm_up_task.cancel()
+    config_sync_task.cancel()
+    task_registry_task.cancel()
+    session_refresh_task.cancel()
+    await webhook_dispatcher.stop()
+    await pipelines.close_filter_session()
 
 
 app = FastAPI(
@@ -360,6 +403,7 @@ app = FastAPI(
 )
 
 app.state.config = AppConfig()
+app.state.READY = False
 
 
 ########################################
@@ -534,38 +578,75 @@ app.state.rf = None
 app.state.YOUTUBE_LOADER_TRANSLATION = None
 
 
-try:
-    app.state.ef = get_ef(
-        app.state.config.RAG_EMBEDDING_ENGINE,
-        app.state.config.RAG_EMBEDDING_MODEL,
-        RAG_EMBEDDING_MODEL_AUTO_UPDATE,
+def get_embedding_config(app: FastAPI) -> tuple:
+    config = app.state.config
+    return (
+        config.RAG_EMBEDDING_ENGINE,
+        config.RAG_EMBEDDING_MODEL,
+        config.RAG_OPENAI_API_BASE_URL,
+        config.RAG_OPENAI_API_KEY,
+        config.RAG_OLLAMA_BASE_URL,
+        config.RAG_OLLAMA_API_KEY,
+        config.RAG_EMBEDDING_BATCH_SIZE,
     )
 
-    app.state.rf = get_rf(
-        app.state.config.RAG_RERANKING_MODEL,
-        RAG_RERANKING_MODEL_AUTO_UPDATE,
+
+def load_retrieval_models(app: FastAPI):
+    # An admin may update the models while they load, the loaded ones are
+    # only installed if the config they were loaded for is still current
+    embedding_config = get_embedding_config(app)
+    reranking_model = app.state.config.RAG_RERANKING_MODEL
+    engine, model, openai_url, openai_key, ollama_url, ollama_key, batch_size = (
+        embedding_config
+    )
+
+    ef = rf = None
+    try:
+        ef = get_ef(engine, model, RAG_EMBEDDING_MODEL_AUTO_UPDATE)
+        rf = get_rf(reranking_model, RAG_RERANKING_MODEL_AUTO_UPDATE)
+    except Exception as e:
+        log.error(f"Error updating models: {e}")
+        pass
+
+    embedding_function = get_embedding_function(
+        engine,
+        model,
+        ef,
+        openai_url if engine == "openai" else ollama_url,
+        openai_key if engine == "openai" else ollama_key,
+        batch_size,
+    )
+
+    if ef is not None:
+        try:
+            # The first encode initializes the model's kernels and caches
+            embedding_function("warm-up")
+        except Exception as e:
+            log.warning(f"Embedding model warm-up failed: {e}")
+
+    if get_embedding_config(app) == embedding_config:
+        app.state.ef = ef
+        app.state.EMBEDDING_FUNCTION = embedding_function
+    else:
+        log.info("Embedding config changed during warm-up, keeping the new model")
+
+    if app.state.config.RAG_RERANKING_MODEL == reranking_model:
+        app.state.rf = rf
+    else:
+        log.info("Reranking config changed during warm-up, keeping the new model")
+
+
+async def warm_up_models(app: FastAPI):
+    started_at = time.perf_counter()
+    await asyncio.to_thread(load_retrieval_models, app)
+    STARTUP_TIMINGS["model warm-up"] = round(time.perf_counter() - started_at, 3)
+
+    app.state.READY = True
+    log.info(
+        "Startup timings: "
+        + ", ".join(f"{name} {seconds}s" for name, seconds in STARTUP_TIMINGS.items())
+        + f", ready after {time.perf_counter() - STARTUP_TIMESTAMP:.3f}s"
     )
-except Exception as e:
-    log.error(f"Error updating models: {e}")
-    pass
-
-
-app.state.EMBEDDING_FUNCTION = get_embedding_function(
-    app.state.config.RAG_EMBEDDING_ENGINE,
-    app.state.config.RAG_EMBEDDING_MODEL,
-    app.state.ef,
-    (
-        app.state.config.RAG_OPENAI_API_BASE_URL
-        if app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-        else app.state.config.RAG_OLLAMA_BASE_URL
-    ),
-    (
-        app.state.config.RAG_OPENAI_API_KEY
-        if app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-        else app.state.config.RAG_OLLAMA_API_KEY
-    ),
-    app.state.config.RAG_EMBEDDING_BATCH_SIZE,
-)
 
 
 ########################################
@@ -878,9 +959,33 @@ async def chat_completion(
         }
         form_data["metadata"] = metadata
 
+        if (
+            TASKS_MAX_CONCURRENT_PER_USER
+            and metadata["session_id"]
+            and metadata["chat_id"]
+            and metadata["message_id"]
+        ):
+            # Only generations that become background tasks count towards the limit
+            try:
+                user_tasks = await list_tasks(user.id)
+            except Exception as e:
+                # An unreadable registry must not block chats, skip the limit
+                log.warning(f"Could not check the task limit of {user.id}: {e}")
+                user_tasks = []
+
+            if len(user_tasks) >= TASKS_MAX_CONCURRENT_PER_USER:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=ERROR_MESSAGES.TASK_LIMIT_EXCEEDED(
+                        TASKS_MAX_CONCURRENT_PER_USER
+                    ),
+                )
+
         form_data, events = await process_chat_payload(
             request, form_data, metadata, user, model
         )
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -933,6 +1038,10 @@ async def chat_action(
 @app.post("/api/tasks/stop/{task_id}")
 async def stop_task_endpoint(task_id: str, user=Depends(get_verified_user)):
     try:
+        record = await get_task_record(task_id)
+        if record and user.role != "admin" and record.get("user_id") != user.id:
+            raise ValueError(f"Task with ID {task_id} not found.")
+
         result = await stop_task(task_id)  # Use the function from tasks.py
         return result
     except ValueError as e:
@@ -941,7 +1050,8 @@ async def stop_task_endpoint(task_id: str, user=Depends(get_verified_user)):
 
 @app.get("/api/tasks")
 async def list_tasks_endpoint(user=Depends(get_verified_user)):
-    return {"tasks": list_tasks()}  # Use the function from tasks.py
+    # Use the function from tasks.py
+    return {"tasks": await list_tasks(None if user.role == "admin" else user.id)}
 
 
 ##################################
@@ -1168,6 +1278,17 @@ async def healthcheck():
     return {"status": True}
 
 
+@app.get("/health/ready")
+async def readinesscheck():
+    # Unlike /health, only succeeds once the retrieval models are loaded
+    if not app.state.READY:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": False, "startup": STARTUP_TIMINGS},
+        )
+    return {"status": True, "startup": STARTUP_TIMINGS}
+
+
 @app.get("/health/db")
 async def healthcheck_with_db():
     Session.execute(text("SELECT 1;")).all()
@@ -0,0 +1,43 @@
+"""Add webhook outbox table
+
+Revision ID: d31026856c01
+Revises: 3781e22d8b01
+Create Date: 2025-01-06 03:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "d31026856c01"
+down_revision = "3781e22d8b01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "webhook_outbox",
+        sa.Column("id", sa.Text(), nullable=False, primary_key=True, unique=True),
+        sa.Column("url", sa.Text(), nullable=False),
+        sa.Column(
+            "digest", sa.Text(), nullable=False
+        ),  # Hash of the payload, used to drop duplicate notifications
+        sa.Column("message", sa.Text(), nullable=True),
+        sa.Column("event_data", sa.JSON(), nullable=True),
+        sa.Column(
+            "status", sa.Text(), nullable=False
+        ),  # "pending", "delivering" or "failed"
+        sa.Column("attempts", sa.BigInteger(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+    )
+    op.create_index(
+        "webhook_outbox_status_idx", "webhook_outbox", ["status", "created_at"]
+    )
+
+
+def downgrade():
+    op.drop_index("webhook_outbox_status_idx", table_name="webhook_outbox")
+    op.drop_table("webhook_outbox")
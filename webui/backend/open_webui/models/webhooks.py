@@ -0,0 +1,189 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Text, JSON
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# Webhook Outbox DB Schema
+####################
+
+
+class Webhook(Base):
+    __tablename__ = "webhook_outbox"
+
+    id = Column(Text, unique=True, primary_key=True)
+    url = Column(Text)
+    digest = Column(Text)
+
+    message = Column(Text)
+    event_data = Column(JSON, nullable=True)
+
+    # "pending", "delivering" or "failed"
+    status = Column(Text)
+    attempts = Column(BigInteger, default=0)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+
+class WebhookModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    url: str
+    digest: str
+
+    message: str
+    event_data: Optional[dict] = None
+
+    status: str
+    attempts: int = 0
+    error: Optional[str] = None
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
+class WebhookTable:
+    def insert_new_webhook(
+        self, url: str, digest: str, message: str, event_data: dict
+    ) -> Optional[WebhookModel]:
+        with get_db() as db:
+            webhook = WebhookModel(
+                **{
+                    "id": str(uuid.uuid4()),
+                    "url": url,
+                    "digest": digest,
+                    "message": message,
+                    "event_data": event_data,
+                    "status": "pending",
+                    "attempts": 0,
+                    "created_at": int(time.time()),
+                    "updated_at": int(time.time()),
+                }
+            )
+
+            try:
+                result = Webhook(**webhook.model_dump())
+                db.add(result)
+                db.commit()
+                db.refresh(result)
+                return WebhookModel.model_validate(result) if result else None
+            except Exception as e:
+                log.exception(e)
+                return None
+
+    def get_pending_webhook_by_url_and_digest(
+        self, url: str, digest: str
+    ) -> Optional[WebhookModel]:
+        try:
+            with get_db() as db:
+                webhook = (
+                    db.query(Webhook)
+                    .filter(Webhook.url == url, Webhook.digest == digest)
+                    .filter(Webhook.status.in_(["pending", "delivering"]))
+                    .first()
+                )
+                return WebhookModel.model_validate(webhook) if webhook else None
+        except Exception:
+            return None
+
+    def get_pending_webhooks(self) -> list[WebhookModel]:
+        with get_db() as db:
+            return [
+                WebhookModel.model_validate(webhook)
+                for webhook in db.query(Webhook)
+                .filter_by(status="pending")
+                .order_by(Webhook.created_at.asc())
+                .all()
+            ]
+
+    def claim_webhook_by_id(self, id: str) -> bool:
+        # Atomic pending -> delivering transition, so that only one worker
+        # delivers a given outbox entry when several replay the outbox.
+        with get_db() as db:
+            count = (
+                db.query(Webhook)
+                .filter_by(id=id, status="pending")
+                .update({"status": "delivering", "updated_at": int(time.time())})
+            )
+            db.commit()
+            return count == 1
+
+    def reset_stale_webhooks(self, older_than: int) -> int:
+        with get_db() as db:
+            count = (
+                db.query(Webhook)
+                .filter(
+                    Webhook.status == "delivering",
+                    Webhook.updated_at < int(time.time()) - older_than,
+                )
+                .update({"status": "pending", "updated_at": int(time.time())})
+            )
+            db.commit()
+            return count
+
+    def update_webhook_failure_by_id(
+        self, id: str, attempts: int, error: str, failed: bool = False
+    ) -> bool:
+        with get_db() as db:
+            count = (
+                db.query(Webhook)
+                .filter_by(id=id)
+                .update(
+                    {
+                        "attempts": attempts,
+                        "error": error,
+                        "status": "failed" if failed else "delivering",
+                        "updated_at": int(time.time()),
+                    }
+                )
+            )
+            db.commit()
+            return count == 1
+
+    def release_webhooks_by_ids(self, ids: list[str]) -> int:
+        # Hands entries claimed by a stopping worker back to the outbox
+        with get_db() as db:
+            count = (
+                db.query(Webhook)
+                .filter(Webhook.id.in_(ids), Webhook.status == "delivering")
+                .update(
+                    {"status": "pending", "updated_at": int(time.time())},
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return count
+
+    def delete_failed_webhooks(self, older_than: int) -> int:
+        with get_db() as db:
+            count = (
+                db.query(Webhook)
+                .filter(
+                    Webhook.status == "failed",
+                    Webhook.updated_at < int(time.time()) - older_than,
+                )
+                .delete()
+            )
+            db.commit()
+            return count
+
+    def delete_webhooks_by_ids(self, ids: list[str]) -> bool:
+        with get_db() as db:
+            db.query(Webhook).filter(Webhook.id.in_(ids)).delete()
+            db.commit()
+            return True
+
+
+Webhooks = WebhookTable()
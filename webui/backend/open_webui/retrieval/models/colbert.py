@@ -1,9 +1,18 @@
+import hashlib
+import logging
 import os
+import tempfile
+import threading
 import torch
 import numpy as np
 from colbert.infra import ColBERTConfig
 from colbert.modeling.checkpoint import Checkpoint
 
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
 
 class ColBERT:
     def __init__(self, name, **kwargs) -> None:
@@ -27,7 +36,180 @@ class ColBERT:
             name,
             colbert_config=ColBERTConfig(model_name=name),
         ).to(self.device)
-        pass
+
+        # Document token embeddings are stored per checkpoint, since they are
+        # not interchangeable between models
+        self.embeddings_dir = None
+        self.embeddings_max_size = kwargs.get("embeddings_max_size") or 0
+        self.embeddings_size = 0
+        # Guards embeddings_size and eviction, reranks run on several threads
+        self.embeddings_lock = threading.Lock()
+        if kwargs.get("embeddings_dir"):
+            self.embeddings_dir = os.path.join(
+                kwargs["embeddings_dir"], hashlib.sha256(name.encode()).hexdigest()[:16]
+            )
+            os.makedirs(self.embeddings_dir, exist_ok=True)
+            self.embeddings_size = sum(
+                size for _, _, size in self.list_document_embeddings()
+            )
+
+    def get_chunk_id(self, text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get_embedding_path(self, chunk_id: str) -> str:
+        return os.path.join(self.embeddings_dir, chunk_id[:2], f"{chunk_id}.npy")
+
+    def encode_documents(self, docs: list[str]) -> list[np.ndarray]:
+        embedded_docs = self.ckpt.docFromText(docs, bsize=32)[0]
+
+        embeddings = []
+        for embedded_doc in embedded_docs:
+            # docFromText zeroes the padding tokens, they add nothing to MaxSim
+            embedded_doc = embedded_doc[embedded_doc.abs().sum(dim=-1) != 0]
+            embeddings.append(embedded_doc.detach().cpu().numpy().astype(np.float16))
+        return embeddings
+
+    def list_document_embeddings(self) -> list[tuple[str, float, int]]:
+        """Return (path, mtime, size) of every stored embedding."""
+        entries = []
+        for root, _, files in os.walk(self.embeddings_dir):
+            for file in files:
+                if not file.endswith(".npy"):
+                    continue
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def save_document_embedding(self, chunk_id: str, embedding: np.ndarray):
+        path = self.get_embedding_path(chunk_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so readers never see partial arrays,
+        # unique per write as several threads may store the same chunk
+        f = tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(path), suffix=".tmp", delete=False
+        )
+        try:
+            with f:
+                np.save(f, embedding)
+            os.replace(f.name, path)
+        except BaseException:
+            if os.path.exists(f.name):
+                os.remove(f.name)
+            raise
+
+        with self.embeddings_lock:
+            self.embeddings_size += embedding.nbytes
+            if (
+                self.embeddings_max_size
+                and self.embeddings_size > self.embeddings_max_size
+            ):
+                self.evict_document_embeddings()
+
+    def evict_document_embeddings(self):
+        """
+        Remove the least recently used embeddings until the store is back
+        under 90% of its size limit. Evicted chunks are encoded again when
+        they are reranked. Called with `embeddings_lock` held.
+        """
+        entries = sorted(self.list_document_embeddings(), key=lambda entry: entry[1])
+        self.embeddings_size = sum(size for _, _, size in entries)
+
+        target_size = self.embeddings_max_size * 0.9
+        for path, _, size in entries:
+            if self.embeddings_size <= target_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.embeddings_size -= size
+
+    def delete_documents(self, docs: list[str]):
+        """
+        Remove the stored embeddings of the given chunks, e.g. when their file
+        is deleted. A chunk shared with another file is encoded again when it
+        is next reranked.
+        """
+        if not self.embeddings_dir:
+            return
+
+        for doc in dict.fromkeys(docs):
+            path = self.get_embedding_path(self.get_chunk_id(doc))
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            with self.embeddings_lock:
+                self.embeddings_size = max(self.embeddings_size - size, 0)
+
+    def load_document_embedding(self, chunk_id: str):
+        path = self.get_embedding_path(chunk_id)
+        try:
+            embedding = np.load(path, mmap_mode="r")
+            # Mark as recently used for eviction
+            os.utime(path)
+            return embedding
+        except (OSError, ValueError):
+            return None
+
+    def index_documents(self, docs: list[str], bsize: int = 256) -> int:
+        """
+        Precompute and store the token embeddings of the given chunks, so that
+        `predict` only has to encode the query. Returns the number of newly
+        encoded chunks.
+        """
+        if not self.embeddings_dir:
+            return 0
+
+        missing = [
+            doc
+            for doc in dict.fromkeys(docs)
+            if not os.path.exists(self.get_embedding_path(self.get_chunk_id(doc)))
+        ]
+        for i in range(0, len(missing), bsize):
+            batch = missing[i : i + bsize]
+            for doc, embedding in zip(batch, self.encode_documents(batch)):
+                self.save_document_embedding(self.get_chunk_id(doc), embedding)
+
+        return len(missing)
+
+    def get_document_embeddings(self, docs: list[str]) -> torch.Tensor:
+        embeddings = [None] * len(docs)
+        if self.embeddings_dir:
+            for idx, doc in enumerate(docs):
+                embeddings[idx] = self.load_document_embedding(self.get_chunk_id(doc))
+
+        # Chunks ingested before the store existed are encoded and stored now
+        missing = [idx for idx, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            encoded = self.encode_documents([docs[idx] for idx in missing])
+            for idx, embedding in zip(missing, encoded):
+                embeddings[idx] = embedding
+                if self.embeddings_dir:
+                    # The store is a cache, failing to fill it must not fail
+                    # the query
+                    try:
+                        self.save_document_embedding(
+                            self.get_chunk_id(docs[idx]), embedding
+                        )
+                    except Exception as e:
+                        log.warning(f"Failed to store ColBERT embedding: {e}")
+
+        # Pad back to a dense (documents, tokens, dim) batch with zero tokens
+        max_length = max(max(embedding.shape[0] for embedding in embeddings), 1)
+        document_embeddings = np.zeros(
+            (len(docs), max_length, embeddings[0].shape[1]), dtype=np.float32
+        )
+        for idx, embedding in enumerate(embeddings):
+            document_embeddings[idx, : embedding.shape[0]] = embedding
+
+        return torch.from_numpy(document_embeddings)
 
     def calculate_similarity_scores(self, query_embeddings, document_embeddings):
 
@@ -67,11 +249,13 @@ class ColBERT:
         query = sentences[0][0]
         docs = [i[1] for i in sentences]
 
-        # Embedding the documents
-        embedded_docs = self.ckpt.docFromText(docs, bsize=32)[0]
         # Embedding the queries
         embedded_queries = self.ckpt.queryFromText([query], bsize=32)
         embedded_query = embedded_queries[0]
+        # Loading the precomputed document embeddings
+        embedded_docs = self.get_document_embeddings(docs).to(
+            dtype=embedded_query.dtype
+        )
 
         # Calculate retrieval scores for the query against all documents
         scores = self.calculate_similarity_scores(
@@ -1,18 +1,26 @@
 import logging
 import os
+import queue
+import threading
+import time
 import uuid
+from concurrent.futures import Future
+from itertools import count
 from typing import Optional, Union
 
 import asyncio
 import requests
 
 from huggingface_hub import snapshot_download
-from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
-from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
 
 
-from open_webui.config import VECTOR_DB
+from open_webui.config import (
+    VECTOR_DB,
+    ENABLE_RAG_EMBEDDING_MICRO_BATCHING,
+    RAG_EMBEDDING_MICRO_BATCH_MAX_SIZE,
+    RAG_EMBEDDING_MICRO_BATCH_MAX_LATENCY,
+)
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
 from open_webui.utils.misc import get_last_user_message
 
@@ -89,6 +97,10 @@ def query_doc_with_hybrid_search(
     reranking_function,
     r: float,
 ) -> dict:
+    # Imported on first use, langchain_community is slow to import
+    from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
+    from langchain_community.retrievers import BM25Retriever
+
     try:
         result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
 
@@ -250,6 +262,126 @@ def query_collection_with_hybrid_search(
         return merge_and_sort_query_results(results, k=k, reverse=True)
 
 
+class EmbeddingBatcher:
+    """
+    Micro-batches encode calls against a local SentenceTransformer model.
+
+    Callers on any thread enqueue their texts and block on a future. A single
+    worker thread waits up to `max_latency` seconds for concurrent requests to
+    join and encodes them together, up to `max_batch_size` texts per call.
+    Single queries are served ahead of document lists, which are split into
+    `max_batch_size` chunks, so chat retrieval is not stuck behind ingestion.
+    The worker exits when idle and is restarted by the next request.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch_size: int = RAG_EMBEDDING_MICRO_BATCH_MAX_SIZE,
+        max_latency: float = RAG_EMBEDDING_MICRO_BATCH_MAX_LATENCY / 1000,
+        idle_timeout: float = 60,
+    ):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.idle_timeout = idle_timeout
+
+        # (priority, sequence, texts, future), lower priority is served first
+        self.queue = queue.PriorityQueue()
+        self.sequence = count()
+        self.lock = threading.Lock()
+        self.worker: Optional[threading.Thread] = None
+
+    def __call__(self, query: Union[str, list[str]]):
+        if isinstance(query, list):
+            futures = [
+                self.submit(query[i : i + self.max_batch_size], priority=1)
+                for i in range(0, len(query), self.max_batch_size)
+            ]
+            return [
+                embedding for future in futures for embedding in future.result()
+            ]
+        else:
+            return self.submit([query], priority=0).result()[0]
+
+    def submit(self, texts: list[str], priority: int = 0) -> Future:
+        future = Future()
+        self.queue.put((priority, next(self.sequence), texts, future))
+
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(
+                    target=self._run, name="embedding-batcher", daemon=True
+                )
+                self.worker.start()
+        return future
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.idle_timeout)]
+            except queue.Empty:
+                # Checked under the lock so a concurrent submit either sees
+                # the worker gone or has its request picked up here
+                with self.lock:
+                    if self.queue.empty():
+                        self.worker = None
+                        return
+                continue
+
+            size = len(batch[0][2])
+            deadline = time.monotonic() + self.max_latency
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = (
+                        self.queue.get(timeout=remaining)
+                        if remaining > 0
+                        else self.queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+
+                if size + len(item[2]) > self.max_batch_size:
+                    self.queue.put(item)
+                    break
+                batch.append(item)
+                size += len(item[2])
+
+            self._encode(batch)
+
+    def _encode(self, batch: list):
+        texts = [text for _, _, item_texts, _ in batch for text in item_texts]
+        try:
+            embeddings = self.model.encode(
+                texts, batch_size=self.max_batch_size
+            ).tolist()
+        except Exception as e:
+            for *_, future in batch:
+                future.set_exception(e)
+            return
+
+        log.debug(f"Encoded {len(texts)} texts from {len(batch)} requests")
+        offset = 0
+        for _, _, item_texts, future in batch:
+            future.set_result(embeddings[offset : offset + len(item_texts)])
+            offset += len(item_texts)
+
+
+EMBEDDING_BATCHER: Optional[EmbeddingBatcher] = None
+EMBEDDING_BATCHER_LOCK = threading.Lock()
+
+
+def get_embedding_batcher(model) -> EmbeddingBatcher:
+    global EMBEDDING_BATCHER
+
+    # One batcher per loaded model, so every caller shares the same batches
+    with EMBEDDING_BATCHER_LOCK:
+        if EMBEDDING_BATCHER is None or EMBEDDING_BATCHER.model is not model:
+            EMBEDDING_BATCHER = EmbeddingBatcher(model)
+        return EMBEDDING_BATCHER
+
+
 def get_embedding_function(
     embedding_engine,
     embedding_model,
@@ -259,6 +391,8 @@ def get_embedding_function(
     embedding_batch_size,
 ):
     if embedding_engine == "":
+        if ENABLE_RAG_EMBEDDING_MICRO_BATCHING and embedding_function is not None:
+            return get_embedding_batcher(embedding_function)
         return lambda query: embedding_function.encode(query).tolist()
     elif embedding_engine in ["ollama", "openai"]:
         func = lambda query: generate_embeddings(
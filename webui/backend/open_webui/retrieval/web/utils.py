@@ -1,11 +1,9 @@
 import socket
 import urllib.parse
 import validators
+from functools import cache
 from typing import Union, Sequence, Iterator
 
-from langchain_community.document_loaders import (
-    WebBaseLoader,
-)
 from langchain_core.documents import Document
 
 
@@ -54,31 +52,40 @@ def resolve_hostname(hostname):
     return ipv4_addresses, ipv6_addresses
 
 
-class SafeWebBaseLoader(WebBaseLoader):
-    """WebBaseLoader with enhanced error handling for URLs."""
+@cache
+def get_safe_web_base_loader():
+    # Defined on first use, langchain_community is slow to import
+    from langchain_community.document_loaders import WebBaseLoader
 
-    def lazy_load(self) -> Iterator[Document]:
-        """Lazy load text from the url(s) in web_path with error handling."""
-        for path in self.web_paths:
-            try:
-                soup = self._scrape(path, bs_kwargs=self.bs_kwargs)
-                text = soup.get_text(**self.bs_get_text_kwargs)
+    class SafeWebBaseLoader(WebBaseLoader):
+        """WebBaseLoader with enhanced error handling for URLs."""
 
-                # Build metadata
-                metadata = {"source": path}
-                if title := soup.find("title"):
-                    metadata["title"] = title.get_text()
-                if description := soup.find("meta", attrs={"name": "description"}):
-                    metadata["description"] = description.get(
-                        "content", "No description found."
-                    )
-                if html := soup.find("html"):
-                    metadata["language"] = html.get("lang", "No language found.")
+        def lazy_load(self) -> Iterator[Document]:
+            """Lazy load text from the url(s) in web_path with error handling."""
+            for path in self.web_paths:
+                try:
+                    soup = self._scrape(path, bs_kwargs=self.bs_kwargs)
+                    text = soup.get_text(**self.bs_get_text_kwargs)
 
-                yield Document(page_content=text, metadata=metadata)
-            except Exception as e:
-                # Log the error and continue with the next URL
-                log.error(f"Error loading {path}: {e}")
+                    # Build metadata
+                    metadata = {"source": path}
+                    if title := soup.find("title"):
+                        metadata["title"] = title.get_text()
+                    if description := soup.find(
+                        "meta", attrs={"name": "description"}
+                    ):
+                        metadata["description"] = description.get(
+                            "content", "No description found."
+                        )
+                    if html := soup.find("html"):
+                        metadata["language"] = html.get("lang", "No language found.")
+
+                    yield Document(page_content=text, metadata=metadata)
+                except Exception as e:
+                    # Log the error and continue with the next URL
+                    log.error(f"Error loading {path}: {e}")
+
+    return SafeWebBaseLoader
 
 
 def get_web_loader(
@@ -89,7 +96,7 @@ def get_web_loader(
     # Check if the URL is valid
     if not validate_url(urls):
         raise ValueError(ERROR_MESSAGES.INVALID_URL)
-    return SafeWebBaseLoader(
+    return get_safe_web_base_loader()(
         urls,
         verify_ssl=verify_ssl,
         requests_per_second=requests_per_second,
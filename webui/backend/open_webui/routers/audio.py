@@ -1,10 +1,19 @@
 import hashlib
 import json
+import asyncio
 import logging
 import os
+import re
+import shutil
+import subprocess
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 from pydub import AudioSegment
 from pydub.silence import split_on_silence
 
@@ -23,7 +32,7 @@ from fastapi import (
     APIRouter,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
 
@@ -32,6 +41,11 @@ from open_webui.config import (
     WHISPER_MODEL_AUTO_UPDATE,
     WHISPER_MODEL_DIR,
     CACHE_DIR,
+    AUDIO_STT_CHUNK_MAX_DURATION,
+    AUDIO_STT_MAX_CONCURRENCY,
+    AUDIO_TTS_CACHE_MAX_AGE,
+    AUDIO_TTS_CACHE_MAX_SIZE,
+    ENABLE_AUDIO_TTS_STREAMING,
 )
 
 from open_webui.constants import ERROR_MESSAGES
@@ -56,6 +70,136 @@ SPEECH_CACHE_DIR = Path(CACHE_DIR).joinpath("./audio/speech/")
 SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 
+class SpeechCache:
+    """
+    Size and age bounded LRU cache of synthesized speech.
+
+    Entries are `<name>.mp3` files with the request body stored next to them
+    in `<name>.json`. Reads bump the file's mtime, which serves as the last
+    access time, so the LRU order survives restarts and is shared by workers
+    using the same directory.
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int, max_age: float):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.max_age = max_age
+
+        self.lock = threading.Lock()
+        # name -> (size, last access), least recently used first
+        self.entries: Optional[OrderedDict[str, tuple[int, float]]] = None
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_file_path(self, name: str) -> Path:
+        return self.cache_dir.joinpath(f"{name}.mp3")
+
+    def _load(self):
+        if self.entries is not None:
+            return
+
+        # Partial downloads of a worker that died mid-stream
+        for tmp_path in self.cache_dir.glob("*.tmp"):
+            try:
+                if time.time() - tmp_path.stat().st_mtime > 60 * 60:
+                    tmp_path.unlink()
+            except OSError:
+                pass
+
+        entries = []
+        for file_path in self.cache_dir.glob("*.mp3"):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, file_path.stem, stat.st_size))
+
+        self.entries = OrderedDict(
+            (name, (size, accessed_at)) for accessed_at, name, size in sorted(entries)
+        )
+        self.size = sum(size for size, _ in self.entries.values())
+
+    def _set(self, name: str, size: int, accessed_at: float):
+        previous = self.entries.pop(name, None)
+        if previous:
+            self.size -= previous[0]
+        self.entries[name] = (size, accessed_at)
+        self.size += size
+
+    def _remove(self, name: str):
+        entry = self.entries.pop(name, None)
+        if entry:
+            self.size -= entry[0]
+        self.get_file_path(name).unlink(missing_ok=True)
+        self.cache_dir.joinpath(f"{name}.json").unlink(missing_ok=True)
+
+    def _evict(self):
+        now = time.time()
+        while self.entries:
+            name, (_, accessed_at) = next(iter(self.entries.items()))
+            expired = self.max_age and now - accessed_at > self.max_age
+            oversized = self.max_size and self.size > self.max_size
+            if not expired and not oversized:
+                break
+
+            self._remove(name)
+            self.evictions += 1
+
+    def get(self, name: str) -> Optional[Path]:
+        file_path = self.get_file_path(name)
+        with self.lock:
+            self._load()
+            try:
+                stat = file_path.stat()
+            except OSError:
+                # Removed by another worker
+                self.entries.pop(name, None)
+                self.misses += 1
+                return None
+
+            if self.max_age and time.time() - stat.st_mtime > self.max_age:
+                self._remove(name)
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            os.utime(file_path)
+            self._set(name, stat.st_size, time.time())
+            self.hits += 1
+            return file_path
+
+    def add(self, name: str, payload: dict):
+        """
+        Register a speech file that was written to `get_file_path(name)`.
+        """
+        self.cache_dir.joinpath(f"{name}.json").write_text(json.dumps(payload))
+        with self.lock:
+            self._load()
+            self._set(name, self.get_file_path(name).stat().st_size, time.time())
+            self._evict()
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            self._load()
+            return {
+                "entries": len(self.entries),
+                "size": self.size,
+                "max_size": self.max_size,
+                "max_age": self.max_age,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+SPEECH_CACHE = SpeechCache(
+    SPEECH_CACHE_DIR, AUDIO_TTS_CACHE_MAX_SIZE, AUDIO_TTS_CACHE_MAX_AGE
+)
+
+
 ##########################################
 #
 # Utility functions
@@ -98,6 +242,8 @@ def set_faster_whisper_model(model: str, auto_update: bool = False):
             "model_size_or_path": model,
             "device": DEVICE_TYPE if DEVICE_TYPE and DEVICE_TYPE == "cuda" else "cpu",
             "compute_type": "int8",
+            # Lets chunks of one recording be transcribed in parallel
+            "num_workers": AUDIO_STT_MAX_CONCURRENCY,
             "download_root": WHISPER_MODEL_DIR,
             "local_files_only": not auto_update,
         }
@@ -233,6 +379,68 @@ def load_speech_pipeline(request):
         )
 
 
+async def get_speech_response(name: str, payload: dict, url: str, **kwargs):
+    """
+    Request speech from an external TTS API and cache it. When streaming is
+    enabled the audio is relayed to the client while it is being written to
+    the cache, so playback starts before synthesis is done.
+    """
+    session = aiohttp.ClientSession(trust_env=True)
+    r = None
+    try:
+        r = await session.post(url, **kwargs)
+        r.raise_for_status()
+    except Exception as e:
+        log.exception(e)
+        detail = None
+
+        try:
+            if r.status != 200:
+                res = await r.json()
+                if "error" in res:
+                    detail = f"External: {res['error'].get('message', '')}"
+        except Exception:
+            detail = f"External: {e}"
+
+        status_code = getattr(r, "status", 500)
+        if r is not None:
+            r.close()
+        await session.close()
+
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail if detail else "Open WebUI: Server Connection Error",
+        )
+
+    file_path = SPEECH_CACHE.get_file_path(name)
+    tmp_path = SPEECH_CACHE_DIR.joinpath(f"{name}.{uuid.uuid4()}.tmp")
+
+    async def stream_speech():
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                async for chunk in r.content.iter_chunked(64 * 1024):
+                    await f.write(chunk)
+                    yield chunk
+
+            os.replace(tmp_path, file_path)
+            SPEECH_CACHE.add(name, payload)
+        finally:
+            # Left behind when the client disconnects before the end
+            tmp_path.unlink(missing_ok=True)
+            r.close()
+            await session.close()
+
+    if ENABLE_AUDIO_TTS_STREAMING:
+        return StreamingResponse(
+            stream_speech(),
+            media_type=r.headers.get("Content-Type", "audio/mpeg"),
+        )
+
+    async for _ in stream_speech():
+        pass
+    return FileResponse(file_path)
+
+
 @router.post("/speech")
 async def speech(request: Request, user=Depends(get_verified_user)):
     body = await request.body()
@@ -242,13 +450,13 @@ async def speech(request: Request, user=Depends(get_verified_user)):
         + str(request.app.state.config.TTS_MODEL).encode("utf-8")
     ).hexdigest()
 
-    file_path = SPEECH_CACHE_DIR.joinpath(f"{name}.mp3")
-    file_body_path = SPEECH_CACHE_DIR.joinpath(f"{name}.json")
-
     # Check if the file already exists in the cache
-    if file_path.is_file():
+    file_path = SPEECH_CACHE.get(name)
+    if file_path:
         return FileResponse(file_path)
 
+    file_path = SPEECH_CACHE.get_file_path(name)
+
     payload = None
     try:
         payload = json.loads(body.decode("utf-8"))
@@ -259,54 +467,26 @@ async def speech(request: Request, user=Depends(get_verified_user)):
     if request.app.state.config.TTS_ENGINE == "openai":
         payload["model"] = request.app.state.config.TTS_MODEL
 
-        try:
-            # print(payload)
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url=f"{request.app.state.config.TTS_OPENAI_API_BASE_URL}/audio/speech",
-                    json=payload,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Authorization": f"Bearer {request.app.state.config.TTS_OPENAI_API_KEY}",
-                        **(
-                            {
-                                "X-OpenWebUI-User-Name": user.name,
-                                "X-OpenWebUI-User-Id": user.id,
-                                "X-OpenWebUI-User-Email": user.email,
-                                "X-OpenWebUI-User-Role": user.role,
-                            }
-                            if ENABLE_FORWARD_USER_INFO_HEADERS
-                            else {}
-                        ),
-                    },
-                ) as r:
-                    r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-            return FileResponse(file_path)
-
-        except Exception as e:
-            log.exception(e)
-            detail = None
-
-            try:
-                if r.status != 200:
-                    res = await r.json()
-
-                    if "error" in res:
-                        detail = f"External: {res['error'].get('message', '')}"
-            except Exception:
-                detail = f"External: {e}"
-
-            raise HTTPException(
-                status_code=getattr(r, "status", 500),
-                detail=detail if detail else "Open WebUI: Server Connection Error",
-            )
+        return await get_speech_response(
+            name,
+            payload,
+            f"{request.app.state.config.TTS_OPENAI_API_BASE_URL}/audio/speech",
+            json=payload,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {request.app.state.config.TTS_OPENAI_API_KEY}",
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": user.name,
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS
+                    else {}
+                ),
+            },
+        )
 
     elif request.app.state.config.TTS_ENGINE == "elevenlabs":
         voice_id = payload.get("voice", "")
@@ -317,109 +497,45 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                 detail="Invalid voice id",
             )
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
-                    json={
-                        "text": payload["input"],
-                        "model_id": request.app.state.config.TTS_MODEL,
-                        "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
-                    },
-                    headers={
-                        "Accept": "audio/mpeg",
-                        "Content-Type": "application/json",
-                        "xi-api-key": request.app.state.config.TTS_API_KEY,
-                    },
-                ) as r:
-                    r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-            return FileResponse(file_path)
-
-        except Exception as e:
-            log.exception(e)
-            detail = None
-
-            try:
-                if r.status != 200:
-                    res = await r.json()
-                    if "error" in res:
-                        detail = f"External: {res['error'].get('message', '')}"
-            except Exception:
-                detail = f"External: {e}"
-
-            raise HTTPException(
-                status_code=getattr(r, "status", 500),
-                detail=detail if detail else "Open WebUI: Server Connection Error",
-            )
+        return await get_speech_response(
+            name,
+            payload,
+            f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
+            json={
+                "text": payload["input"],
+                "model_id": request.app.state.config.TTS_MODEL,
+                "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
+            },
+            headers={
+                "Accept": "audio/mpeg",
+                "Content-Type": "application/json",
+                "xi-api-key": request.app.state.config.TTS_API_KEY,
+            },
+        )
 
     elif request.app.state.config.TTS_ENGINE == "azure":
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
-
         region = request.app.state.config.TTS_AZURE_SPEECH_REGION
         language = request.app.state.config.TTS_VOICE
         locale = "-".join(request.app.state.config.TTS_VOICE.split("-")[:1])
         output_format = request.app.state.config.TTS_AZURE_SPEECH_OUTPUT_FORMAT
 
-        try:
-            data = f"""<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="{locale}">
+        data = f"""<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="{locale}">
                 <voice name="{language}">{payload["input"]}</voice>
             </speak>"""
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"https://{region}.tts.speech.microsoft.com/cognitiveservices/v1",
-                    headers={
-                        "Ocp-Apim-Subscription-Key": request.app.state.config.TTS_API_KEY,
-                        "Content-Type": "application/ssml+xml",
-                        "X-Microsoft-OutputFormat": output_format,
-                    },
-                    data=data,
-                ) as r:
-                    r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-                    return FileResponse(file_path)
-
-        except Exception as e:
-            log.exception(e)
-            detail = None
 
-            try:
-                if r.status != 200:
-                    res = await r.json()
-                    if "error" in res:
-                        detail = f"External: {res['error'].get('message', '')}"
-            except Exception:
-                detail = f"External: {e}"
-
-            raise HTTPException(
-                status_code=getattr(r, "status", 500),
-                detail=detail if detail else "Open WebUI: Server Connection Error",
-            )
+        return await get_speech_response(
+            name,
+            payload,
+            f"https://{region}.tts.speech.microsoft.com/cognitiveservices/v1",
+            headers={
+                "Ocp-Apim-Subscription-Key": request.app.state.config.TTS_API_KEY,
+                "Content-Type": "application/ssml+xml",
+                "X-Microsoft-OutputFormat": output_format,
+            },
+            data=data,
+        )
 
     elif request.app.state.config.TTS_ENGINE == "transformers":
-        payload = None
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
-
         import torch
         import soundfile as sf
 
@@ -445,105 +561,310 @@ async def speech(request: Request, user=Depends(get_verified_user)):
         )
 
         sf.write(file_path, speech["audio"], samplerate=speech["sampling_rate"])
-
-        async with aiofiles.open(file_body_path, "w") as f:
-            await f.write(json.dumps(payload))
+        SPEECH_CACHE.add(name, payload)
 
         return FileResponse(file_path)
 
 
-def transcribe(request: Request, file_path):
-    print("transcribe", file_path)
-    filename = os.path.basename(file_path)
-    file_dir = os.path.dirname(file_path)
-    id = filename.split(".")[0]
+@router.get("/speech/cache")
+async def get_speech_cache_stats(user=Depends(get_admin_user)):
+    return SPEECH_CACHE.get_stats()
 
-    if request.app.state.config.STT_ENGINE == "":
+
+# Shared by all requests transcribing with the local faster-whisper model
+TRANSCRIPTION_EXECUTOR = ThreadPoolExecutor(
+    max_workers=AUDIO_STT_MAX_CONCURRENCY, thread_name_prefix="transcription"
+)
+
+
+def get_audio_duration(file_path: str) -> Optional[float]:
+    try:
+        return float(mediainfo(file_path).get("duration"))
+    except Exception:
+        return None
+
+
+def detect_silences(file_path: str) -> list[float]:
+    """Midpoints, in seconds, of the silent stretches of an audio file."""
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-nostats",
+            "-i",
+            file_path,
+            "-af",
+            "silencedetect=noise=-35dB:d=0.5",
+            "-f",
+            "null",
+            "-",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    starts = [float(t) for t in re.findall(r"silence_start: (-?[\d.]+)", result.stderr)]
+    ends = [float(t) for t in re.findall(r"silence_end: ([\d.]+)", result.stderr)]
+    return [(start + end) / 2 for start, end in zip(starts, ends)]
+
+
+def get_chunk_boundaries(
+    duration: float, silences: list[float], max_duration: float
+) -> list[tuple[float, float]]:
+    """
+    Split [0, duration] into chunks of at most `max_duration` seconds, cutting
+    at the latest silence in the second half of each chunk when there is one.
+    """
+    boundaries = []
+    start = 0.0
+    while duration - start > max_duration:
+        cuts = [
+            t
+            for t in silences
+            if start + max_duration / 2 < t <= start + max_duration
+        ]
+        end = cuts[-1] if cuts else start + max_duration
+        boundaries.append((start, end))
+        start = end
+
+    boundaries.append((start, duration))
+    return boundaries
+
+
+def split_audio(file_path: str) -> list[tuple[str, float, float]]:
+    """
+    Split a recording into (chunk path, start, end) chunks on silence. Short
+    recordings within the upload limit are returned as a single chunk.
+    """
+    duration = get_audio_duration(file_path)
+    if duration is None or (
+        duration <= AUDIO_STT_CHUNK_MAX_DURATION
+        and os.path.getsize(file_path) <= MAX_FILE_SIZE
+    ):
+        return [(file_path, 0.0, duration or 0.0)]
+
+    chunk_dir = f"{os.path.splitext(file_path)[0]}_chunks"
+    os.makedirs(chunk_dir, exist_ok=True)
+
+    boundaries = get_chunk_boundaries(
+        duration, detect_silences(file_path), AUDIO_STT_CHUNK_MAX_DURATION
+    )
+    log.info(f"Split {file_path} ({duration:.0f}s) into {len(boundaries)} chunks")
+    return [
+        (f"{chunk_dir}/{idx}.wav", start, end)
+        for idx, (start, end) in enumerate(boundaries)
+    ]
+
+
+def export_chunk(file_path: str, chunk_path: str, start: float, end: float):
+    # Only decodes the requested range instead of loading the whole file
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-ss",
+            str(start),
+            "-t",
+            str(end - start),
+            "-i",
+            file_path,
+            "-ac",
+            "1",
+            "-ar",
+            "16000",
+            chunk_path,
+        ],
+        check=True,
+    )
+
+
+def transcribe_chunk_locally(model, chunk_path: str) -> list[dict]:
+    segments, info = model.transcribe(chunk_path, beam_size=5)
+    log.info(
+        "Detected language '%s' with probability %f"
+        % (info.language, info.language_probability)
+    )
+    return [
+        {"start": segment.start, "end": segment.end, "text": segment.text}
+        for segment in segments
+    ]
+
+
+async def transcribe_chunk_with_openai(
+    request: Request, session: aiohttp.ClientSession, chunk_path: str
+) -> list[dict]:
+    form = aiohttp.FormData()
+    form.add_field("model", request.app.state.config.STT_MODEL)
+    async with aiofiles.open(chunk_path, "rb") as f:
+        form.add_field(
+            "file", await f.read(), filename=os.path.basename(chunk_path)
+        )
+
+    r = None
+    try:
+        r = await session.post(
+            url=f"{request.app.state.config.STT_OPENAI_API_BASE_URL}/audio/transcriptions",
+            headers={
+                "Authorization": f"Bearer {request.app.state.config.STT_OPENAI_API_KEY}"
+            },
+            data=form,
+        )
+        r.raise_for_status()
+        data = await r.json()
+    except Exception as e:
+        log.exception(e)
+
+        detail = None
+        if r is not None:
+            try:
+                res = await r.json()
+                if "error" in res:
+                    detail = f"External: {res['error'].get('message', '')}"
+            except Exception:
+                detail = f"External: {e}"
+
+        raise Exception(detail if detail else "Open WebUI: Server Connection Error")
+    finally:
+        if r is not None:
+            r.close()
+
+    # Only verbose responses carry segment timestamps
+    if data.get("segments"):
+        return [
+            {"start": segment["start"], "end": segment["end"], "text": segment["text"]}
+            for segment in data["segments"]
+        ]
+    return [{"start": 0.0, "end": None, "text": data.get("text", "")}]
+
+
+async def transcribe_chunks(request: Request, file_path: str):
+    """
+    Transcribe a recording chunk by chunk, at most AUDIO_STT_MAX_CONCURRENCY
+    chunks at a time, yielding each chunk's result as soon as it is done.
+    Segment timestamps are relative to the start of the whole recording.
+    """
+    engine = request.app.state.config.STT_ENGINE
+    if engine == "openai" and is_mp4_audio(file_path):
+        os.rename(file_path, file_path.replace(".wav", ".mp4"))
+        # Convert MP4 audio file to WAV format
+        convert_mp4_to_wav(file_path.replace(".wav", ".mp4"), file_path)
+
+    if engine == "":
         if request.app.state.faster_whisper_model is None:
             request.app.state.faster_whisper_model = set_faster_whisper_model(
                 request.app.state.config.WHISPER_MODEL
             )
-
         model = request.app.state.faster_whisper_model
-        segments, info = model.transcribe(file_path, beam_size=5)
-        log.info(
-            "Detected language '%s' with probability %f"
-            % (info.language, info.language_probability)
-        )
+    elif engine != "openai":
+        raise Exception(f"Unsupported speech-to-text engine: {engine}")
 
-        transcript = "".join([segment.text for segment in list(segments)])
-        data = {"text": transcript.strip()}
+    chunks = await asyncio.to_thread(split_audio, file_path)
+    semaphore = asyncio.Semaphore(AUDIO_STT_MAX_CONCURRENCY)
+    loop = asyncio.get_running_loop()
 
-        # save the transcript to a json file
-        transcript_file = f"{file_dir}/{id}.json"
-        with open(transcript_file, "w") as f:
-            json.dump(data, f)
+    async def transcribe_chunk(idx, chunk_path, start, end, session):
+        async with semaphore:
+            if chunk_path != file_path:
+                await asyncio.to_thread(export_chunk, file_path, chunk_path, start, end)
 
-        log.debug(data)
-        return data
-    elif request.app.state.config.STT_ENGINE == "openai":
-        if is_mp4_audio(file_path):
-            os.rename(file_path, file_path.replace(".wav", ".mp4"))
-            # Convert MP4 audio file to WAV format
-            convert_mp4_to_wav(file_path.replace(".wav", ".mp4"), file_path)
+            if engine == "":
+                segments = await loop.run_in_executor(
+                    TRANSCRIPTION_EXECUTOR, transcribe_chunk_locally, model, chunk_path
+                )
+            else:
+                segments = await transcribe_chunk_with_openai(
+                    request, session, chunk_path
+                )
 
-        r = None
-        try:
-            r = requests.post(
-                url=f"{request.app.state.config.STT_OPENAI_API_BASE_URL}/audio/transcriptions",
-                headers={
-                    "Authorization": f"Bearer {request.app.state.config.STT_OPENAI_API_KEY}"
-                },
-                files={"file": (filename, open(file_path, "rb"))},
-                data={"model": request.app.state.config.STT_MODEL},
+        for segment in segments:
+            segment["start"] = start + segment["start"]
+            segment["end"] = (
+                start + segment["end"] if segment["end"] is not None else end
             )
 
-            r.raise_for_status()
-            data = r.json()
+        return {
+            "index": idx,
+            "start": start,
+            "end": end,
+            "text": "".join(segment["text"] for segment in segments).strip(),
+            "segments": segments,
+        }
 
-            # save the transcript to a json file
-            transcript_file = f"{file_dir}/{id}.json"
-            with open(transcript_file, "w") as f:
-                json.dump(data, f)
+    session = aiohttp.ClientSession(trust_env=True) if engine == "openai" else None
+    pending = [
+        asyncio.create_task(transcribe_chunk(idx, chunk_path, start, end, session))
+        for idx, (chunk_path, start, end) in enumerate(chunks)
+    ]
+    try:
+        for task in asyncio.as_completed(pending):
+            yield await task
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if session is not None:
+            await session.close()
+        if len(chunks) > 1:
+            shutil.rmtree(os.path.dirname(chunks[0][0]), ignore_errors=True)
+
+
+def get_transcript(results: list[dict]) -> dict:
+    results = sorted(results, key=lambda result: result["index"])
+    return {
+        "text": " ".join(result["text"] for result in results if result["text"]),
+        "segments": [segment for result in results for segment in result["segments"]],
+    }
 
-            return data
-        except Exception as e:
-            log.exception(e)
 
-            detail = None
-            if r is not None:
-                try:
-                    res = r.json()
-                    if "error" in res:
-                        detail = f"External: {res['error'].get('message', '')}"
-                except Exception:
-                    detail = f"External: {e}"
+async def save_transcript(file_path: str, data: dict):
+    # save the transcript to a json file
+    file_dir = os.path.dirname(file_path)
+    id = os.path.basename(file_path).split(".")[0]
 
-            raise Exception(detail if detail else "Open WebUI: Server Connection Error")
+    async with aiofiles.open(f"{file_dir}/{id}.json", "w") as f:
+        await f.write(json.dumps(data))
 
 
-def compress_audio(file_path):
-    if os.path.getsize(file_path) > MAX_FILE_SIZE:
-        file_dir = os.path.dirname(file_path)
-        audio = AudioSegment.from_file(file_path)
-        audio = audio.set_frame_rate(16000).set_channels(1)  # Compress audio
-        compressed_path = f"{file_dir}/{id}_compressed.opus"
-        audio.export(compressed_path, format="opus", bitrate="32k")
-        log.debug(f"Compressed audio to {compressed_path}")
+async def transcribe(request: Request, file_path):
+    print("transcribe", file_path)
 
-        if (
-            os.path.getsize(compressed_path) > MAX_FILE_SIZE
-        ):  # Still larger than MAX_FILE_SIZE after compression
-            raise Exception(ERROR_MESSAGES.FILE_TOO_LARGE(size=f"{MAX_FILE_SIZE_MB}MB"))
-        return compressed_path
-    else:
-        return file_path
+    results = [result async for result in transcribe_chunks(request, file_path)]
+    data = get_transcript(results)
+    await save_transcript(file_path, data)
+
+    log.debug(data)
+    return data
+
+
+async def stream_transcription(request: Request, file_path):
+    """
+    Server-sent events with each chunk's transcript as soon as it is ready,
+    followed by the full transcript in order.
+    """
+    results = []
+    try:
+        async for result in transcribe_chunks(request, file_path):
+            results.append(result)
+            yield f"data: {json.dumps(result)}\n\n"
+    except Exception as e:
+        log.exception(e)
+        yield f"data: {json.dumps({'error': ERROR_MESSAGES.DEFAULT(e)})}\n\n"
+        return
+
+    data = get_transcript(results)
+    await save_transcript(file_path, data)
+    data = {**data, "done": True, "filename": os.path.basename(file_path)}
+    yield f"data: {json.dumps(data)}\n\n"
 
 
 @router.post("/transcriptions")
-def transcription(
+async def transcription(
     request: Request,
     file: UploadFile = File(...),
+    stream: bool = False,
     user=Depends(get_verified_user),
 ):
     log.info(f"file.content_type: {file.content_type}")
@@ -559,27 +880,24 @@ def transcription(
         id = uuid.uuid4()
 
         filename = f"{id}.{ext}"
-        contents = file.file.read()
 
         file_dir = f"{CACHE_DIR}/audio/transcriptions"
         os.makedirs(file_dir, exist_ok=True)
         file_path = f"{file_dir}/{filename}"
 
-        with open(file_path, "wb") as f:
-            f.write(contents)
-
-        try:
-            try:
-                file_path = compress_audio(file_path)
-            except Exception as e:
-                log.exception(e)
+        # Copied in blocks so long recordings are never held in memory
+        async with aiofiles.open(file_path, "wb") as f:
+            while chunk := await file.read(1024 * 1024):
+                await f.write(chunk)
 
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=ERROR_MESSAGES.DEFAULT(e),
-                )
+        if stream:
+            return StreamingResponse(
+                stream_transcription(request, file_path),
+                media_type="text/event-stream",
+            )
 
-            data = transcribe(request, file_path)
+        try:
+            data = await transcribe(request, file_path)
             file_path = file_path.split("/")[-1]
             return {**data, "filename": file_path}
         except Exception as e:
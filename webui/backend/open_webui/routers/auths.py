@@ -486,6 +486,7 @@ async def signup(request: Request, response: Response, form_data: SignupForm):
                         "message": WEBHOOK_MESSAGES.USER_SIGNUP(user.name),
                         "user": user.model_dump_json(exclude_none=True),
                     },
+                    event_id=f"signup:{user.id}",
                 )
 
             user_permissions = get_permissions(
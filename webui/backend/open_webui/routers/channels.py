@@ -196,25 +196,26 @@ async def send_notification(webui_url, channel, message, active_user_ids):
     users = get_users_with_access("read", channel.access_control)
 
     for user in users:
-        if user.id in active_user_ids:
+        if user.id in active_user_ids or not user.settings:
             continue
-        else:
-            if user.settings:
-                webhook_url = user.settings.ui.get("notifications", {}).get(
-                    "webhook_url", None
-                )
 
-                if webhook_url:
-                    post_webhook(
-                        webhook_url,
-                        f"#{channel.name} - {webui_url}/channels/{channel.id}\n\n{message.content}",
-                        {
-                            "action": "channel",
-                            "message": message.content,
-                            "title": channel.name,
-                            "url": f"{webui_url}/channels/{channel.id}",
-                        },
-                    )
+        webhook_url = user.settings.ui.get("notifications", {}).get(
+            "webhook_url", None
+        )
+
+        if webhook_url:
+            # Only queues the notification, delivery happens in the background
+            post_webhook(
+                webhook_url,
+                f"#{channel.name} - {webui_url}/channels/{channel.id}\n\n{message.content}",
+                {
+                    "action": "channel",
+                    "message": message.content,
+                    "title": channel.name,
+                    "url": f"{webui_url}/channels/{channel.id}",
+                },
+                event_id=f"channel:{message.id}",
+            )
 
 
 @router.post("/{id}/messages/post", response_model=Optional[MessageModel])
@@ -15,7 +15,11 @@ from open_webui.models.files import (
     FileModelResponse,
     Files,
 )
-from open_webui.routers.retrieval import process_file, ProcessFileForm
+from open_webui.routers.retrieval import (
+    delete_colbert_embeddings,
+    process_file,
+    ProcessFileForm,
+)
 
 from open_webui.config import UPLOAD_DIR
 from open_webui.env import SRC_LOG_LEVELS
@@ -342,10 +346,11 @@ async def get_file_content_by_id(id: str, user=Depends(get_verified_user)):
 
 
 @router.delete("/{id}")
-async def delete_file_by_id(id: str, user=Depends(get_verified_user)):
+async def delete_file_by_id(request: Request, id: str, user=Depends(get_verified_user)):
     file = Files.get_file_by_id(id)
     if file and (file.user_id == user.id or user.role == "admin"):
         # We should add Chroma cleanup here
+        delete_colbert_embeddings(request, f"file-{id}")
 
         result = Files.delete_file_by_id(id)
         if result:
@@ -8,6 +8,7 @@ from open_webui.models.functions import (
     FunctionResponse,
     Functions,
 )
+from open_webui.functions import get_pipe_metrics
 from open_webui.utils.plugin import load_function_module_by_id, replace_imports
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
@@ -36,6 +37,16 @@ async def get_functions(user=Depends(get_admin_user)):
     return Functions.get_functions()
 
 
+############################
+# GetPipeMetrics
+############################
+
+
+@router.get("/metrics")
+async def get_functions_pipe_metrics(user=Depends(get_admin_user)):
+    return get_pipe_metrics()
+
+
 ############################
 # CreateNewFunction
 ############################
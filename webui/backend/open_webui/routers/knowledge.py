@@ -12,6 +12,8 @@ from open_webui.models.knowledge import (
 from open_webui.models.files import Files, FileModel
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
 from open_webui.routers.retrieval import (
+    check_models_ready,
+    delete_colbert_embeddings,
     process_file,
     ProcessFileForm,
     process_files_batch,
@@ -283,6 +285,7 @@ def add_file_to_knowledge_by_id(
         )
 
     # Add content to the vector database
+    check_models_ready(request)
     try:
         process_file(
             request, ProcessFileForm(file_id=form_data.file_id, collection_name=id)
@@ -355,6 +358,9 @@ def update_file_from_knowledge_by_id(
             detail=ERROR_MESSAGES.NOT_FOUND,
         )
 
+    # The content is re-added below, which needs the embedding model
+    check_models_ready(request)
+
     # Remove content from the vector database
     VECTOR_DB_CLIENT.delete(
         collection_name=knowledge.id, filter={"file_id": form_data.file_id}
@@ -395,6 +401,7 @@ def update_file_from_knowledge_by_id(
 
 @router.post("/{id}/file/remove", response_model=Optional[KnowledgeFilesResponse])
 def remove_file_from_knowledge_by_id(
+    request: Request,
     id: str,
     form_data: KnowledgeFileIdForm,
     user=Depends(get_verified_user),
@@ -420,6 +427,7 @@ def remove_file_from_knowledge_by_id(
         )
 
     # Remove content from the vector database
+    delete_colbert_embeddings(request, knowledge.id, file_id=form_data.file_id)
     VECTOR_DB_CLIENT.delete(
         collection_name=knowledge.id, filter={"file_id": form_data.file_id}
     )
@@ -476,7 +484,9 @@ def remove_file_from_knowledge_by_id(
 
 
 @router.delete("/{id}/delete", response_model=bool)
-async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
+async def delete_knowledge_by_id(
+    request: Request, id: str, user=Depends(get_verified_user)
+):
     knowledge = Knowledges.get_knowledge_by_id(id=id)
     if not knowledge:
         raise HTTPException(
@@ -520,6 +530,7 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
                 Models.update_model_by_id(model.id, model_form)
 
     # Clean up vector DB
+    delete_colbert_embeddings(request, id)
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
     except Exception as e:
@@ -535,7 +546,9 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
 
 
 @router.post("/{id}/reset", response_model=Optional[KnowledgeResponse])
-async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
+async def reset_knowledge_by_id(
+    request: Request, id: str, user=Depends(get_verified_user)
+):
     knowledge = Knowledges.get_knowledge_by_id(id=id)
     if not knowledge:
         raise HTTPException(
@@ -549,6 +562,7 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
             detail=ERROR_MESSAGES.ACCESS_PROHIBITED,
         )
 
+    delete_colbert_embeddings(request, id)
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
     except Exception as e:
@@ -601,6 +615,7 @@ def add_files_to_knowledge_batch(
         files.append(file)
 
     # Process files
+    check_models_ready(request)
     try:
         result = process_files_batch(
             request=request,
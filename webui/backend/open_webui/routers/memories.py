@@ -5,6 +5,7 @@ from typing import Optional
 
 from open_webui.models.memories import Memories, MemoryModel
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
+from open_webui.routers.retrieval import check_models_ready
 from open_webui.utils.auth import get_verified_user
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -15,7 +16,7 @@ log.setLevel(SRC_LOG_LEVELS["MODELS"])
 router = APIRouter()
 
 
-@router.get("/ef")
+@router.get("/ef", dependencies=[Depends(check_models_ready)])
 async def get_embeddings(request: Request):
     return {"result": request.app.state.EMBEDDING_FUNCTION("hello world")}
 
@@ -43,7 +44,11 @@ class MemoryUpdateModel(BaseModel):
     content: Optional[str] = None
 
 
-@router.post("/add", response_model=Optional[MemoryModel])
+@router.post(
+    "/add",
+    response_model=Optional[MemoryModel],
+    dependencies=[Depends(check_models_ready)],
+)
 async def add_memory(
     request: Request,
     form_data: AddMemoryForm,
@@ -76,7 +81,7 @@ class QueryMemoryForm(BaseModel):
     k: Optional[int] = 1
 
 
-@router.post("/query")
+@router.post("/query", dependencies=[Depends(check_models_ready)])
 async def query_memory(
     request: Request, form_data: QueryMemoryForm, user=Depends(get_verified_user)
 ):
@@ -92,7 +97,7 @@ async def query_memory(
 ############################
 # ResetMemoryFromVectorDB
 ############################
-@router.post("/reset", response_model=bool)
+@router.post("/reset", response_model=bool, dependencies=[Depends(check_models_ready)])
 async def reset_memory_from_vector_db(
     request: Request, user=Depends(get_verified_user)
 ):
@@ -142,7 +147,11 @@ async def delete_memory_by_user_id(user=Depends(get_verified_user)):
 ############################
 
 
-@router.post("/{memory_id}/update", response_model=Optional[MemoryModel])
+@router.post(
+    "/{memory_id}/update",
+    response_model=Optional[MemoryModel],
+    dependencies=[Depends(check_models_ready)],
+)
 async def update_memory_by_id(
     memory_id: str,
     request: Request,
@@ -10,14 +10,21 @@ from fastapi import (
     APIRouter,
 )
 import os
+import asyncio
+import itertools
 import logging
 import shutil
+import aiohttp
 import requests
 from pydantic import BaseModel
 from starlette.responses import FileResponse
 from typing import Optional
 
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    PIPELINE_FILTER_TIMEOUT,
+    ENABLE_PIPELINE_OUTLET_FILTER_CONCURRENCY,
+)
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 
@@ -56,7 +63,79 @@ def get_sorted_filters(model_id, models):
     return sorted_filters
 
 
-def process_pipeline_inlet_filter(request, payload, user, models):
+def get_filter_url_and_key(request, filter):
+    urlIdx = filter["urlIdx"]
+
+    url = request.app.state.config.OPENAI_API_BASE_URLS[urlIdx]
+    key = request.app.state.config.OPENAI_API_KEYS[urlIdx]
+    return url, key
+
+
+_filter_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_filter_session() -> aiohttp.ClientSession:
+    # One pooled session for all filter calls, instead of a connection per call
+    global _filter_session
+    if _filter_session is None or _filter_session.closed:
+        _filter_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=PIPELINE_FILTER_TIMEOUT),
+            trust_env=True,
+        )
+    return _filter_session
+
+
+async def close_filter_session():
+    global _filter_session
+    if _filter_session is not None:
+        await _filter_session.close()
+        _filter_session = None
+
+
+async def call_pipeline_filter(request, filter, stage, payload, user):
+    """
+    Send the payload through a single filter pipeline.
+
+    Returns the filtered payload, or None when the filter is skipped because it
+    has no key, times out or cannot be reached. A response carrying a `detail`
+    is a deliberate rejection by the filter and is raised as an Exception.
+    """
+    url, key = get_filter_url_and_key(request, filter)
+    if key == "":
+        return None
+
+    try:
+        session = get_filter_session()
+        async with session.post(
+            f"{url}/{filter['id']}/filter/{stage}",
+            headers={"Authorization": f"Bearer {key}"},
+            json={
+                "user": user,
+                "body": payload,
+            },
+        ) as r:
+            if r.ok:
+                return await r.json()
+
+            try:
+                res = await r.json()
+            except Exception:
+                res = None
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        # Handle connection error here
+        log.warning(
+            f"Skipping {stage} filter {filter['id']}: {e or e.__class__.__name__}"
+        )
+        return None
+
+    if isinstance(res, dict) and "detail" in res:
+        raise Exception(r.status, res["detail"] if stage == "inlet" else res)
+
+    log.warning(f"Skipping {stage} filter {filter['id']}: {r.status}")
+    return None
+
+
+async def process_pipeline_inlet_filter(request, payload, user, models):
     user = {"id": user.id, "email": user.email, "name": user.name, "role": user.role}
     model_id = payload["model"]
 
@@ -67,85 +146,63 @@ def process_pipeline_inlet_filter(request, payload, user, models):
         sorted_filters.append(model)
 
     for filter in sorted_filters:
-        r = None
-        try:
-            urlIdx = filter["urlIdx"]
-
-            url = request.app.state.config.OPENAI_API_BASE_URLS[urlIdx]
-            key = request.app.state.config.OPENAI_API_KEYS[urlIdx]
-
-            if key == "":
-                continue
-
-            headers = {"Authorization": f"Bearer {key}"}
-            r = requests.post(
-                f"{url}/{filter['id']}/filter/inlet",
-                headers=headers,
-                json={
-                    "user": user,
-                    "body": payload,
-                },
-            )
-
-            r.raise_for_status()
-            payload = r.json()
-        except Exception as e:
-            # Handle connection error here
-            print(f"Connection error: {e}")
-
-            if r is not None:
-                res = r.json()
-                if "detail" in res:
-                    raise Exception(r.status_code, res["detail"])
+        result = await call_pipeline_filter(request, filter, "inlet", payload, user)
+        if result is not None:
+            payload = result
 
     return payload
 
 
-def process_pipeline_outlet_filter(request, payload, user, models):
+async def process_pipeline_outlet_filter(request, payload, user, models):
     user = {"id": user.id, "email": user.email, "name": user.name, "role": user.role}
     model_id = payload["model"]
 
     sorted_filters = get_sorted_filters(model_id, models)
     model = models[model_id]
 
+    if ENABLE_PIPELINE_OUTLET_FILTER_CONCURRENCY:
+        # Filters sharing a priority run concurrently on the same payload; the
+        # keys each one changed are then applied in order, later filters winning.
+        groups = [
+            list(group)
+            for _, group in itertools.groupby(
+                sorted_filters, key=lambda x: x["pipeline"]["priority"]
+            )
+        ]
+    else:
+        groups = [[filter] for filter in sorted_filters]
+
     if "pipeline" in model:
-        sorted_filters = [model] + sorted_filters
+        groups = [[model]] + groups
 
-    for filter in sorted_filters:
-        r = None
+    for group in groups:
         try:
-            urlIdx = filter["urlIdx"]
-
-            url = request.app.state.config.OPENAI_API_BASE_URLS[urlIdx]
-            key = request.app.state.config.OPENAI_API_KEYS[urlIdx]
-
-            if key != "":
-                r = requests.post(
-                    f"{url}/{filter['id']}/filter/outlet",
-                    headers={"Authorization": f"Bearer {key}"},
-                    json={
-                        "user": user,
-                        "body": payload,
-                    },
-                )
-
-                r.raise_for_status()
-                data = r.json()
-                payload = data
+            results = await asyncio.gather(
+                *[
+                    call_pipeline_filter(request, filter, "outlet", payload, user)
+                    for filter in group
+                ]
+            )
         except Exception as e:
-            # Handle connection error here
-            print(f"Connection error: {e}")
-
-            if r is not None:
-                try:
-                    res = r.json()
-                    if "detail" in res:
-                        return Exception(r.status_code, res)
-                except Exception:
-                    pass
-
-            else:
-                pass
+            return e
+
+        if len(results) == 1:
+            if results[0] is not None:
+                payload = results[0]
+            continue
+
+        merged = {**payload}
+        for result in results:
+            if result is None:
+                continue
+            merged.update(
+                {
+                    key: value
+                    for key, value in result.items()
+                    if payload.get(key) != value
+                }
+            )
+        payload = merged
 
     return payload
 
@@ -75,8 +75,12 @@ from open_webui.config import (
     ENV,
     RAG_EMBEDDING_MODEL_AUTO_UPDATE,
     RAG_EMBEDDING_MODEL_TRUST_REMOTE_CODE,
+    RAG_EMBEDDING_MODEL_BACKEND,
+    RAG_EMBEDDING_MODEL_FILE_NAME,
     RAG_RERANKING_MODEL_AUTO_UPDATE,
     RAG_RERANKING_MODEL_TRUST_REMOTE_CODE,
+    RAG_COLBERT_EMBEDDINGS_DIR,
+    RAG_COLBERT_EMBEDDINGS_MAX_SIZE,
     UPLOAD_DIR,
     DEFAULT_LOCALE,
 )
@@ -106,11 +110,19 @@ def get_ef(
     if embedding_model and engine == "":
         from sentence_transformers import SentenceTransformer
 
+        kwargs = {}
+        if RAG_EMBEDDING_MODEL_BACKEND in ["onnx", "openvino"]:
+            # Requires sentence-transformers>=3.2 and the optimum extras
+            kwargs["backend"] = RAG_EMBEDDING_MODEL_BACKEND
+            if RAG_EMBEDDING_MODEL_FILE_NAME:
+                kwargs["model_kwargs"] = {"file_name": RAG_EMBEDDING_MODEL_FILE_NAME}
+
         try:
             ef = SentenceTransformer(
                 get_model_path(embedding_model, auto_update),
                 device=DEVICE_TYPE,
                 trust_remote_code=RAG_EMBEDDING_MODEL_TRUST_REMOTE_CODE,
+                **kwargs,
             )
         except Exception as e:
             log.debug(f"Error loading SentenceTransformer: {e}")
@@ -131,6 +143,8 @@ def get_rf(
                 rf = ColBERT(
                     get_model_path(reranking_model, auto_update),
                     env="docker" if DOCKER else None,
+                    embeddings_dir=RAG_COLBERT_EMBEDDINGS_DIR,
+                    embeddings_max_size=RAG_COLBERT_EMBEDDINGS_MAX_SIZE * 1024 * 1024,
                 )
 
             except Exception as e:
@@ -652,6 +666,42 @@ async def update_query_settings(
 ####################################
 
 
+def check_models_ready(request: Request):
+    """
+    Reject requests that need the embedding or reranking models with a 503
+    while the background warm-up is still loading them.
+    """
+    if not getattr(request.app.state, "READY", True):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=ERROR_MESSAGES.MODELS_LOADING,
+        )
+
+
+def delete_colbert_embeddings(
+    request: Request, collection_name: str, file_id: Optional[str] = None
+):
+    """
+    Drop the stored ColBERT token embeddings of a collection's chunks, or of
+    one file's chunks in it, before they are removed from the vector DB.
+    """
+    delete_documents = getattr(request.app.state.rf, "delete_documents", None)
+    if not delete_documents:
+        return
+
+    try:
+        if file_id:
+            result = VECTOR_DB_CLIENT.query(
+                collection_name=collection_name, filter={"file_id": file_id}
+            )
+        else:
+            result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+        if result:
+            delete_documents(result.documents[0])
+    except Exception as e:
+        log.warning(f"Failed to delete ColBERT embeddings: {e}")
+
+
 def save_docs_to_vector_db(
     request: Request,
     docs,
@@ -793,6 +843,14 @@ def save_docs_to_vector_db(
             items=items,
         )
 
+        # Precompute ColBERT token embeddings so reranking only encodes the query
+        index_documents = getattr(request.app.state.rf, "index_documents", None)
+        if index_documents:
+            try:
+                index_documents(texts)
+            except Exception as e:
+                log.warning(f"Failed to precompute ColBERT embeddings: {e}")
+
         return True
     except Exception as e:
         log.exception(e)
@@ -811,6 +869,9 @@ def process_file(
     form_data: ProcessFileForm,
     user=Depends(get_verified_user),
 ):
+    # Also called directly by the files and knowledge routers
+    check_models_ready(request)
+
     try:
         file = Files.get_file_by_id(form_data.file_id)
 
@@ -823,6 +884,7 @@ def process_file(
             # Update the content in the file
             # Usage: /files/{file_id}/data/content/update
 
+            delete_colbert_embeddings(request, f"file-{file.id}")
             VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
 
             docs = [
@@ -971,7 +1033,7 @@ class ProcessTextForm(BaseModel):
     collection_name: Optional[str] = None
 
 
-@router.post("/process/text")
+@router.post("/process/text", dependencies=[Depends(check_models_ready)])
 def process_text(
     request: Request,
     form_data: ProcessTextForm,
@@ -1004,7 +1066,7 @@ def process_text(
         )
 
 
-@router.post("/process/youtube")
+@router.post("/process/youtube", dependencies=[Depends(check_models_ready)])
 def process_youtube_video(
     request: Request, form_data: ProcessUrlForm, user=Depends(get_verified_user)
 ):
@@ -1046,7 +1108,7 @@ def process_youtube_video(
         )
 
 
-@router.post("/process/web")
+@router.post("/process/web", dependencies=[Depends(check_models_ready)])
 def process_web(
     request: Request, form_data: ProcessUrlForm, user=Depends(get_verified_user)
 ):
@@ -1237,7 +1299,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
         raise Exception("No search engine API key found in environment variables")
 
 
-@router.post("/process/web/search")
+@router.post("/process/web/search", dependencies=[Depends(check_models_ready)])
 def process_web_search(
     request: Request, form_data: SearchForm, user=Depends(get_verified_user)
 ):
@@ -1295,7 +1357,7 @@ class QueryDocForm(BaseModel):
     hybrid: Optional[bool] = None
 
 
-@router.post("/query/doc")
+@router.post("/query/doc", dependencies=[Depends(check_models_ready)])
 def query_doc_handler(
     request: Request,
     form_data: QueryDocForm,
@@ -1337,7 +1399,7 @@ class QueryCollectionsForm(BaseModel):
     hybrid: Optional[bool] = None
 
 
-@router.post("/query/collection")
+@router.post("/query/collection", dependencies=[Depends(check_models_ready)])
 def query_collection_handler(
     request: Request,
     form_data: QueryCollectionsForm,
@@ -1435,7 +1497,7 @@ def reset_upload_dir(user=Depends(get_admin_user)) -> bool:
 
 if ENV == "dev":
 
-    @router.get("/ef/{text}")
+    @router.get("/ef/{text}", dependencies=[Depends(check_models_ready)])
     async def get_embeddings(request: Request, text: Optional[str] = "Hello World!"):
         return {"result": request.app.state.EMBEDDING_FUNCTION(text)}
 
@@ -1465,6 +1527,8 @@ def process_files_batch(
     """
     Process a batch of files and save them to the vector database.
     """
+    check_models_ready(request)
+
     results: List[BatchProcessFilesResult] = []
     errors: List[BatchProcessFilesResult] = []
     collection_name = form_data.collection_name
@@ -12,7 +12,7 @@ from open_webui.utils.plugin import load_tools_module_by_id, replace_imports
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from open_webui.utils.tools import get_tools_specs
+from open_webui.utils.tools import get_tools_specs, TOOL_REGISTRY
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
 
@@ -96,6 +96,7 @@ async def create_new_tools(
 
             TOOLS = request.app.state.TOOLS
             TOOLS[form_data.id] = tools_module
+            TOOL_REGISTRY.invalidate(form_data.id)
 
             specs = get_tools_specs(TOOLS[form_data.id])
             tools = Tools.insert_new_tool(user.id, form_data, specs)
@@ -185,6 +186,7 @@ async def update_tools_by_id(
 
         TOOLS = request.app.state.TOOLS
         TOOLS[id] = tools_module
+        TOOL_REGISTRY.invalidate(id)
 
         specs = get_tools_specs(TOOLS[id])
 
@@ -238,6 +240,7 @@ async def delete_tools_by_id(
         TOOLS = request.app.state.TOOLS
         if id in TOOLS:
             del TOOLS[id]
+        TOOL_REGISTRY.invalidate(id)
 
     return result
 
@@ -337,6 +340,7 @@ async def update_tools_valves_by_id(
         form_data = {k: v for k, v in form_data.items() if v is not None}
         valves = Valves(**form_data)
         Tools.update_tool_valves_by_id(id, valves.model_dump())
+        TOOL_REGISTRY.invalidate_valves(id)
         return valves.model_dump()
     except Exception as e:
         print(e)
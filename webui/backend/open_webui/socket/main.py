@@ -10,11 +10,16 @@ from open_webui.models.chats import Chats
 
 from open_webui.env import (
     ENABLE_WEBSOCKET_SUPPORT,
+    WEBSOCKET_EVENT_BATCH_INTERVAL,
     WEBSOCKET_MANAGER,
     WEBSOCKET_REDIS_URL,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock
+from open_webui.socket.utils import (
+    LocalPresenceStore,
+    RedisLock,
+    RedisPresenceStore,
+)
 
 from open_webui.env import (
     GLOBAL_LOG_LEVEL,
@@ -50,13 +55,15 @@ else:
 # Timeout duration in seconds
 TIMEOUT_DURATION = 3
 
-# Dictionary to maintain the user pool
+# Seconds after which sessions of a worker that stopped refreshing them expire
+SESSION_TTL = 120
+SESSION_REFRESH_INTERVAL = 30
+
+# Sessions, online users and model usage
 
 if WEBSOCKET_MANAGER == "redis":
     log.debug("Using Redis to manage websockets.")
-    SESSION_POOL = RedisDict("open-webui:session_pool", redis_url=WEBSOCKET_REDIS_URL)
-    USER_POOL = RedisDict("open-webui:user_pool", redis_url=WEBSOCKET_REDIS_URL)
-    USAGE_POOL = RedisDict("open-webui:usage_pool", redis_url=WEBSOCKET_REDIS_URL)
+    PRESENCE = RedisPresenceStore(WEBSOCKET_REDIS_URL, session_ttl=SESSION_TTL)
 
     clean_up_lock = RedisLock(
         redis_url=WEBSOCKET_REDIS_URL,
@@ -67,9 +74,7 @@ if WEBSOCKET_MANAGER == "redis":
     renew_func = clean_up_lock.renew_lock
     release_func = clean_up_lock.release_lock
 else:
-    SESSION_POOL = {}
-    USER_POOL = {}
-    USAGE_POOL = {}
+    PRESENCE = LocalPresenceStore()
     aquire_func = release_func = renew_func = lambda: True
 
 
@@ -84,28 +89,7 @@ async def periodic_usage_pool_cleanup():
                 log.error(f"Unable to renew cleanup lock. Exiting usage pool cleanup.")
                 raise Exception("Unable to renew usage pool cleanup lock.")
 
-            now = int(time.time())
-            send_usage = False
-            for model_id, connections in list(USAGE_POOL.items()):
-                # Creating a list of sids to remove if they have timed out
-                expired_sids = [
-                    sid
-                    for sid, details in connections.items()
-                    if now - details["updated_at"] > TIMEOUT_DURATION
-                ]
-
-                for sid in expired_sids:
-                    del connections[sid]
-
-                if not connections:
-                    log.debug(f"Cleaning up model {model_id} from usage pool")
-                    del USAGE_POOL[model_id]
-                else:
-                    USAGE_POOL[model_id] = connections
-
-                send_usage = True
-
-            if send_usage:
+            if PRESENCE.cleanup_usage(TIMEOUT_DURATION):
                 # Emit updated usage information after cleaning
                 await sio.emit("usage", {"models": get_models_in_use()})
 
@@ -114,6 +98,16 @@ async def periodic_usage_pool_cleanup():
         release_func()
 
 
+async def periodic_session_refresh():
+    # Keeps this worker's sessions from expiring while they are connected
+    while True:
+        await asyncio.sleep(SESSION_REFRESH_INTERVAL)
+        try:
+            PRESENCE.refresh_sessions()
+        except Exception as e:
+            log.warning(f"Unable to refresh socket sessions: {e}")
+
+
 app = socketio.ASGIApp(
     sio,
     socketio_path="/ws/socket.io",
@@ -122,7 +116,7 @@ app = socketio.ASGIApp(
 
 def get_models_in_use():
     # List models that are currently in use
-    models_in_use = list(USAGE_POOL.keys())
+    models_in_use = PRESENCE.get_models_in_use(TIMEOUT_DURATION)
     return models_in_use
 
 
@@ -130,13 +124,7 @@ def get_models_in_use():
 async def usage(sid, data):
     model_id = data["model"]
     # Record the timestamp for the last update
-    current_time = int(time.time())
-
-    # Store the new usage data and task
-    USAGE_POOL[model_id] = {
-        **(USAGE_POOL[model_id] if model_id in USAGE_POOL else {}),
-        sid: {"updated_at": current_time},
-    }
+    PRESENCE.update_usage(model_id)
 
     # Broadcast the usage data to all clients
     await sio.emit("usage", {"models": get_models_in_use()})
@@ -152,14 +140,11 @@ async def connect(sid, environ, auth):
             user = Users.get_user_by_id(data["id"])
 
         if user:
-            SESSION_POOL[sid] = user.model_dump()
-            if user.id in USER_POOL:
-                USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-            else:
-                USER_POOL[user.id] = [sid]
+            PRESENCE.add_session(sid, user.model_dump())
+            await sio.enter_room(sid, f"user:{user.id}")
 
             # print(f"user {user.name}({user.id}) connected with session ID {sid}")
-            await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+            await sio.emit("user-list", {"user_ids": PRESENCE.get_user_ids()})
             await sio.emit("usage", {"models": get_models_in_use()})
 
 
@@ -178,11 +163,8 @@ async def user_join(sid, data):
     if not user:
         return
 
-    SESSION_POOL[sid] = user.model_dump()
-    if user.id in USER_POOL:
-        USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-    else:
-        USER_POOL[user.id] = [sid]
+    PRESENCE.add_session(sid, user.model_dump())
+    await sio.enter_room(sid, f"user:{user.id}")
 
     # Join all the channels
     channels = Channels.get_channels_by_user_id(user.id)
@@ -192,7 +174,7 @@ async def user_join(sid, data):
 
     # print(f"user {user.name}({user.id}) connected with session ID {sid}")
 
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    await sio.emit("user-list", {"user_ids": PRESENCE.get_user_ids()})
     return {"id": user.id, "name": user.name}
 
 
@@ -239,7 +221,7 @@ async def channel_events(sid, data):
                 "channel_id": data["channel_id"],
                 "message_id": data.get("message_id", None),
                 "data": event_data,
-                "user": UserNameResponse(**SESSION_POOL[sid]).model_dump(),
+                "user": UserNameResponse(**PRESENCE.get_session_user(sid)).model_dump(),
             },
             room=room,
         )
@@ -247,44 +229,76 @@ async def channel_events(sid, data):
 
 @sio.on("user-list")
 async def user_list(sid):
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    await sio.emit("user-list", {"user_ids": PRESENCE.get_user_ids()})
 
 
 @sio.event
 async def disconnect(sid):
-    if sid in SESSION_POOL:
-        user = SESSION_POOL[sid]
-        del SESSION_POOL[sid]
-
-        user_id = user["id"]
-        USER_POOL[user_id] = [_sid for _sid in USER_POOL[user_id] if _sid != sid]
-
-        if len(USER_POOL[user_id]) == 0:
-            del USER_POOL[user_id]
-
-        await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    user = PRESENCE.remove_session(sid)
+    if user:
+        await sio.emit("user-list", {"user_ids": PRESENCE.get_user_ids()})
     else:
         pass
         # print(f"Unknown session ID {sid} disconnected")
 
 
+def is_coalescable_event(event_data) -> bool:
+    # Streamed snapshots carry the whole message so far, only the latest matters
+    return (
+        event_data.get("type") == "chat:completion"
+        and isinstance(event_data.get("data"), dict)
+        and list(event_data["data"].keys()) == ["content"]
+    )
+
+
 def get_event_emitter(request_info):
-    async def __event_emitter__(event_data):
-        user_id = request_info["user_id"]
-        session_ids = list(
-            set(USER_POOL.get(user_id, []) + [request_info["session_id"]])
+    # Every session of the user joins this room on connect, so one emit
+    # reaches all of their tabs regardless of the worker they are on
+    room = f"user:{request_info['user_id']}"
+
+    emit_lock = asyncio.Lock()
+    pending_event = None
+    flush_task = None
+
+    async def emit(event_data):
+        await sio.emit(
+            "chat-events",
+            {
+                "chat_id": request_info["chat_id"],
+                "message_id": request_info["message_id"],
+                "data": event_data,
+            },
+            room=room,
         )
 
-        for session_id in session_ids:
-            await sio.emit(
-                "chat-events",
-                {
-                    "chat_id": request_info["chat_id"],
-                    "message_id": request_info["message_id"],
-                    "data": event_data,
-                },
-                to=session_id,
-            )
+    async def flush():
+        nonlocal pending_event
+
+        async with emit_lock:
+            event_data, pending_event = pending_event, None
+            if event_data is not None:
+                await emit(event_data)
+
+    async def flush_later():
+        nonlocal flush_task
+
+        await asyncio.sleep(WEBSOCKET_EVENT_BATCH_INTERVAL)
+        flush_task = None
+        await flush()
+
+    async def __event_emitter__(event_data):
+        nonlocal pending_event, flush_task
+
+        if WEBSOCKET_EVENT_BATCH_INTERVAL and is_coalescable_event(event_data):
+            pending_event = event_data
+            if flush_task is None:
+                flush_task = asyncio.create_task(flush_later())
+            return
+
+        # Anything else goes out right after the snapshots queued before it
+        await flush()
+        async with emit_lock:
+            await emit(event_data)
 
         if "type" in event_data and event_data["type"] == "status":
             Chats.add_message_status_to_chat_by_id_and_message_id(
@@ -341,7 +355,7 @@ def get_event_call(request_info):
 
 
 def get_user_id_from_session_pool(sid):
-    user = SESSION_POOL.get(sid)
+    user = PRESENCE.get_session_user(sid)
     if user:
         return user["id"]
     return None
@@ -353,15 +367,13 @@ def get_user_ids_from_room(room):
         room=room,
     )
 
-    active_user_ids = list(
-        set(
-            [SESSION_POOL.get(session_id[0])["id"] for session_id in active_session_ids]
-        )
+    session_users = PRESENCE.get_session_users(
+        [session_id[0] for session_id in active_session_ids]
     )
+
+    active_user_ids = list(set([user["id"] for user in session_users if user]))
     return active_user_ids
 
 
 def get_active_status_by_user_id(user_id):
-    if user_id in USER_POOL:
-        return True
-    return False
+    return PRESENCE.is_user_active(user_id)
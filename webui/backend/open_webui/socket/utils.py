@@ -1,6 +1,9 @@
 import json
-import redis
+import time
 import uuid
+from typing import Optional
+
+import redis
 
 
 class RedisLock:
@@ -85,3 +88,182 @@ class RedisDict:
         if key not in self:
             self[key] = default
         return self[key]
+
+
+class LocalPresenceStore:
+    """
+    Socket sessions, online users and model usage of a single worker.
+    """
+
+    def __init__(self):
+        self.sessions: dict[str, dict] = {}  # sid -> user
+        self.user_sessions: dict[str, list[str]] = {}  # user id -> sids
+        self.usage: dict[str, float] = {}  # model id -> last used at
+
+    def add_session(self, sid: str, user: dict):
+        self.sessions[sid] = user
+        sids = self.user_sessions.setdefault(user["id"], [])
+        if sid not in sids:
+            sids.append(sid)
+
+    def remove_session(self, sid: str) -> Optional[dict]:
+        user = self.sessions.pop(sid, None)
+        if user is None:
+            return None
+
+        sids = [_sid for _sid in self.user_sessions.get(user["id"], []) if _sid != sid]
+        if sids:
+            self.user_sessions[user["id"]] = sids
+        else:
+            self.user_sessions.pop(user["id"], None)
+        return user
+
+    def get_session_user(self, sid: str) -> Optional[dict]:
+        return self.sessions.get(sid)
+
+    def get_session_users(self, sids: list[str]) -> list[Optional[dict]]:
+        return [self.sessions.get(sid) for sid in sids]
+
+    def get_user_ids(self) -> list[str]:
+        return list(self.user_sessions.keys())
+
+    def is_user_active(self, user_id: str) -> bool:
+        return user_id in self.user_sessions
+
+    def refresh_sessions(self):
+        pass
+
+    def update_usage(self, model_id: str):
+        self.usage[model_id] = time.time()
+
+    def get_models_in_use(self, timeout: float) -> list[str]:
+        now = time.time()
+        return [
+            model_id
+            for model_id, updated_at in self.usage.items()
+            if now - updated_at <= timeout
+        ]
+
+    def cleanup_usage(self, timeout: float) -> bool:
+        now = time.time()
+        expired = [
+            model_id
+            for model_id, updated_at in self.usage.items()
+            if now - updated_at > timeout
+        ]
+        for model_id in expired:
+            del self.usage[model_id]
+        return len(expired) > 0
+
+
+class RedisPresenceStore:
+    """
+    Socket sessions, online users and model usage shared between workers.
+
+    Each operation only touches the keys of one session, user or model:
+    session users are plain keys, a user's sessions and the online users are
+    sorted sets scored by last-seen time, and model usage is a sorted set
+    scored by last use, so no call reads or rewrites a whole pool. Every
+    worker refreshes the sessions it holds in one pipeline, which lets the
+    sessions of a crashed worker expire after `session_ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        prefix: str = "open-webui:presence",
+        session_ttl: int = 120,
+    ):
+        self.redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self.prefix = prefix
+        self.session_ttl = session_ttl
+
+        self.users_key = f"{prefix}:users"
+        self.usage_key = f"{prefix}:usage"
+
+        # Sessions connected to this worker, sid -> user id
+        self.local_sessions: dict[str, str] = {}
+
+    def get_session_key(self, sid: str) -> str:
+        return f"{self.prefix}:session:{sid}"
+
+    def get_user_sessions_key(self, user_id: str) -> str:
+        return f"{self.prefix}:user:{user_id}:sessions"
+
+    def add_session(self, sid: str, user: dict):
+        now = time.time()
+        user_sessions_key = self.get_user_sessions_key(user["id"])
+
+        pipe = self.redis.pipeline()
+        pipe.set(self.get_session_key(sid), json.dumps(user), ex=self.session_ttl)
+        pipe.zadd(user_sessions_key, {sid: now})
+        pipe.expire(user_sessions_key, self.session_ttl)
+        pipe.zadd(self.users_key, {user["id"]: now})
+        pipe.execute()
+
+        self.local_sessions[sid] = user["id"]
+
+    def remove_session(self, sid: str) -> Optional[dict]:
+        self.local_sessions.pop(sid, None)
+        user = self.get_session_user(sid)
+        if user is None:
+            return None
+
+        user_sessions_key = self.get_user_sessions_key(user["id"])
+        pipe = self.redis.pipeline()
+        pipe.delete(self.get_session_key(sid))
+        pipe.zrem(user_sessions_key, sid)
+        pipe.zremrangebyscore(user_sessions_key, "-inf", time.time() - self.session_ttl)
+        pipe.zcard(user_sessions_key)
+        *_, remaining = pipe.execute()
+
+        if remaining == 0:
+            self.redis.zrem(self.users_key, user["id"])
+        return user
+
+    def get_session_user(self, sid: str) -> Optional[dict]:
+        value = self.redis.get(self.get_session_key(sid))
+        return json.loads(value) if value else None
+
+    def get_session_users(self, sids: list[str]) -> list[Optional[dict]]:
+        if not sids:
+            return []
+        values = self.redis.mget([self.get_session_key(sid) for sid in sids])
+        return [json.loads(value) if value else None for value in values]
+
+    def get_user_ids(self) -> list[str]:
+        return self.redis.zrangebyscore(
+            self.users_key, time.time() - self.session_ttl, "+inf"
+        )
+
+    def is_user_active(self, user_id: str) -> bool:
+        last_seen = self.redis.zscore(self.users_key, user_id)
+        return last_seen is not None and last_seen > time.time() - self.session_ttl
+
+    def refresh_sessions(self):
+        now = time.time()
+
+        pipe = self.redis.pipeline(transaction=False)
+        for sid, user_id in self.local_sessions.items():
+            user_sessions_key = self.get_user_sessions_key(user_id)
+            pipe.expire(self.get_session_key(sid), self.session_ttl)
+            pipe.zadd(user_sessions_key, {sid: now})
+            pipe.expire(user_sessions_key, self.session_ttl)
+            pipe.zadd(self.users_key, {user_id: now})
+        # Users whose sessions all belonged to workers that are gone
+        pipe.zremrangebyscore(self.users_key, "-inf", now - self.session_ttl)
+        pipe.execute()
+
+    def update_usage(self, model_id: str):
+        self.redis.zadd(self.usage_key, {model_id: time.time()})
+
+    def get_models_in_use(self, timeout: float) -> list[str]:
+        return self.redis.zrangebyscore(
+            self.usage_key, time.time() - timeout, "+inf"
+        )
+
+    def cleanup_usage(self, timeout: float) -> bool:
+        return (
+            self.redis.zremrangebyscore(self.usage_key, "-inf", time.time() - timeout)
+            > 0
+        )
@@ -1,28 +1,199 @@
 # tasks.py
 import asyncio
-from typing import Dict
+import json
+import logging
+import os
+import socket
+import time
+from typing import Dict, Optional
 from uuid import uuid4
 
+from open_webui.env import SRC_LOG_LEVELS, TASKS_REDIS_URL
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
 # A dictionary to keep track of active tasks
 tasks: Dict[str, asyncio.Task] = {}
 
+# Metadata of the active tasks, only used when no Redis is configured
+task_records: Dict[str, dict] = {}
+
+# Identifies this process as the owner of the tasks it creates
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+WORKER_HEARTBEAT_INTERVAL = 10
+WORKER_HEARTBEAT_TTL = 30
+
+# Records outliving this are dropped even if the owner never cleaned them up
+TASK_RECORD_TTL = 24 * 60 * 60
+
+REDIS_KEY_PREFIX = "open-webui:tasks"
+REDIS_STOP_CHANNEL = f"{REDIS_KEY_PREFIX}:stop"
+
+redis_client = None
+
+
+def get_redis():
+    global redis_client
+    if TASKS_REDIS_URL and redis_client is None:
+        import redis.asyncio as aioredis
+
+        redis_client = aioredis.from_url(TASKS_REDIS_URL, decode_responses=True)
+    return redis_client
+
+
+def get_task_key(task_id: str) -> str:
+    return f"{REDIS_KEY_PREFIX}:task:{task_id}"
+
+
+def get_user_tasks_key(user_id: str) -> str:
+    return f"{REDIS_KEY_PREFIX}:user:{user_id}"
+
+
+def get_worker_key(worker_id: str) -> str:
+    return f"{REDIS_KEY_PREFIX}:worker:{worker_id}"
+
+
+async def register_task(task_id: str, record: dict):
+    """
+    Record a task in the registry so that other workers can list and stop it.
+    """
+    redis = get_redis()
+    if redis is None:
+        task_records[task_id] = record
+        return
+
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hset(
+                get_task_key(task_id),
+                mapping={key: json.dumps(value) for key, value in record.items()},
+            )
+            pipe.expire(get_task_key(task_id), TASK_RECORD_TTL)
+            pipe.sadd(f"{REDIS_KEY_PREFIX}:all", task_id)
+            if record.get("user_id"):
+                pipe.sadd(get_user_tasks_key(record["user_id"]), task_id)
+            # Make sure the owner is known to be alive before the first heartbeat
+            pipe.set(get_worker_key(WORKER_ID), 1, ex=WORKER_HEARTBEAT_TTL)
+            await pipe.execute()
+    except Exception as e:
+        log.warning(f"Failed to register task {task_id}: {e}")
+
+
+async def unregister_task(task_id: str, user_id: Optional[str] = None):
+    """
+    Remove a task from the registry.
+    """
+    redis = get_redis()
+    if redis is None:
+        task_records.pop(task_id, None)
+        return
+
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.delete(get_task_key(task_id))
+            pipe.srem(f"{REDIS_KEY_PREFIX}:all", task_id)
+            if user_id:
+                pipe.srem(get_user_tasks_key(user_id), task_id)
+            await pipe.execute()
+    except Exception as e:
+        log.warning(f"Failed to unregister task {task_id}: {e}")
+
+
+async def get_task_records(
+    task_ids: list[str], user_id: Optional[str] = None
+) -> Dict[str, dict]:
+    """
+    Fetch the records of the given tasks, dropping those whose owner worker
+    stopped sending heartbeats.
+    """
+    redis = get_redis()
+    if redis is None:
+        return {
+            task_id: task_records[task_id]
+            for task_id in task_ids
+            if task_id in task_records
+        }
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for task_id in task_ids:
+            pipe.hgetall(get_task_key(task_id))
+        results = await pipe.execute()
+
+    records = {
+        task_id: {key: json.loads(value) for key, value in result.items()}
+        for task_id, result in zip(task_ids, results)
+        if result
+    }
+
+    worker_ids = list({record.get("worker_id") for record in records.values()})
+    alive = dict(
+        zip(
+            worker_ids,
+            await redis.mget([get_worker_key(worker_id) for worker_id in worker_ids])
+            if worker_ids
+            else [],
+        )
+    )
+
+    # Tasks of workers that crashed or restarted are cleaned up lazily
+    for task_id in task_ids:
+        record = records.get(task_id)
+        if record is None:
+            await unregister_task(task_id, user_id)
+        elif not alive.get(record.get("worker_id")):
+            await unregister_task(task_id, record.get("user_id"))
+            del records[task_id]
+
+    return records
+
 
-def cleanup_task(task_id: str):
+# References to pending registry cleanups, so they are not garbage collected
+pending_unregistrations = set()
+
+
+def cleanup_task(task_id: str, user_id: Optional[str] = None):
     """
-    Remove a completed or canceled task from the global `tasks` dictionary.
+    Remove a completed or canceled task from the global `tasks` dictionary
+    and from the task registry.
     """
     tasks.pop(task_id, None)  # Remove the task if it exists
+    task_records.pop(task_id, None)
 
+    if get_redis() is not None:
+        future = asyncio.ensure_future(unregister_task(task_id, user_id))
+        pending_unregistrations.add(future)
+        future.add_done_callback(pending_unregistrations.discard)
 
-def create_task(coroutine):
+
+async def create_task(
+    coroutine,
+    user_id: Optional[str] = None,
+    chat_id: Optional[str] = None,
+    message_id: Optional[str] = None,
+):
     """
-    Create a new asyncio task and add it to the global task dictionary.
+    Create a new asyncio task, add it to the global task dictionary and
+    record it in the task registry.
     """
     task_id = str(uuid4())  # Generate a unique ID for the task
+    await register_task(
+        task_id,
+        {
+            "id": task_id,
+            "worker_id": WORKER_ID,
+            "user_id": user_id,
+            "chat_id": chat_id,
+            "message_id": message_id,
+            "status": "running",
+            "created_at": int(time.time()),
+        },
+    )
+
     task = asyncio.create_task(coroutine)  # Create the task
 
     # Add a done callback for cleanup
-    task.add_done_callback(lambda t: cleanup_task(task_id))
+    task.add_done_callback(lambda t: cleanup_task(task_id, user_id))
 
     tasks[task_id] = task
     return task_id, task
@@ -35,20 +206,51 @@ def get_task(task_id: str):
     return tasks.get(task_id)
 
 
-def list_tasks():
+async def get_task_record(task_id: str) -> Optional[dict]:
     """
-    List all currently active task IDs.
+    Retrieve the registry record of a task running on any worker.
     """
-    return list(tasks.keys())
+    return (await get_task_records([task_id])).get(task_id)
+
+
+async def list_tasks(user_id: Optional[str] = None):
+    """
+    List the IDs of the tasks currently running on any worker, optionally
+    only those of the given user.
+    """
+    redis = get_redis()
+    if redis is None:
+        return [
+            task_id
+            for task_id, record in task_records.items()
+            if user_id is None or record.get("user_id") == user_id
+        ]
+
+    task_ids = await redis.smembers(
+        get_user_tasks_key(user_id) if user_id else f"{REDIS_KEY_PREFIX}:all"
+    )
+    return list((await get_task_records(list(task_ids), user_id)).keys())
 
 
 async def stop_task(task_id: str):
     """
-    Cancel a running task and remove it from the global task list.
+    Cancel a running task, forwarding the request to the owning worker if the
+    task does not run on this one.
     """
     task = tasks.get(task_id)
     if not task:
-        raise ValueError(f"Task with ID {task_id} not found.")
+        record = await get_task_record(task_id)
+        if not record or get_redis() is None:
+            raise ValueError(f"Task with ID {task_id} not found.")
+
+        await get_redis().publish(
+            REDIS_STOP_CHANNEL,
+            json.dumps({"task_id": task_id, "worker_id": record["worker_id"]}),
+        )
+        return {
+            "status": True,
+            "message": f"Stop of task {task_id} requested on worker {record['worker_id']}.",
+        }
 
     task.cancel()  # Request task cancellation
     try:
@@ -59,3 +261,52 @@ async def stop_task(task_id: str):
         return {"status": True, "message": f"Task {task_id} successfully stopped."}
 
     return {"status": False, "message": f"Failed to stop task {task_id}."}
+
+
+async def send_worker_heartbeats():
+    while True:
+        try:
+            await get_redis().set(
+                get_worker_key(WORKER_ID), 1, ex=WORKER_HEARTBEAT_TTL
+            )
+        except Exception as e:
+            log.warning(f"Failed to send worker heartbeat: {e}")
+        await asyncio.sleep(WORKER_HEARTBEAT_INTERVAL)
+
+
+async def listen_for_stop_requests():
+    while True:
+        try:
+            async with get_redis().pubsub() as pubsub:
+                await pubsub.subscribe(REDIS_STOP_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+
+                    data = json.loads(message["data"])
+                    task = tasks.get(data.get("task_id"))
+                    if data.get("worker_id") == WORKER_ID and task:
+                        log.info(f"Stopping task {data['task_id']} on request")
+                        task.cancel()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning(f"Task stop subscription failed, retrying: {e}")
+            await asyncio.sleep(5)
+
+
+async def run_task_registry():
+    """
+    Keep this worker visible to the registry and cancel its tasks when another
+    worker forwards a stop request. Does nothing without Redis.
+    """
+    if get_redis() is None:
+        return
+
+    try:
+        await asyncio.gather(send_worker_heartbeats(), listen_for_stop_requests())
+    finally:
+        try:
+            await get_redis().delete(get_worker_key(WORKER_ID))
+        except Exception:
+            pass
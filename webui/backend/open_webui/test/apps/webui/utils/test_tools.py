@@ -0,0 +1,28 @@
+import pydantic
+import pytest
+from open_webui.utils.tools import function_to_pydantic_model
+
+
+async def get_weather(city: str, days: int = 1, __user__: dict = None) -> str:
+    """
+    Get the weather forecast for a city.
+
+    :param city: The city to look up.
+    :param days: How many days to forecast.
+    """
+    return city
+
+
+def test_internal_params_are_not_model_fields():
+    model = function_to_pydantic_model(get_weather)
+    assert set(model.model_fields) == {"city", "days"}
+    assert model.model_fields["city"].is_required()
+
+
+def test_model_validates_tool_call_arguments():
+    model = function_to_pydantic_model(get_weather)
+    params = model.model_validate({"city": "Paris", "days": "3"})
+    assert params.model_dump(exclude_unset=True) == {"city": "Paris", "days": 3}
+
+    with pytest.raises(pydantic.ValidationError):
+        model.model_validate({"days": 3})
@@ -0,0 +1,255 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+from open_webui.models.webhooks import WebhookModel
+from open_webui.utils import webhook
+
+
+class FakeWebhooks:
+    """In-memory stand-in for the webhook_outbox table."""
+
+    def __init__(self):
+        self.rows: dict[str, WebhookModel] = {}
+
+    def insert_new_webhook(self, url, digest, message, event_data):
+        now = int(time.time())
+        row = WebhookModel(
+            id=str(uuid.uuid4()),
+            url=url,
+            digest=digest,
+            message=message,
+            event_data=event_data,
+            status="pending",
+            attempts=0,
+            created_at=now,
+            updated_at=now,
+        )
+        self.rows[row.id] = row
+        return row
+
+    def get_pending_webhook_by_url_and_digest(self, url, digest):
+        for row in self.rows.values():
+            if (
+                row.url == url
+                and row.digest == digest
+                and row.status in ("pending", "delivering")
+            ):
+                return row
+        return None
+
+    def get_pending_webhooks(self):
+        return [row for row in self.rows.values() if row.status == "pending"]
+
+    def claim_webhook_by_id(self, id):
+        row = self.rows.get(id)
+        if row is None or row.status != "pending":
+            return False
+        row.status = "delivering"
+        return True
+
+    def reset_stale_webhooks(self, older_than):
+        return 0
+
+    def release_webhooks_by_ids(self, ids):
+        count = 0
+        for id in ids:
+            row = self.rows.get(id)
+            if row is not None and row.status == "delivering":
+                row.status = "pending"
+                count += 1
+        return count
+
+    def delete_failed_webhooks(self, older_than):
+        return 0
+
+    def update_webhook_failure_by_id(self, id, attempts, error, failed=False):
+        row = self.rows[id]
+        row.attempts = attempts
+        row.error = error
+        row.status = "failed" if failed else "delivering"
+        return True
+
+    def delete_webhooks_by_ids(self, ids):
+        for id in ids:
+            self.rows.pop(id, None)
+        return True
+
+
+class FakeResponse:
+    def __init__(self, status, headers=None):
+        self.status = status
+        self.headers = headers or {}
+
+    async def text(self):
+        return ""
+
+    def raise_for_status(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class FakeSession:
+    def __init__(self, status=200, headers=None, block=False):
+        self.status = status
+        self.headers = headers
+        self.block = block
+        self.closed = False
+        self.posts = []
+
+    def post(self, url, json=None):
+        self.posts.append((url, json))
+        if self.block:
+            return self._blocked()
+        return FakeResponse(self.status, self.headers)
+
+    def _blocked(self):
+        session = self
+
+        class Blocked(FakeResponse):
+            async def __aenter__(self):
+                await asyncio.Event().wait()
+
+        return Blocked(session.status)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    fake = FakeWebhooks()
+    monkeypatch.setattr(webhook, "Webhooks", fake)
+    return fake
+
+
+async def wait_for_workers(dispatcher):
+    while dispatcher.workers:
+        await asyncio.gather(*dispatcher.workers.values(), return_exceptions=True)
+
+
+def test_digest_depends_on_event_id():
+    args = ("https://example.com/hook", "hello", {"action": "chat"})
+    assert webhook.get_webhook_digest(*args, "a") == webhook.get_webhook_digest(
+        *args, "a"
+    )
+    assert webhook.get_webhook_digest(*args, "a") != webhook.get_webhook_digest(
+        *args, "b"
+    )
+    assert webhook.get_webhook_digest(*args) != webhook.get_webhook_digest(*args)
+
+
+def test_only_same_event_is_deduplicated(outbox):
+    dispatcher = webhook.WebhookDispatcher()
+    url = "https://example.com/hook"
+
+    # Without a running loop entries stay pending in the outbox
+    assert dispatcher.enqueue(url, "hello", {}, event_id="chat:1")
+    assert dispatcher.enqueue(url, "hello", {}, event_id="chat:1")
+    assert dispatcher.enqueue(url, "hello", {}, event_id="chat:2")
+    assert dispatcher.enqueue(url, "hello", {})
+    assert dispatcher.enqueue(url, "hello", {})
+
+    assert len(outbox.rows) == 4
+
+
+def test_delivered_entries_are_removed(outbox):
+    async def run():
+        dispatcher = webhook.WebhookDispatcher(coalesce_window=0)
+        dispatcher.session = FakeSession()
+        await dispatcher.start()
+
+        dispatcher.enqueue("https://example.com/a", "one", {"action": "chat"})
+        dispatcher.enqueue("https://example.com/b", "two", {"action": "chat"})
+        await wait_for_workers(dispatcher)
+        await dispatcher.stop()
+        return dispatcher
+
+    dispatcher = asyncio.run(run())
+    assert outbox.rows == {}
+    assert dispatcher.claimed == set()
+
+
+def test_pending_entries_are_replayed_on_start(outbox):
+    url = "https://example.com/hook"
+    webhook.WebhookDispatcher().enqueue(url, "queued before start", {})
+    assert len(outbox.get_pending_webhooks()) == 1
+
+    async def run():
+        dispatcher = webhook.WebhookDispatcher(coalesce_window=0)
+        dispatcher.session = FakeSession()
+        await dispatcher.start()
+        await wait_for_workers(dispatcher)
+        await dispatcher.stop()
+
+    asyncio.run(run())
+    assert outbox.rows == {}
+
+
+def test_stop_hands_claimed_entries_back(outbox):
+    async def run():
+        dispatcher = webhook.WebhookDispatcher(coalesce_window=0)
+        dispatcher.session = FakeSession(block=True)
+        await dispatcher.start()
+
+        dispatcher.enqueue("https://example.com/hook", "stuck", {})
+        await asyncio.sleep(0.05)
+        assert [row.status for row in outbox.rows.values()] == ["delivering"]
+        await dispatcher.stop()
+
+    asyncio.run(run())
+    assert [row.status for row in outbox.rows.values()] == ["pending"]
+
+
+def test_failing_endpoint_is_retried_then_marked_failed(outbox):
+    async def run():
+        dispatcher = webhook.WebhookDispatcher(coalesce_window=0, max_retries=1)
+        session = FakeSession(status=500, headers={"Retry-After": "0"})
+        dispatcher.session = session
+        await dispatcher.start()
+
+        dispatcher.enqueue("https://example.com/hook", "boom", {})
+        await wait_for_workers(dispatcher)
+        await dispatcher.stop()
+        return session
+
+    session = asyncio.run(run())
+    (row,) = outbox.rows.values()
+    assert row.status == "failed"
+    assert row.attempts == 2
+    assert len(session.posts) == 2
+
+
+def test_teams_only_coalesces_events_with_same_event_data(outbox):
+    url = "https://example.webhook.office.com/hook"
+    alice = {"action": "signup", "user": '{"name": "alice"}'}
+    bob = {"action": "signup", "user": '{"name": "bob"}'}
+
+    async def run():
+        dispatcher = webhook.WebhookDispatcher(coalesce_window=0.01)
+        session = FakeSession()
+        dispatcher.session = session
+        await dispatcher.start()
+
+        dispatcher.enqueue(url, "alice joined", alice)
+        dispatcher.enqueue(url, "alice again", alice)
+        dispatcher.enqueue(url, "bob joined", bob)
+        await wait_for_workers(dispatcher)
+        await dispatcher.stop()
+        return session
+
+    session = asyncio.run(run())
+    assert outbox.rows == {}
+    assert [
+        (payload["summary"], payload["sections"][0]["facts"])
+        for _, payload in session.posts
+    ] == [
+        ("alice joined\n\nalice again", [{"name": "name", "value": "alice"}]),
+        ("bob joined", [{"name": "name", "value": "bob"}]),
+    ]
@@ -30,6 +30,7 @@ from open_webui.routers.tasks import (
     generate_title,
     generate_image_prompt,
     generate_chat_tags,
+    generate_chat_metadata,
 )
 from open_webui.routers.retrieval import process_web_search, SearchForm
 from open_webui.routers.images import image_generations, GenerateImageForm
@@ -70,6 +71,8 @@ from open_webui.env import (
     GLOBAL_LOG_LEVEL,
     BYPASS_MODEL_ACCESS_CONTROL,
     ENABLE_REALTIME_CHAT_SAVE,
+    TOOLS_FUNCTION_CALLING_TIMEOUT,
+    TOOLS_FUNCTION_CALLING_MAX_OUTPUT_LENGTH,
 )
 from open_webui.constants import TASKS
 
@@ -254,6 +257,89 @@ async def chat_completion_tools_handler(
         body["messages"], task_model_id, tools_function_calling_prompt
     )
 
+    def get_tool_calls_from_content(content: str) -> list[dict]:
+        content = content[content.find("{") : content.rfind("}") + 1]
+        if not content:
+            raise Exception("No JSON object found in the response")
+
+        result = json.loads(content)
+
+        # Accept both {"tool_calls": [...]} and a single {"name": ..., "parameters": ...}
+        tool_calls = result.get("tool_calls", [result])
+        if not isinstance(tool_calls, list):
+            tool_calls = [tool_calls]
+
+        unique_tool_calls = {}
+        for tool_call in tool_calls:
+            if not isinstance(tool_call, dict):
+                continue
+            if tool_call.get("name", None) not in tools:
+                continue
+
+            key = json.dumps(tool_call, sort_keys=True, default=str)
+            unique_tool_calls[key] = tool_call
+        return list(unique_tool_calls.values())
+
+    async def execute_tool_call(tool_call: dict) -> str:
+        tool_function_name = tool_call["name"]
+        tool_function_params = tool_call.get("parameters", {}) or {}
+
+        try:
+            required_params = (
+                tools[tool_function_name]
+                .get("spec", {})
+                .get("parameters", {})
+                .get("required", [])
+            )
+            tool_function = tools[tool_function_name]["callable"]
+            tool_function_params = {
+                k: v for k, v in tool_function_params.items() if k in required_params
+            }
+
+            # Coerce the model's arguments to the tool's signature, a mismatch
+            # is reported back as the tool output
+            pydantic_model = tools[tool_function_name].get("pydantic_model")
+            if pydantic_model is not None:
+                tool_function_params = pydantic_model.model_validate(
+                    tool_function_params
+                ).model_dump(exclude_unset=True)
+            tool_output = await asyncio.wait_for(
+                tool_function(**tool_function_params),
+                timeout=TOOLS_FUNCTION_CALLING_TIMEOUT,
+            )
+            description = f'Tool "{tool_function_name}" completed'
+        except asyncio.TimeoutError:
+            tool_output = f"Tool {tool_function_name} timed out after {TOOLS_FUNCTION_CALLING_TIMEOUT} seconds"
+            description = f'Tool "{tool_function_name}" timed out'
+        except Exception as e:
+            tool_output = str(e)
+            description = f'Tool "{tool_function_name}" failed'
+
+        if (
+            isinstance(tool_output, str)
+            and len(tool_output) > TOOLS_FUNCTION_CALLING_MAX_OUTPUT_LENGTH
+        ):
+            tool_output = (
+                f"{tool_output[:TOOLS_FUNCTION_CALLING_MAX_OUTPUT_LENGTH]}... (truncated)"
+            )
+
+        if event_emitter:
+            await event_emitter(
+                {
+                    "type": "status",
+                    "data": {
+                        "action": "tool_call",
+                        "description": description,
+                        "name": tool_function_name,
+                        "done": False,
+                    },
+                }
+            )
+
+        return tool_output
+
+    event_emitter = extra_params.get("__event_emitter__", None)
+
     try:
         response = await generate_chat_completion(request, form_data=payload, user=user)
         log.debug(f"{response=}")
@@ -264,37 +350,33 @@ async def chat_completion_tools_handler(
             return body, {}
 
         try:
-            content = content[content.find("{") : content.rfind("}") + 1]
-            if not content:
-                raise Exception("No JSON object found in the response")
-
-            result = json.loads(content)
-
-            tool_function_name = result.get("name", None)
-            if tool_function_name not in tools:
+            tool_calls = get_tool_calls_from_content(content)
+            if not tool_calls:
                 return body, {}
 
-            tool_function_params = result.get("parameters", {})
+            # All calls come from a single completion and cannot depend on each
+            # other's output, so they are executed concurrently
+            tool_outputs = await asyncio.gather(
+                *[execute_tool_call(tool_call) for tool_call in tool_calls]
+            )
 
-            try:
-                required_params = (
-                    tools[tool_function_name]
-                    .get("spec", {})
-                    .get("parameters", {})
-                    .get("required", [])
+            if event_emitter:
+                await event_emitter(
+                    {
+                        "type": "status",
+                        "data": {
+                            "action": "tool_call",
+                            "description": f"Called {len(tool_calls)} tool(s)",
+                            "done": True,
+                        },
+                    }
                 )
-                tool_function = tools[tool_function_name]["callable"]
-                tool_function_params = {
-                    k: v
-                    for k, v in tool_function_params.items()
-                    if k in required_params
-                }
-                tool_output = await tool_function(**tool_function_params)
 
-            except Exception as e:
-                tool_output = str(e)
+            for tool_call, tool_output in zip(tool_calls, tool_outputs):
+                tool_function_name = tool_call["name"]
+                if not isinstance(tool_output, str):
+                    continue
 
-            if isinstance(tool_output, str):
                 if tools[tool_function_name]["citation"]:
                     sources.append(
                         {
@@ -589,7 +671,13 @@ async def chat_completion_files_handler(
 ) -> tuple[dict, dict[str, list]]:
     sources = []
 
-    if files := body.get("metadata", {}).get("files", None):
+    files = body.get("metadata", {}).get("files", None)
+    if files and not getattr(request.app.state, "READY", True):
+        # The embedding function is not set until the warm-up has finished
+        log.warning("Retrieval models are still loading, skipping file retrieval")
+        files = None
+
+    if files:
         try:
             queries_response = await generate_queries(
                 request,
@@ -864,67 +952,78 @@ async def process_chat_payload(request, form_data, metadata, user, model):
     return form_data, events
 
 
+# References to running background tasks, so they are not garbage collected
+pending_background_tasks = set()
+
+
 async def process_chat_response(
     request, response, form_data, user, events, metadata, tasks
 ):
-    async def background_tasks_handler():
-        message_map = Chats.get_messages_by_chat_id(metadata["chat_id"])
-        message = message_map.get(metadata["message_id"]) if message_map else None
-
-        if message:
-            messages = get_message_list(message_map, message.get("id"))
+    def get_content_from_task_response(res) -> Optional[str]:
+        if res and isinstance(res, dict) and len(res.get("choices", [])) == 1:
+            return res["choices"][0].get("message", {}).get("content", None)
+        return None
+
+    async def generate_title_and_tags(model_id, messages):
+        # One structured completion for both, only when the default templates are
+        # in use so that customised title/tags prompts are still honoured
+        if (
+            request.app.state.config.TITLE_GENERATION_PROMPT_TEMPLATE != ""
+            or request.app.state.config.TAGS_GENERATION_PROMPT_TEMPLATE != ""
+        ):
+            return None, None
 
-            if tasks:
-                if TASKS.TITLE_GENERATION in tasks:
-                    if tasks[TASKS.TITLE_GENERATION]:
-                        res = await generate_title(
-                            request,
-                            {
-                                "model": message["model"],
-                                "messages": messages,
-                                "chat_id": metadata["chat_id"],
-                            },
-                            user,
-                        )
+        res = await generate_chat_metadata(
+            request,
+            {
+                "model": model_id,
+                "messages": messages,
+                "chat_id": metadata["chat_id"],
+            },
+            user,
+        )
 
-                        if res and isinstance(res, dict):
-                            if len(res.get("choices", [])) == 1:
-                                title = (
-                                    res.get("choices", [])[0]
-                                    .get("message", {})
-                                    .get(
-                                        "content",
-                                        message.get("content", "New Chat"),
-                                    )
-                                ).strip()
-                            else:
-                                title = None
+        content = get_content_from_task_response(res) or ""
+        try:
+            result = json.loads(content[content.find("{") : content.rfind("}") + 1])
+        except Exception:
+            log.debug("Falling back to separate title and tags generation")
+            return None, None
+
+        title = result.get("title", None)
+        tags = result.get("tags", None)
+        return (
+            title.strip() if isinstance(title, str) and title.strip() else None,
+            tags if isinstance(tags, list) else None,
+        )
 
-                            if not title:
-                                title = messages[0].get("content", "New Chat")
+    async def background_tasks_handler():
+        message_map = Chats.get_messages_by_chat_id(metadata["chat_id"])
+        message = message_map.get(metadata["message_id"]) if message_map else None
 
-                            Chats.update_chat_title_by_id(metadata["chat_id"], title)
+        if not (message and tasks):
+            return
 
-                            await event_emitter(
-                                {
-                                    "type": "chat:title",
-                                    "data": title,
-                                }
-                            )
-                    elif len(messages) == 2:
-                        title = messages[0].get("content", "New Chat")
+        messages = get_message_list(message_map, message.get("id"))
 
-                        Chats.update_chat_title_by_id(metadata["chat_id"], title)
+        title_enabled = bool(tasks.get(TASKS.TITLE_GENERATION))
+        tags_enabled = (
+            bool(tasks.get(TASKS.TAGS_GENERATION))
+            and request.app.state.config.ENABLE_TAGS_GENERATION
+        )
 
-                        await event_emitter(
-                            {
-                                "type": "chat:title",
-                                "data": message.get("content", "New Chat"),
-                            }
-                        )
+        title = None
+        tags = None
+        if title_enabled and tags_enabled:
+            try:
+                title, tags = await generate_title_and_tags(message["model"], messages)
+            except Exception as e:
+                log.exception(e)
 
-                if TASKS.TAGS_GENERATION in tasks and tasks[TASKS.TAGS_GENERATION]:
-                    res = await generate_chat_tags(
+        if TASKS.TITLE_GENERATION in tasks:
+            if title_enabled:
+                if title is None:
+                    res = await generate_title(
                         request,
                         {
                             "model": message["model"],
@@ -935,33 +1034,75 @@ async def process_chat_response(
                     )
 
                     if res and isinstance(res, dict):
-                        if len(res.get("choices", [])) == 1:
-                            tags_string = (
-                                res.get("choices", [])[0]
-                                .get("message", {})
-                                .get("content", "")
-                            )
-                        else:
-                            tags_string = ""
+                        title = (
+                            get_content_from_task_response(res)
+                            if len(res.get("choices", [])) == 1
+                            else None
+                        )
+                        title = title.strip() if title else None
 
-                        tags_string = tags_string[
-                            tags_string.find("{") : tags_string.rfind("}") + 1
-                        ]
+                        if not title:
+                            title = messages[0].get("content", "New Chat")
 
-                        try:
-                            tags = json.loads(tags_string).get("tags", [])
-                            Chats.update_chat_tags_by_id(
-                                metadata["chat_id"], tags, user
-                            )
+                if title:
+                    Chats.update_chat_title_by_id(metadata["chat_id"], title)
 
-                            await event_emitter(
-                                {
-                                    "type": "chat:tags",
-                                    "data": tags,
-                                }
-                            )
-                        except Exception as e:
-                            pass
+                    await event_emitter(
+                        {
+                            "type": "chat:title",
+                            "data": title,
+                        }
+                    )
+            elif len(messages) == 2:
+                title = messages[0].get("content", "New Chat")
+
+                Chats.update_chat_title_by_id(metadata["chat_id"], title)
+
+                await event_emitter(
+                    {
+                        "type": "chat:title",
+                        "data": message.get("content", "New Chat"),
+                    }
+                )
+
+        if TASKS.TAGS_GENERATION in tasks and tasks[TASKS.TAGS_GENERATION]:
+            if tags is None:
+                res = await generate_chat_tags(
+                    request,
+                    {
+                        "model": message["model"],
+                        "messages": messages,
+                        "chat_id": metadata["chat_id"],
+                    },
+                    user,
+                )
+
+                if res and isinstance(res, dict):
+                    tags_string = get_content_from_task_response(res) or ""
+                    tags_string = tags_string[
+                        tags_string.find("{") : tags_string.rfind("}") + 1
+                    ]
+
+                    try:
+                        tags = json.loads(tags_string).get("tags", [])
+                    except Exception as e:
+                        pass
+
+            if tags is not None:
+                Chats.update_chat_tags_by_id(metadata["chat_id"], tags, user)
+
+                await event_emitter(
+                    {
+                        "type": "chat:tags",
+                        "data": tags,
+                    }
+                )
+
+    def run_background_tasks():
+        # Title and tags generation should not hold up the response
+        task = asyncio.create_task(background_tasks_handler())
+        pending_background_tasks.add(task)
+        task.add_done_callback(pending_background_tasks.discard)
 
     event_emitter = None
     if (
@@ -1033,9 +1174,10 @@ async def process_chat_response(
                                     "title": title,
                                     "url": f"{request.app.state.config.WEBUI_URL}/c/{metadata['chat_id']}",
                                 },
+                                event_id=f"chat:{metadata['message_id']}",
                             )
 
-                    await background_tasks_handler()
+                    run_background_tasks()
 
             return response
         else:
@@ -1242,6 +1384,7 @@ async def process_chat_response(
                                 "title": title,
                                 "url": f"{request.app.state.config.WEBUI_URL}/c/{metadata['chat_id']}",
                             },
+                            event_id=f"chat:{metadata['message_id']}",
                         )
 
                 await event_emitter(
@@ -1251,7 +1394,7 @@ async def process_chat_response(
                     }
                 )
 
-                await background_tasks_handler()
+                run_background_tasks()
             except asyncio.CancelledError:
                 print("Task was cancelled!")
                 await event_emitter({"type": "task-cancelled"})
@@ -1270,7 +1413,12 @@ async def process_chat_response(
                 await response.background()
 
         # background_tasks.add_task(post_response_handler, response, events)
-        task_id, _ = create_task(post_response_handler(response, events))
+        task_id, _ = await create_task(
+            post_response_handler(response, events),
+            user_id=user.id,
+            chat_id=metadata["chat_id"],
+            message_id=metadata["message_id"],
+        )
         return {"status": True, "task_id": task_id}
 
     else:
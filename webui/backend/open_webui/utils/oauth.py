@@ -300,6 +300,7 @@ class OAuthManager:
                             "message": WEBHOOK_MESSAGES.USER_SIGNUP(user.name),
                             "user": user.model_dump_json(exclude_none=True),
                         },
+                        event_id=f"signup:{user.id}",
                     )
             else:
                 raise HTTPException(
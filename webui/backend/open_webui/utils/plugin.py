@@ -68,7 +68,7 @@ def replace_imports(content):
     return content
 
 
-def load_tools_module_by_id(toolkit_id, content=None):
+def load_tools_module_by_id(toolkit_id, content=None, install_requirements=True):
 
     if content is None:
         tool = Tools.get_tool_by_id(toolkit_id)
@@ -79,7 +79,7 @@ def load_tools_module_by_id(toolkit_id, content=None):
 
         content = replace_imports(content)
         Tools.update_tool_by_id(toolkit_id, {"content": content})
-    else:
+    elif install_requirements:
         frontmatter = extract_frontmatter(content)
         # Install required packages found within the frontmatter
         install_frontmatter_requirements(frontmatter.get("requirements", ""))
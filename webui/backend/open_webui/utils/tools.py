@@ -1,7 +1,10 @@
+import asyncio
+import hashlib
 import inspect
 import logging
 import re
-from typing import Any, Awaitable, Callable, get_type_hints
+import time
+from typing import Any, Awaitable, Callable, Optional, get_type_hints
 from functools import update_wrapper, partial
 
 
@@ -12,7 +15,8 @@ from langchain_core.utils.function_calling import convert_to_openai_function
 
 from open_webui.models.tools import Tools
 from open_webui.models.users import UserModel
-from open_webui.utils.plugin import load_tools_module_by_id
+from open_webui.utils.plugin import load_tools_module_by_id, replace_imports
+from open_webui.env import TOOLS_REGISTRY_TTL
 
 log = logging.getLogger(__name__)
 
@@ -28,38 +32,63 @@ def apply_extra_params_to_tool_function(
         return partial_func
 
     async def new_function(*args, **kwargs):
-        return partial_func(*args, **kwargs)
+        # Run sync tools in a thread so that concurrent tool calls do not block the loop
+        return await asyncio.to_thread(partial_func, *args, **kwargs)
 
     update_wrapper(new_function, function)
     return new_function
 
 
-# Mutation on extra_params
-def get_tools(
-    request: Request, tool_ids: list[str], user: UserModel, extra_params: dict
-) -> dict[str, dict]:
-    tools_dict = {}
+class ToolRegistry:
+    """
+    Compiled view of toolkits, shared by every chat request.
 
-    for tool_id in tool_ids:
-        tools = Tools.get_tool_by_id(tool_id)
-        if tools is None:
-            continue
+    A toolkit is compiled once per content version into its module, cleaned
+    specs and pydantic models, and its valves are cached next to it. Entries
+    are dropped by the tools router when a toolkit or its valves change, and
+    revalidated against the database after `ttl` seconds so that changes made
+    through other workers are picked up as well.
+    """
 
-        module = request.app.state.TOOLS.get(tool_id, None)
-        if module is None:
-            module, _ = load_tools_module_by_id(tool_id)
-            request.app.state.TOOLS[tool_id] = module
+    def __init__(self, ttl: int = TOOLS_REGISTRY_TTL):
+        self.ttl = ttl
+        self.toolkits: dict[str, dict] = {}
 
-        extra_params["__id__"] = tool_id
-        if hasattr(module, "valves") and hasattr(module, "Valves"):
-            valves = Tools.get_tool_valves_by_id(tool_id) or {}
-            module.valves = module.Valves(**valves)
+    def invalidate(self, tool_id: str):
+        self.toolkits.pop(tool_id, None)
 
-        if hasattr(module, "UserValves"):
-            extra_params["__user__"]["valves"] = module.UserValves(  # type: ignore
-                **Tools.get_user_valves_by_id_and_user_id(tool_id, user.id)
-            )
+    def invalidate_valves(self, tool_id: str):
+        toolkit = self.toolkits.get(tool_id)
+        if toolkit is not None:
+            toolkit["valves"] = None
+
+    def get_toolkit(self, request: Request, tool_id: str) -> Optional[dict]:
+        toolkit = self.toolkits.get(tool_id)
+        if toolkit is not None and time.time() - toolkit["checked_at"] < self.ttl:
+            return toolkit
 
+        tools = Tools.get_tool_by_id(tool_id)
+        if tools is None:
+            self.invalidate(tool_id)
+            return None
+
+        # Imports are rewritten on load, hash the rewritten content to stay stable
+        content = replace_imports(tools.content)
+        version = hashlib.sha256(content.encode()).hexdigest()
+        if toolkit is not None and toolkit["version"] == version:
+            toolkit["checked_at"] = time.time()
+            toolkit["valves"] = None
+            return toolkit
+
+        # Loaded from the hashed content, a module already in app.state.TOOLS
+        # may come from an older version. Requirements were installed when the
+        # tool was created or updated, pip must not run during a chat request
+        module, _ = load_tools_module_by_id(
+            tool_id, content=content, install_requirements=False
+        )
+        request.app.state.TOOLS[tool_id] = module
+
+        functions = {}
         for spec in tools.specs:
             # Remove internal parameters
             spec["parameters"]["properties"] = {
@@ -68,26 +97,98 @@ def get_tools(
                 if not key.startswith("__")
             }
 
-            function_name = spec["name"]
+            function = getattr(module, spec["name"], None)
+            if function is None:
+                log.warning(f"Tool {tool_id} has no function {spec['name']}")
+                continue
+
+            functions[spec["name"]] = {
+                "function": function,
+                "spec": spec,
+                # Validates the arguments of tool calls, internal ones excluded
+                "pydantic_model": function_to_pydantic_model(function),
+            }
+
+        toolkit = {
+            "id": tool_id,
+            "version": version,
+            "module": module,
+            "functions": functions,
+            "valves": None,
+            "file_handler": hasattr(module, "file_handler") and module.file_handler,
+            "citation": hasattr(module, "citation") and module.citation,
+            "checked_at": time.time(),
+        }
+        self.toolkits[tool_id] = toolkit
+        return toolkit
+
+    def apply_valves(self, toolkit: dict):
+        module = toolkit["module"]
+        if not (hasattr(module, "valves") and hasattr(module, "Valves")):
+            return
+
+        if toolkit["valves"] is None:
+            valves = Tools.get_tool_valves_by_id(toolkit["id"]) or {}
+            toolkit["valves"] = module.Valves(**valves)
+        module.valves = toolkit["valves"]
 
+
+TOOL_REGISTRY = ToolRegistry()
+
+
+def get_user_valves(module, tool_id: str, user: UserModel):
+    # The user's settings are already loaded with the request, no need to refetch
+    settings = user.settings.model_dump() if user.settings else {}
+    valves = settings.get("tools", {}).get("valves", {}).get(tool_id, {})
+    try:
+        return module.UserValves(**valves)
+    except Exception as e:
+        log.exception(e)
+        return module.UserValves()
+
+
+def get_tools(
+    request: Request, tool_ids: list[str], user: UserModel, extra_params: dict
+) -> dict[str, dict]:
+    tools_dict = {}
+
+    for tool_id in tool_ids:
+        toolkit = TOOL_REGISTRY.get_toolkit(request, tool_id)
+        if toolkit is None:
+            continue
+
+        module = toolkit["module"]
+        TOOL_REGISTRY.apply_valves(toolkit)
+
+        # Every toolkit gets its own __id__ and __user__ (with its own valves)
+        toolkit_params = {**extra_params, "__id__": tool_id}
+        if "__user__" in extra_params and hasattr(module, "UserValves"):
+            toolkit_params["__user__"] = {
+                **extra_params["__user__"],
+                "valves": get_user_valves(module, tool_id, user),
+            }
+
+        for function_name, function in toolkit["functions"].items():
             # convert to function that takes only model params and inserts custom params
-            original_func = getattr(module, function_name)
-            callable = apply_extra_params_to_tool_function(original_func, extra_params)
-            # TODO: This needs to be a pydantic model
+            callable = apply_extra_params_to_tool_function(
+                function["function"], toolkit_params
+            )
             tool_dict = {
                 "toolkit_id": tool_id,
                 "callable": callable,
-                "spec": spec,
-                "pydantic_model": function_to_pydantic_model(callable),
-                "file_handler": hasattr(module, "file_handler") and module.file_handler,
-                "citation": hasattr(module, "citation") and module.citation,
+                "spec": function["spec"],
+                "pydantic_model": function["pydantic_model"],
+                "file_handler": toolkit["file_handler"],
+                "citation": toolkit["citation"],
             }
 
             # TODO: if collision, prepend toolkit name
             if function_name in tools_dict:
                 log.warning(f"Tool {function_name} already exists in another tools!")
-                log.warning(f"Collision between {tools} and {tool_id}.")
-                log.warning(f"Discarding {tools}.{function_name}")
+                log.warning(
+                    f"Collision between {tools_dict[function_name]['toolkit_id']} and {tool_id}."
+                )
+                log.warning(f"Discarding {tool_id}.{function_name}")
             else:
                 tools_dict[function_name] = tool_dict
 
@@ -172,6 +273,10 @@ def function_to_pydantic_model(func: Callable) -> type[BaseModel]:
 
     field_defs = {}
     for name, param in parameters.items():
+        # Internal parameters such as __user__ are injected, not model inputs
+        if name.startswith("__"):
+            continue
+
         type_hint = type_hints.get(name, Any)
         default_value = param.default if param.default is not param.empty else ...
         description = descriptions.get(name, None)
@@ -1,60 +1,318 @@
+import asyncio
+import hashlib
 import json
 import logging
+import random
+import uuid
+from typing import Optional
 
-import requests
+import aiohttp
 from open_webui.config import WEBUI_FAVICON_URL, WEBUI_NAME
-from open_webui.env import SRC_LOG_LEVELS, VERSION
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    VERSION,
+    WEBHOOK_COALESCE_WINDOW,
+    WEBHOOK_MAX_CONCURRENCY,
+    WEBHOOK_MAX_RETRIES,
+    WEBHOOK_OUTBOX_RETENTION,
+    WEBHOOK_TIMEOUT,
+)
+from open_webui.models.webhooks import Webhooks, WebhookModel
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["WEBHOOK"])
 
 
-def post_webhook(url: str, message: str, event_data: dict) -> bool:
-    try:
-        log.debug(f"post_webhook: {url}, {message}, {event_data}")
-        payload = {}
-
-        # Slack and Google Chat Webhooks
-        if "https://hooks.slack.com" in url or "https://chat.googleapis.com" in url:
-            payload["text"] = message
-        # Discord Webhooks
-        elif "https://discord.com/api/webhooks" in url:
-            payload["content"] = (
-                message
-                if len(message) < 2000
-                else f"{message[: 2000 - 20]}... (truncated)"
-            )
-        # Microsoft Teams Webhooks
-        elif "webhook.office.com" in url:
-            action = event_data.get("action", "undefined")
-            facts = [
-                {"name": name, "value": value}
-                for name, value in json.loads(event_data.get("user", {})).items()
-            ]
-            payload = {
-                "@type": "MessageCard",
-                "@context": "http://schema.org/extensions",
-                "themeColor": "0076D7",
-                "summary": message,
-                "sections": [
-                    {
-                        "activityTitle": message,
-                        "activitySubtitle": f"{WEBUI_NAME} ({VERSION}) - {action}",
-                        "activityImage": WEBUI_FAVICON_URL,
-                        "facts": facts,
-                        "markdown": True,
-                    }
-                ],
-            }
-        # Default Payload
+def is_chat_webhook(url: str) -> bool:
+    # Chat services render a single text message, so bursts can be merged
+    return (
+        "https://hooks.slack.com" in url
+        or "https://chat.googleapis.com" in url
+        or "https://discord.com/api/webhooks" in url
+        or "webhook.office.com" in url
+    )
+
+
+def split_webhook_batch(
+    url: str, batch: list[WebhookModel]
+) -> list[list[WebhookModel]]:
+    # Teams cards carry the action and user of a single event, so only runs
+    # of events with the same event data can share one card
+    if "webhook.office.com" not in url:
+        return [batch]
+
+    groups = []
+    for webhook in batch:
+        if groups and groups[-1][-1].event_data == webhook.event_data:
+            groups[-1].append(webhook)
         else:
-            payload = {**event_data}
+            groups.append([webhook])
+    return groups
+
+
+def get_webhook_payload(url: str, message: str, event_data: dict) -> dict:
+    payload = {}
+
+    # Slack and Google Chat Webhooks
+    if "https://hooks.slack.com" in url or "https://chat.googleapis.com" in url:
+        payload["text"] = message
+    # Discord Webhooks
+    elif "https://discord.com/api/webhooks" in url:
+        payload["content"] = (
+            message if len(message) < 2000 else f"{message[: 2000 - 20]}... (truncated)"
+        )
+    # Microsoft Teams Webhooks
+    elif "webhook.office.com" in url:
+        action = event_data.get("action", "undefined")
+        facts = [
+            {"name": name, "value": value}
+            for name, value in json.loads(event_data.get("user", "{}")).items()
+        ]
+        payload = {
+            "@type": "MessageCard",
+            "@context": "http://schema.org/extensions",
+            "themeColor": "0076D7",
+            "summary": message,
+            "sections": [
+                {
+                    "activityTitle": message,
+                    "activitySubtitle": f"{WEBUI_NAME} ({VERSION}) - {action}",
+                    "activityImage": WEBUI_FAVICON_URL,
+                    "facts": facts,
+                    "markdown": True,
+                }
+            ],
+        }
+    # Default Payload
+    else:
+        payload = {**event_data}
+
+    return payload
+
+
+def get_webhook_digest(
+    url: str, message: str, event_data: dict, event_id: Optional[str] = None
+) -> str:
+    # Only the same event posted twice is a duplicate, two events with the
+    # same text are not; without an event id nothing is deduplicated
+    return hashlib.sha256(
+        json.dumps(
+            {
+                "url": url,
+                "event_id": event_id or str(uuid.uuid4()),
+                "message": message,
+                "event_data": event_data,
+            },
+            sort_keys=True,
+            default=str,
+        ).encode()
+    ).hexdigest()
+
+
+class WebhookDispatcher:
+    """
+    Delivers webhook notifications in the background.
+
+    Every notification is written to the `webhook_outbox` table first and is
+    only removed once the endpoint accepted it, so pending notifications
+    survive restarts and are replayed on startup; entries this worker claimed
+    but did not deliver are handed back on stop. Deliveries share one pooled
+    aiohttp session, are bounded by a semaphore, retried with exponential
+    backoff, and notifications that pile up for the same chat service URL
+    within `coalesce_window` seconds are merged into one message.
+    """
+
+    def __init__(
+        self,
+        timeout: int = WEBHOOK_TIMEOUT,
+        max_concurrency: int = WEBHOOK_MAX_CONCURRENCY,
+        max_retries: int = WEBHOOK_MAX_RETRIES,
+        coalesce_window: float = WEBHOOK_COALESCE_WINDOW,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.coalesce_window = coalesce_window
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+        # url -> outbox entries waiting to be delivered
+        self.queues: dict[str, list[WebhookModel]] = {}
+        # url -> task draining that url's queue
+        self.workers: dict[str, asyncio.Task] = {}
+        # ids of the outbox entries this worker claimed and has not settled
+        self.claimed: set[str] = set()
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout), trust_env=True
+            )
+
+        # Entries left "delivering" by a worker that died are retried
+        Webhooks.reset_stale_webhooks(older_than=max(self.timeout * 10, 60))
+        Webhooks.delete_failed_webhooks(older_than=WEBHOOK_OUTBOX_RETENTION)
+        for webhook in Webhooks.get_pending_webhooks():
+            if Webhooks.claim_webhook_by_id(webhook.id):
+                self._schedule(webhook)
+
+    async def stop(self):
+        # Undelivered entries stay in the outbox and are replayed on next start
+        self.queues = {}
+        workers = list(self.workers.values())
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self.workers = {}
+
+        if self.claimed:
+            Webhooks.release_webhooks_by_ids(list(self.claimed))
+            self.claimed = set()
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def enqueue(
+        self,
+        url: str,
+        message: str,
+        event_data: dict,
+        event_id: Optional[str] = None,
+    ) -> bool:
+        digest = get_webhook_digest(url, message, event_data, event_id)
+        if Webhooks.get_pending_webhook_by_url_and_digest(url, digest):
+            log.debug(f"Dropping duplicate webhook notification for {url}")
+            return True
 
-        log.debug(f"payload: {payload}")
-        r = requests.post(url, json=payload)
-        r.raise_for_status()
-        log.debug(f"r.text: {r.text}")
+        webhook = Webhooks.insert_new_webhook(url, digest, message, event_data)
+        if webhook is None:
+            return False
+
+        if self.loop is None:
+            try:
+                self.loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No event loop yet, the entry is replayed from the outbox on start
+                return True
+
+        if not Webhooks.claim_webhook_by_id(webhook.id):
+            return True
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self.loop:
+            self._schedule(webhook)
+        else:
+            self.loop.call_soon_threadsafe(self._schedule, webhook)
         return True
+
+    def _schedule(self, webhook: WebhookModel):
+        self.claimed.add(webhook.id)
+        self.queues.setdefault(webhook.url, []).append(webhook)
+
+        worker = self.workers.get(webhook.url)
+        if worker is None or worker.done():
+            self.workers[webhook.url] = asyncio.create_task(
+                self._drain(webhook.url)
+            )
+
+    async def _drain(self, url: str):
+        try:
+            while self.queues.get(url):
+                if self.coalesce_window and is_chat_webhook(url):
+                    await asyncio.sleep(self.coalesce_window)
+
+                batch = self.queues.pop(url, [])
+                if is_chat_webhook(url):
+                    for group in split_webhook_batch(url, batch):
+                        await self._deliver(url, group)
+                else:
+                    await asyncio.gather(
+                        *[self._deliver(url, [webhook]) for webhook in batch]
+                    )
+        finally:
+            self.workers.pop(url, None)
+            # Entries that arrived after the loop exited need a fresh worker
+            if self.queues.get(url) and self.loop and not self.loop.is_closed():
+                self.workers[url] = asyncio.create_task(self._drain(url))
+
+    async def _deliver(self, url: str, batch: list[WebhookModel]):
+        message = "\n\n".join([webhook.message for webhook in batch])
+        payload = get_webhook_payload(url, message, batch[0].event_data or {})
+        log.debug(f"post_webhook: {url}, {len(batch)} message(s), payload: {payload}")
+
+        attempts = max(webhook.attempts for webhook in batch)
+        error = None
+        while attempts <= self.max_retries:
+            attempts += 1
+            try:
+                async with self.semaphore:
+                    if self.session is None or self.session.closed:
+                        self.session = aiohttp.ClientSession(
+                            timeout=aiohttp.ClientTimeout(total=self.timeout),
+                            trust_env=True,
+                        )
+
+                    async with self.session.post(url, json=payload) as r:
+                        if r.status < 500 and r.status != 429:
+                            r.raise_for_status()
+                            log.debug(f"r.text: {await r.text()}")
+                            Webhooks.delete_webhooks_by_ids([w.id for w in batch])
+                            self.claimed.difference_update(w.id for w in batch)
+                            return
+
+                        error = f"{r.status}: {await r.text()}"
+                        retry_after = r.headers.get("Retry-After")
+            except aiohttp.ClientResponseError as e:
+                # 4xx responses will not succeed on retry
+                error = str(e)
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = str(e) or e.__class__.__name__
+                retry_after = None
+
+            log.warning(f"Webhook delivery to {url} failed ({attempts}): {error}")
+            for webhook in batch:
+                Webhooks.update_webhook_failure_by_id(webhook.id, attempts, error)
+
+            if attempts <= self.max_retries:
+                try:
+                    delay = float(retry_after)
+                except (TypeError, ValueError):
+                    delay = min(2 ** (attempts - 1), 60) + random.uniform(0, 1)
+                await asyncio.sleep(delay)
+
+        log.error(f"Giving up on webhook delivery to {url}: {error}")
+        for webhook in batch:
+            Webhooks.update_webhook_failure_by_id(
+                webhook.id, attempts, error or "", failed=True
+            )
+            self.claimed.discard(webhook.id)
+        Webhooks.delete_failed_webhooks(older_than=WEBHOOK_OUTBOX_RETENTION)
+
+
+webhook_dispatcher = WebhookDispatcher()
+
+
+def post_webhook(
+    url: str, message: str, event_data: dict, event_id: Optional[str] = None
+) -> bool:
+    """
+    Queue a webhook notification for background delivery.
+
+    Returns immediately; the result only tells whether the notification was
+    accepted into the outbox, not whether the endpoint received it. A second
+    notification with the same `event_id` for the same URL is dropped while
+    the first one is still pending.
+    """
+    try:
+        return webhook_dispatcher.enqueue(url, message, event_data, event_id)
     except Exception as e:
         log.exception(e)
         return False